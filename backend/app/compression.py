@@ -0,0 +1,176 @@
+"""Response compression negotiated through Accept-Encoding.
+
+An ASGI middleware rather than Starlette's GZipMiddleware so it can offer
+zstd and brotli as well as gzip and pick by the client's q-values. Body
+chunks are buffered (up to ``COMPRESSION_MAX_BUFFER`` bytes) until the whole
+body is known, then compressed in one go:
+
+- WebSocket connections are passed straight through;
+- bodies that outgrow the buffer are real streams and are sent as-is, as are
+  responses that already carry a Content-Encoding or have an incompressible
+  content type (the XLSX export);
+- bodies under ``COMPRESSION_MIN_SIZE`` bytes go out as-is, since the
+  framing overhead and CPU time are not worth it for a few hundred bytes.
+
+zstd and brotli are used when ``zstandard`` / ``brotli`` are installed;
+gzip (stdlib) is always available.
+"""
+
+import gzip
+from importlib.util import find_spec
+from typing import Optional
+
+from .config import settings
+
+# Already compressed (XLSX is a zip) or binary formats that do not shrink
+INCOMPRESSIBLE_TYPES = (
+    "application/vnd.openxmlformats-officedocument",
+    "application/zip",
+    "application/gzip",
+    "image/",
+    "audio/",
+    "video/",
+    "text/event-stream",
+)
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    import brotli
+
+    return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+
+
+def available_encoders() -> dict:
+    """Installed encoders in server preference order (best ratio/speed first).
+
+    Only checks that the optional modules are there; each is imported the first
+    time a response is compressed with it.
+    """
+    encoders = {}
+    if find_spec("zstandard") is not None:
+        encoders["zstd"] = _zstd
+    if find_spec("brotli") is not None:
+        encoders["br"] = _brotli
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+def negotiate(accept_encoding: str, encoders: dict) -> Optional[str]:
+    """The encoding to use for ``accept_encoding``, or None for identity.
+
+    Highest q-value wins; ties go to the server's preference order. ``*``
+    covers any encoding the header does not name, and ``q=0`` refuses one.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        param, _, value = params.strip().partition("=")
+        if param.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in encoders:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _compressible(headers: list) -> bool:
+    content_type = ""
+    for key, value in headers:
+        key = key.lower()
+        if key == b"content-encoding":
+            return False
+        if key == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    return not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept, self.encoders) if accept else None
+        minimum_size = settings.COMPRESSION_MIN_SIZE if self.minimum_size is None else self.minimum_size
+        start_message = None
+        headers: list = []
+        chunks: list[bytes] = []
+        buffered = 0
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, headers, buffered, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether it is worth compressing
+                start_message = message
+                headers = list(message.get("headers", []))
+                if _compressible(headers):
+                    headers.append((b"vary", b"Accept-Encoding"))
+                else:
+                    passthrough = True
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            if passthrough or not encoding:
+                # Nothing to decide: release the headers and stream as-is
+                if start_message is not False:
+                    await send({**start_message, "headers": headers})
+                    start_message = False
+                await send(message)
+                return
+
+            # Middleware layers inside this one re-send the body in chunks (often a
+            # more_body chunk plus an empty final one), so buffer up to a cap
+            chunks.append(message.get("body", b""))
+            buffered += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if more_body and buffered <= settings.COMPRESSION_MAX_BUFFER:
+                return
+            body = b"".join(chunks)
+            chunks.clear()
+            if more_body:
+                # Too big to buffer (a real stream): send what we have uncompressed and pass the rest through
+                passthrough = True
+                await send({**start_message, "headers": headers})
+                start_message = False
+                await send({**message, "body": body})
+                return
+            if len(body) >= minimum_size:
+                body = self.encoders[encoding](body)
+                headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+            await send({**start_message, "headers": headers})
+            start_message = False
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -9,11 +9,36 @@ load_dotenv(ENV_FILE, override=True)
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./taskme.db"
+    DATABASE_REPLICA_URL: str = ""  # optional read replica for read-only routes
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # keep a user's reads on the primary this long after they write
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_HEALTH_ENABLED: bool = False  # serve pool stats at GET /health/db; unauthenticated, so internal deployments only
+    # SQLite tuned mode: WAL + pragmas, one writer connection, a pool of read-only connections
+    SQLITE_TUNED: bool = False
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE_KB: int = 65536
     OPENAI_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
     LLM_PROVIDER: str = "openai"
     OPENAI_MODEL: str = "gpt-4o"
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
+    OPENAI_BASE_URL: str = ""  # override for proxies or scripts/fake_llm_server.py
+    ANTHROPIC_BASE_URL: str = ""
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_FAILOVER_ENABLED: bool = True
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    LLM_ROUTER_MAX_WORKERS: int = 16
+    # Per-workspace custom column specs and rendered prompt rules kept by llm_service
+    CUSTOM_FIELDS_CACHE_MAX_SIZE: int = 1024
+    CUSTOM_FIELDS_CACHE_TTL_SECONDS: float = 3600.0
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
@@ -31,6 +56,41 @@ class Settings(BaseSettings):
     MICROSOFT_CLIENT_SECRET: str = ""
     AGENTS_SERVICE_URL: str = "http://localhost:8001"
     AGENTS_API_KEY: str = ""
+    AGENT_KEY_CACHE_TTL_SECONDS: float = 3600.0
+    AGENT_KEY_CACHE_MAX_SIZE: int = 1024
+    SCANNER_CONCURRENCY: int = 8
+    SCANNER_RATE_LIMIT_PER_SECOND: float = 2.0
+    SCANNER_MAX_NUDGES_PER_WORKSPACE: int = 50
+    SCANNER_PAGE_SIZE: int = 500
+    SCANNER_NUDGE_BATCH_SIZE: int = 10
+    SCANNER_LEASE_TTL_SECONDS: float = 300.0
+    TASK_FEED_BUFFER_SIZE: int = 1000
+    TASK_FEED_QUEUE_SIZE: int = 500
+    TASK_FEED_POLL_SECONDS: float = 5.0
+    TASK_FEED_CATCH_UP_LIMIT: int = 500
+    PARSE_BATCH_MAX_ITEMS: int = 100
+    PARSE_BATCH_MAX_WORKERS: int = 4
+    TASK_LIST_FAST_JSON: bool = True  # GET /tasks: row tuples + orjson instead of response_model validation
+    # Response compression (see app/compression.py); zstd/br need the optional zstandard/brotli packages
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies go out uncompressed
+    COMPRESSION_MAX_BUFFER: int = 4 * 1024 * 1024  # bytes buffered before a body counts as a stream and is sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # Per-request SQL checks (see app/query_guard.py); 0 disables a threshold
+    DB_QUERY_BUDGET: int = 50
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
+    DB_QUERY_GUARD_RAISE: bool = False  # raise instead of logging; meant for tests
+    DB_DEBUG_HEADERS: bool = False  # add X-DB-Queries / X-DB-Time-Ms response headers
+    METRICS_ENABLED: bool = False  # serve Prometheus metrics at GET /metrics
+    METRICS_TOKEN: str = ""  # if set, /metrics requires "Authorization: Bearer <token>"
+    # OpenTelemetry tracing (see app/tracing.py); needs opentelemetry-sdk
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # otlp | console | file
+    TRACING_FILE: str = "traces.jsonl"  # for TRACING_EXPORTER=file
+    TRACING_SERVICE_NAME: str = "taskme-backend"
+    STARTUP_PROFILE: bool = False  # log lifespan step timings (see app/startup_profile.py)
 
     model_config = {"env_file": str(ENV_FILE)}
 
@@ -1,26 +1,178 @@
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import inspect, text
+from sqlalchemy import Select, TextClause, bindparam, event, inspect, text, update
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine, select
 
 from .config import settings
 
-def _build_engine():
-    url = settings.DATABASE_URL
+
+class _PoolMetrics:
+    """Checkout wait times for one engine's connection pool (in-use/overflow are read from the pool)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = _PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _sqlite_tuned(url: str) -> bool:
+    # In-memory databases can't be shared between a writer and reader engines
+    return settings.SQLITE_TUNED and url.startswith("sqlite") and ":memory:" not in url and url not in ("sqlite://", "sqlite:///")
+
+
+def _apply_sqlite_pragmas(eng, query_only: bool = False):
+    @event.listens_for(eng, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=1")
+        cursor.close()
+
+
+def _build_engine(url: str | None = None):
+    url = url or settings.DATABASE_URL
     kwargs = {}
     if url.startswith("sqlite"):
         kwargs["connect_args"] = {"check_same_thread": False}
+        if _sqlite_tuned(url):
+            # The single writer: one connection, so write transactions queue on pool checkout
+            # (wait times show up in pool_stats) instead of failing with "database is locked"
+            kwargs.update(poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0,
+                          pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
     else:
-        kwargs["pool_size"] = 10
-        kwargs["max_overflow"] = 20
-        kwargs["pool_timeout"] = 30
-        kwargs["pool_recycle"] = 1800
+        kwargs["poolclass"] = InstrumentedQueuePool
+        kwargs["pool_size"] = settings.DB_POOL_SIZE
+        kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+        kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT_SECONDS
+        kwargs["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
         kwargs["pool_pre_ping"] = True
-    return create_engine(url, **kwargs)
+    eng = create_engine(url, **kwargs)
+    if _sqlite_tuned(url):
+        _apply_sqlite_pragmas(eng)
+    return eng
+
+
+def _build_sqlite_read_engine(url: str | None = None):
+    """Read-only connection pool next to the single writer; WAL lets these read concurrently."""
+    url = url or settings.DATABASE_URL
+    if not _sqlite_tuned(url):
+        return None
+    eng = create_engine(url, connect_args={"check_same_thread": False}, poolclass=InstrumentedQueuePool,
+                        pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0,
+                        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    _apply_sqlite_pragmas(eng, query_only=True)
+    return eng
 
 
 engine = _build_engine()
+# Optional read replica for read-only routes (see dependencies.get_read_session)
+replica_engine = _build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+# SQLite tuned mode only: reader pool used by RoutingSession
+sqlite_read_engine = _build_sqlite_read_engine()
+
+
+_WRITING_KEY = "routing_session_writing"
+_READ_SQL = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def _is_read(clause) -> bool:
+    if isinstance(clause, Select):
+        return True
+    if isinstance(clause, TextClause):
+        return bool(_READ_SQL.match(clause.text))
+    return False
+
+
+class RoutingSession(Session):
+    """Session for SQLite tuned mode: reads use the reader pool, writes the single writer connection.
+
+    Once a transaction writes, it stays on the writer until it ends so it reads
+    its own uncommitted changes. ``session.connection()`` (no statement to
+    inspect) is treated as a write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if sqlite_read_engine is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self.info.get(_WRITING_KEY) or self._flushing or not _is_read(clause):
+            self.info[_WRITING_KEY] = True
+            return engine
+        return sqlite_read_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _leave_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITING_KEY, None)
+
+
+def pool_stats() -> dict:
+    """Connection pool state per engine: size, in use, overflow and checkout wait times."""
+    stats = {}
+    for name, eng in (("primary", engine), ("replica", replica_engine), ("sqlite_reader", sqlite_read_engine)):
+        if eng is None:
+            continue
+        pool = eng.pool
+        entry = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(size=pool.size(), checked_out=pool.checkedout(), overflow=max(pool.overflow(), 0))
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            entry.update(
+                checkouts=metrics.checkouts,
+                timeouts=metrics.timeouts,
+                wait_seconds_total=round(metrics.wait_seconds_total, 6),
+                wait_seconds_max=round(metrics.wait_seconds_max, 6),
+            )
+        stats[name] = entry
+    return stats
 
 
 def check_database_url():
@@ -33,14 +185,15 @@ def check_database_url():
     logger.info("DATABASE_URL from settings: %s", "postgresql" if "postgresql" in settings.DATABASE_URL else "sqlite")
     if db_url and db_url != settings.DATABASE_URL:
         settings.DATABASE_URL = db_url
-        global engine
+        global engine, sqlite_read_engine
         engine = _build_engine()
+        sqlite_read_engine = _build_sqlite_read_engine()
         logger.info("Engine rebuilt with DATABASE_URL from environment")
 
 
 def create_db_and_tables():
     # Import models so metadata is populated
-    from .models import Task, SharedList, ColumnConfig, User, Workspace, WorkspaceMember, WorkspaceInvite  # noqa: F401
+    from .models import Task, SharedList, ColumnConfig, User, Workspace, WorkspaceMember, WorkspaceInvite, ScannerLease, TaskTombstone, SchemaMigration, ParseBatch  # noqa: F401
     SQLModel.metadata.create_all(engine)
 
 
@@ -374,9 +527,244 @@ def migrate_add_nudge_columns():
             session.commit()
 
 
-def get_session():
+def migrate_add_stalls_at():
+    """Add task.stalls_at, backfill it, and index it for the follow-up scanner's due-task query."""
+    from .models.task import Task, compute_stalls_at
+
+    inspector = inspect(engine)
+    if "task" not in inspector.get_table_names():
+        return
+    columns = [col["name"] for col in inspector.get_columns("task")]
+    indexes = {idx["name"] for idx in inspector.get_indexes("task")}
+    with Session(engine) as session:
+        if "stalls_at" not in columns:
+            session.exec(text("ALTER TABLE task ADD COLUMN stalls_at TIMESTAMP"))
+            session.commit()
+        # The column may already exist (added up front by _add_model_columns), so backfill by value
+        rows = [
+            {"task_id": task.id, "deadline": compute_stalls_at(task)}
+            for task in session.exec(
+                select(Task).where(Task.workspace_id != None, Task.stalls_at == None)  # noqa: E711
+            ).all()
+        ]
+        rows = [r for r in rows if r["deadline"] is not None]
+        if rows:
+            table = Task.__table__
+            session.execute(
+                update(table).where(table.c.id == bindparam("task_id")).values(stalls_at=bindparam("deadline")),
+                rows,
+            )
+        session.commit()
+        if "ix_task_stalls_at" not in indexes:
+            session.exec(text(
+                "CREATE INDEX IF NOT EXISTS ix_task_stalls_at ON task (stalls_at, id) WHERE stalls_at IS NOT NULL"
+            ))
+        # Superseded by ix_task_stalls_at
+        if "ix_task_stall_scan" in indexes:
+            session.exec(text("DROP INDEX ix_task_stall_scan"))
+        # Scanner checkpoints are now (stalls_at, id); an old updated_at cursor is just ignored
+        if "scannerlease" in inspector.get_table_names():
+            lease_columns = [col["name"] for col in inspector.get_columns("scannerlease")]
+            if "checkpoint_stalls_at" not in lease_columns:
+                session.exec(text("ALTER TABLE scannerlease ADD COLUMN checkpoint_stalls_at TIMESTAMP"))
+                session.exec(text("UPDATE scannerlease SET checkpoint_task_id = NULL"))
+        session.commit()
+
+
+def migrate_add_change_feed_columns():
+    """Add workspace.data_version and task.change_seq (indexed) for the change feed and delta sync."""
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    with Session(engine) as session:
+        if "workspace" in tables:
+            columns = [col["name"] for col in inspector.get_columns("workspace")]
+            if "data_version" not in columns:
+                session.exec(text("ALTER TABLE workspace ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0"))
+        if "task" in tables:
+            columns = [col["name"] for col in inspector.get_columns("task")]
+            if "change_seq" not in columns:
+                session.exec(text("ALTER TABLE task ADD COLUMN change_seq INTEGER"))
+            indexes = {idx["name"] for idx in inspector.get_indexes("task")}
+            if "ix_task_workspace_change_seq" not in indexes:
+                session.exec(text("CREATE INDEX IF NOT EXISTS ix_task_workspace_change_seq ON task (workspace_id, change_seq)"))
+            session.commit()
+            _backfill_change_seq(session)
+        session.commit()
+
+
+def migrate_add_meta_version():
+    """Add workspace.meta_version, the ETag version for column, member and workspace reads."""
+    inspector = inspect(engine)
+    if "workspace" in inspector.get_table_names():
+        columns = [col["name"] for col in inspector.get_columns("workspace")]
+        if "meta_version" not in columns:
+            with Session(engine) as session:
+                session.exec(text("ALTER TABLE workspace ADD COLUMN meta_version INTEGER NOT NULL DEFAULT 0"))
+                session.commit()
+
+
+def migrate_add_task_version():
+    """Add task.version, the compare-and-swap counter behind If-Match on PATCH /tasks/{id}."""
+    inspector = inspect(engine)
+    if "task" in inspector.get_table_names():
+        columns = [col["name"] for col in inspector.get_columns("task")]
+        if "version" not in columns:
+            with Session(engine) as session:
+                session.exec(text("ALTER TABLE task ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+                session.commit()
+
+
+def migrate_add_user_last_write():
+    """Add user.last_write_at, the read-your-writes marker for replica routing."""
+    inspector = inspect(engine)
+    if "user" in inspector.get_table_names():
+        columns = [col["name"] for col in inspector.get_columns("user")]
+        if "last_write_at" not in columns:
+            with Session(engine) as session:
+                session.exec(text('ALTER TABLE "user" ADD COLUMN last_write_at TIMESTAMP'))
+                session.commit()
+
+
+def migrate_add_parse_batches():
+    """Nothing to alter: the parsebatch table (offline parse batch owners) comes from create_all."""
+
+
+def _backfill_change_seq(session: Session):
+    """Give tasks written before the change feed existed a sequence number, so a since=0 sync sees them."""
+    rows = session.exec(text(
+        "SELECT workspace_id, id FROM task "
+        "WHERE workspace_id IS NOT NULL AND change_seq IS NULL ORDER BY workspace_id, id"
+    )).all()
+    by_workspace: dict[int, list[int]] = {}
+    for workspace_id, task_id in rows:
+        by_workspace.setdefault(workspace_id, []).append(task_id)
+    for workspace_id, task_ids in by_workspace.items():
+        start = session.exec(
+            text("SELECT data_version FROM workspace WHERE id = :id").bindparams(id=workspace_id)
+        ).one()[0]
+        session.execute(
+            text("UPDATE task SET change_seq = :seq WHERE id = :id"),
+            [{"seq": start + i + 1, "id": task_id} for i, task_id in enumerate(task_ids)],
+        )
+        session.execute(
+            text("UPDATE workspace SET data_version = :version WHERE id = :id"),
+            {"version": start + len(task_ids), "id": workspace_id},
+        )
+
+
+# Startup migration chain. Each step runs once and is recorded in schemamigration;
+# append new steps at the end with the next version number, never renumber.
+# Missing tables are only created while some step is pending, so a new table
+# also needs a step (even one that does nothing beyond create_all).
+MIGRATIONS = [
+    (1, "custom_fields_column", migrate_custom_fields_column),
+    (2, "add_user_support", migrate_add_user_support),
+    (3, "assign_orphan_data", migrate_assign_orphan_data),
+    (4, "add_email_verification", migrate_add_email_verification),
+    (5, "add_oauth", migrate_add_oauth),
+    (6, "add_workspaces", migrate_add_workspaces),
+    (7, "backfill_workspaces", migrate_backfill_workspaces),
+    (8, "seed_core_columns", seed_core_columns),
+    (9, "fix_column_constraint", migrate_fix_column_constraint),
+    (10, "add_rbac", migrate_add_rbac),
+    (11, "add_agent_columns", migrate_add_agent_columns),
+    (12, "add_nudge_columns", migrate_add_nudge_columns),
+    (13, "add_stalls_at", migrate_add_stalls_at),
+    (14, "add_change_feed_columns", migrate_add_change_feed_columns),
+    (15, "add_meta_version", migrate_add_meta_version),
+    (16, "add_task_version", migrate_add_task_version),
+    (17, "add_user_last_write", migrate_add_user_last_write),
+    (18, "add_parse_batches", migrate_add_parse_batches),
+]
+
+
+# Columns that later steps add but the models already map. Older steps load
+# models (3, 7, 8, 9 and 13 select User/Workspace/Task), which fails on a database
+# that predates these columns, so they are added before any pending step runs.
+# The steps that introduced them still create their indexes and backfill.
+MODEL_COLUMNS = [
+    ("task", "stalls_at", "TIMESTAMP"),
+    ("task", "change_seq", "INTEGER"),
+    ("task", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("workspace", "data_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("workspace", "meta_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("user", "last_write_at", "TIMESTAMP"),
+]
+
+
+def _add_model_columns():
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
     with Session(engine) as session:
+        for table, column, ddl in MODEL_COLUMNS:
+            if table in tables and column not in {c["name"] for c in inspector.get_columns(table)}:
+                session.exec(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+        session.commit()
+
+
+def _applied_migrations() -> set[int]:
+    from .models.schema_migration import SchemaMigration
+
+    if not inspect(engine).has_table("schemamigration"):
+        return set()
+    with Session(engine) as session:
+        return set(session.exec(select(SchemaMigration.version)).all())
+
+
+def run_migrations(migrations=MIGRATIONS) -> list[int]:
+    """Create missing tables and apply pending migration steps in order. Returns the versions applied.
+
+    An up-to-date database costs one table check and one small query. Steps were
+    written to be idempotent, so a database that predates this table simply
+    re-runs them once (after MODEL_COLUMNS are in place, so the early steps can
+    load models); two workers booting together may both run a step, and the
+    loser's record insert is ignored.
+    """
+    from .models.schema_migration import SchemaMigration
+
+    logger = logging.getLogger(__name__)
+    applied = _applied_migrations()
+    pending = [step for step in migrations if step[0] not in applied]
+    if not pending:
+        return []
+
+    global engine
+    writer = engine
+    if sqlite_read_engine is not None:
+        # Steps hold an inspector connection while writing, which the one-connection writer pool can't serve
+        engine = create_engine(writer.url, connect_args={"check_same_thread": False}, poolclass=NullPool)
+    try:
+        create_db_and_tables()
+        _add_model_columns()
+        for version, name, step in sorted(pending, key=lambda s: s[0]):
+            logger.info("Applying migration %d (%s)", version, name)
+            step()
+            with Session(engine) as session:
+                session.add(SchemaMigration(version=version, name=name))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+    finally:
+        if engine is not writer:
+            engine.dispose()
+            engine = writer
+    return [version for version, _name, _step in pending]
+
+
+def get_session():
+    session_class = RoutingSession if sqlite_read_engine is not None else Session
+    with session_class(engine) as session:
         yield session
 
 
+def mark_user_write(user_id: int) -> None:
+    """Record that ``user_id`` just wrote, so their reads stay on the primary for a while."""
+    from .models.user import User
+
+    with Session(engine) as session:
+        session.execute(update(User).where(User.id == user_id).values(last_write_at=datetime.now(timezone.utc)))
+        session.commit()
+
+
 SessionDep = Annotated[Session, Depends(get_session)]
@@ -1,11 +1,14 @@
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
-from sqlmodel import select
+from sqlmodel import Session, select
 
+from . import database
 from .auth import decode_access_token
+from .config import settings
 from .database import SessionDep
 from .models.user import User
 
@@ -44,6 +47,35 @@ def get_current_user(
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
 
 
+def _wrote_recently(user: User) -> bool:
+    if user.last_write_at is None:
+        return False
+    last_write = user.last_write_at if user.last_write_at.tzinfo else user.last_write_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - last_write < timedelta(seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def get_read_session(session: SessionDep, current_user: CurrentUserDep):
+    """Session for read-only routes: the replica if configured, unless the user wrote recently (read-your-writes)."""
+    if database.replica_engine is None or _wrote_recently(current_user):
+        yield session
+        return
+    with Session(database.replica_engine) as replica_session:
+        yield replica_session
+
+
+def get_public_read_session(session: SessionDep):
+    """Replica session for unauthenticated reads; callers fall back to the primary on a miss."""
+    if database.replica_engine is None:
+        yield session
+        return
+    with Session(database.replica_engine) as replica_session:
+        yield replica_session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+PublicReadSessionDep = Annotated[Session, Depends(get_public_read_session)]
+
+
 def get_workspace_member(workspace_id: int, session: SessionDep, current_user: CurrentUserDep):
     """Return the WorkspaceMember for the current user in the given workspace, or 404."""
     from .models.workspace import WorkspaceMember
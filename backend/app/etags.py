@@ -0,0 +1,39 @@
+"""Weak ETags and If-None-Match handling for read endpoints.
+
+ETags are built from version counters (``Workspace.data_version`` for tasks,
+``Workspace.meta_version`` for columns/members/workspaces, ``Task.version`` for
+a single task, sent as a strong ETag so it also works for If-Match on PATCH),
+so a route can answer a revalidation with 304 after reading a version number
+instead of loading and serializing rows.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Let the browser keep the body but revalidate on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: the W/ prefix is ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has ``etag``; otherwise tag ``response`` and return None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
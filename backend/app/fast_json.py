@@ -0,0 +1,77 @@
+"""Fast JSON path for large list responses.
+
+By default FastAPI validates every returned ORM object against the route's
+``response_model`` and then encodes the result. For list endpoints that read
+straight from the database, that validation re-checks values the columns
+already guarantee. A route opts in to the fast path by:
+
+- selecting only the response model's columns as row tuples (``model_columns``);
+- returning ``FastJSONResponse(rows_as_dicts(...))``.
+
+The route's ``response_model`` stays declared, so OpenAPI still documents the shape.
+``projected_model`` builds the trimmed model for a sparse ``fields=`` request.
+
+orjson is used when it is installed; otherwise the stdlib encoder is the fallback.
+"""
+
+import json
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import create_model
+
+try:
+    import orjson
+except ModuleNotFoundError:  # optional; stdlib json is the fallback
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        # Same form pydantic emits, so both paths produce identical payloads
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response for pre-shaped dicts/lists; skips response_model validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_columns(table_model, response_model, fields=None) -> list:
+    """The ``table_model`` columns behind ``response_model``'s fields (optionally only ``fields``), in model order."""
+    names = response_model.model_fields if fields is None else [n for n in response_model.model_fields if n in fields]
+    return [getattr(table_model, name) for name in names]
+
+
+def rows_as_dicts(rows) -> list[dict]:
+    """Row tuples from ``select(*columns)`` as plain dicts keyed by column name."""
+    return [row._asdict() for row in rows]
+
+
+@lru_cache(maxsize=128)
+def projected_model(response_model, fields: tuple[str, ...]):
+    """A copy of ``response_model`` with only ``fields``, cached per field set."""
+    return create_model(
+        f"{response_model.__name__}Fields",
+        **{name: (response_model.model_fields[name].annotation, response_model.model_fields[name])
+           for name in response_model.model_fields if name in fields},
+    )
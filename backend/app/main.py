@@ -1,45 +1,47 @@
 import os
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from .config import settings, check_jwt_secret
-from .database import check_database_url, create_db_and_tables, migrate_custom_fields_column, migrate_add_user_support, migrate_assign_orphan_data, migrate_add_email_verification, migrate_add_oauth, migrate_add_workspaces, migrate_backfill_workspaces, seed_core_columns, migrate_fix_column_constraint, migrate_add_rbac, migrate_add_agent_columns, migrate_add_nudge_columns
-from .routers import auth, columns, export, members, parse, share, tasks, workspaces, agents, agent_ws, agent_admin
+from . import database
+from . import metrics, query_guard, tracing
+from .compression import CompressionMiddleware
+from .database import check_database_url, pool_stats, run_migrations
+from .route_template import route_template
+from .startup_profile import startup_step, step_timings
+from .routers import auth, columns, export, members, parse, share, tasks, workspaces, agents, agent_ws, agent_admin, task_feed
 
 limiter = Limiter(key_func=get_remote_address)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    check_database_url()
-    check_jwt_secret()
-    create_db_and_tables()
-    migrate_custom_fields_column()
-    migrate_add_user_support()
-    migrate_assign_orphan_data()
-    migrate_add_email_verification()
-    migrate_add_oauth()
-    migrate_add_workspaces()
-    migrate_backfill_workspaces()
-    seed_core_columns()
-    migrate_fix_column_constraint()
-    migrate_add_rbac()
-    migrate_add_agent_columns()
-    migrate_add_nudge_columns()
+    step_timings.clear()
+    with startup_step("check_database_url"):
+        check_database_url()
+    with startup_step("check_jwt_secret"):
+        check_jwt_secret()
+    with startup_step("run_migrations"):
+        run_migrations()
+    with startup_step("configure_tracing"):
+        tracing.configure()
     if not settings.SMTP_USER:
         import logging
         logging.getLogger(__name__).warning("SMTP_USER not set — email verification will fail")
     # Start follow-up scanner background task
     import asyncio
-    from .services.followup_scanner import run_scanner_loop
-    scanner_task = asyncio.create_task(run_scanner_loop())
+    with startup_step("start_scanner"):
+        from .services.followup_scanner import run_scanner_loop
+        scanner_task = asyncio.create_task(run_scanner_loop())
     yield
     scanner_task.cancel()
+    tracing.shutdown()
 
 
 docs_enabled = not os.getenv("RAILWAY_ENVIRONMENT")
@@ -87,6 +89,61 @@ async def security_headers_middleware(request: Request, call_next):
     return response
 
 
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    """With a read replica configured, remember users who just wrote so their reads stay on the primary."""
+    response: Response = await call_next(request)
+    if database.replica_engine is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+        user_id = _bearer_user_id(request)
+        if user_id:
+            from starlette.concurrency import run_in_threadpool
+            await run_in_threadpool(database.mark_user_write, user_id)
+    return response
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Latency by route template, plus SQL statements and time spent on them per request (and query_guard checks)."""
+    db_stats = metrics.RequestDBStats()
+    token = metrics.request_db_stats.set(db_stats)
+    metrics.HTTP_REQUESTS_IN_PROGRESS.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response: Response = await call_next(request)
+        status = response.status_code
+    finally:
+        metrics.HTTP_REQUESTS_IN_PROGRESS.dec()
+        metrics.request_db_stats.reset(token)
+        route = route_template(request.scope) or "unmatched"
+        metrics.observe_request(request.method, route, status, time.perf_counter() - start, db_stats)
+    if settings.DB_DEBUG_HEADERS:
+        response.headers.update(query_guard.debug_headers(db_stats))
+    query_guard.check_request(request.method, route, db_stats)
+    return response
+
+
+def _bearer_user_id(request: Request):
+    from jose import JWTError
+    from .auth import decode_access_token
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token).get("user_id")
+    except JWTError:
+        return None
+
+
+# Wraps the other middleware, so it compresses the final body and headers
+app.add_middleware(CompressionMiddleware)
+# Outermost of all, so request spans include every other middleware
+app.add_middleware(tracing.TracingMiddleware)
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(workspaces.router, prefix="/api/v1")
 app.include_router(tasks.router, prefix="/api/v1")
@@ -98,9 +155,32 @@ app.include_router(columns.router, prefix="/api/v1")
 app.include_router(members.router, prefix="/api/v1")
 app.include_router(agents.router, prefix="/api/v1")
 app.include_router(agent_ws.router, prefix="/api/v1")
+app.include_router(task_feed.router, prefix="/api/v1")
 app.include_router(agent_admin.router, prefix="/api/v1")
 
 
 @app.get("/")
 def root():
     return {"message": "TaskMe API is running"}
+
+
+@app.get("/health/db", include_in_schema=False)
+def db_health():
+    """Connection pool usage and checkout wait times."""
+    if not settings.DB_HEALTH_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {"pools": pool_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        import hmac
+
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token, settings.METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
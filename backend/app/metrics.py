@@ -0,0 +1,119 @@
+"""Prometheus metrics, served at ``GET /metrics``.
+
+- HTTP latency by route template, method and status (``metrics_middleware`` in main.py);
+- DB queries and query time, overall and per request (SQLAlchemy cursor events on every engine);
+- threadpool utilization, sampled when /metrics is scraped;
+- active agent WebSocket relays, follow-up scan durations and LLM call latency by provider,
+  recorded by the routers and services that own them.
+"""
+
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Request latencies span fast cached reads to multi-second LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@lru_cache(maxsize=None)
+def _registry() -> SimpleNamespace:
+    """The metric objects, created on first use so importing the app does not load prometheus_client."""
+    from prometheus_client import Counter, Gauge, Histogram
+
+    return SimpleNamespace(
+        HTTP_REQUESTS_IN_PROGRESS=Gauge("taskme_http_requests_in_progress", "HTTP requests being handled"),
+        HTTP_REQUEST_SECONDS=Histogram(
+            "taskme_http_request_duration_seconds", "HTTP request latency",
+            ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+        ),
+        DB_QUERIES=Counter("taskme_db_queries_total", "SQL statements executed"),
+        DB_QUERY_SECONDS=Histogram(
+            "taskme_db_query_duration_seconds", "Time per SQL statement",
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+        ),
+        DB_QUERIES_PER_REQUEST=Histogram(
+            "taskme_db_queries_per_request", "SQL statements per HTTP request",
+            ["route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+        ),
+        DB_SECONDS_PER_REQUEST=Histogram(
+            "taskme_db_seconds_per_request", "Total SQL time per HTTP request",
+            ["route"], buckets=LATENCY_BUCKETS,
+        ),
+        THREADPOOL_IN_USE=Gauge("taskme_threadpool_threads_in_use", "Threads borrowed from the sync-endpoint threadpool"),
+        THREADPOOL_SIZE=Gauge("taskme_threadpool_threads_total", "Sync-endpoint threadpool capacity"),
+        AGENT_WS_RELAYS=Gauge("taskme_agent_ws_relays_active", "Open frontend <-> agents WebSocket relays"),
+        SCAN_SECONDS=Histogram(
+            "taskme_followup_scan_duration_seconds", "Follow-up scanner run duration",
+            buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800),
+        ),
+        SCAN_NUDGES=Counter("taskme_followup_nudges_total", "Nudges generated by the follow-up scanner"),
+        LLM_CALL_SECONDS=Histogram(
+            "taskme_llm_call_duration_seconds", "LLM provider call latency",
+            ["provider", "outcome"], buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0),
+        ),
+    )
+
+
+def __getattr__(name: str):
+    # metrics.HTTP_REQUEST_SECONDS etc. resolve through the registry, building it on first access
+    if name.isupper():
+        return getattr(_registry(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class RequestDBStats:
+    __slots__ = ("queries", "seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: dict[str, int] = {}  # SQL text -> executions, for N+1 detection (app/query_guard.py)
+
+
+# Set by metrics_middleware; sync endpoints run in a copied context, so they update the same object
+request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    registry = _registry()
+    registry.DB_QUERIES.inc()
+    registry.DB_QUERY_SECONDS.observe(elapsed)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, db: RequestDBStats) -> None:
+    registry = _registry()
+    registry.HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+    registry.DB_QUERIES_PER_REQUEST.labels(route).observe(db.queries)
+    registry.DB_SECONDS_PER_REQUEST.labels(route).observe(db.seconds)
+
+
+def render() -> tuple[bytes, str]:
+    """The exposition body and content type; call from the event loop (the threadpool sample needs it)."""
+    import anyio.to_thread
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    registry = _registry()
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    registry.THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+    registry.THREADPOOL_SIZE.set(limiter.total_tokens)
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,3 +3,7 @@ from .share import SharedList  # noqa: F401
 from .column_config import ColumnConfig  # noqa: F401
 from .user import User  # noqa: F401
 from .workspace import Workspace, WorkspaceMember, WorkspaceInvite  # noqa: F401
+from .scanner_lease import ScannerLease  # noqa: F401
+from .task_tombstone import TaskTombstone  # noqa: F401
+from .schema_migration import SchemaMigration  # noqa: F401
+from .parse_batch import ParseBatch  # noqa: F401
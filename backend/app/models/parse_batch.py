@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlmodel import Field, SQLModel
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ParseBatch(SQLModel, table=True):
+    """An offline parse batch submitted to a provider's Batch API, and who submitted it."""
+
+    batch_id: str = Field(primary_key=True, max_length=255)
+    provider: str = Field(max_length=50)
+    user_id: int = Field(sa_column=Column(Integer, ForeignKey("user.id"), nullable=False, index=True))
+    # JSON list of input indexes that were empty and not sent; reported as per-item errors
+    empty_indexes: str = Field(default="[]")
+    created_at: datetime = Field(default_factory=_utcnow)
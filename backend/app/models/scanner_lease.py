@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ScannerLease(SQLModel, table=True):
+    """Time-limited lease for a background job, so only one worker/replica runs it.
+
+    Also stores the job's resume point: the (stalls_at, id) keyset cursor of the last finished page.
+    """
+
+    name: str = Field(primary_key=True, max_length=50)
+    holder: str = Field(max_length=255)
+    expires_at: datetime
+    checkpoint_stalls_at: Optional[datetime] = None
+    checkpoint_task_id: Optional[int] = None
+    updated_at: datetime = Field(default_factory=_utcnow)
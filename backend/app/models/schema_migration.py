@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+
+from sqlmodel import Field, SQLModel
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SchemaMigration(SQLModel, table=True):
+    """One applied step of the startup migration chain (see database.MIGRATIONS)."""
+
+    version: int = Field(primary_key=True)
+    name: str = Field(max_length=100)
+    applied_at: datetime = Field(default_factory=_utcnow)
@@ -1,15 +1,23 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, ForeignKey, Integer, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, Text, event, inspect as sa_inspect
 from sqlmodel import Field, SQLModel
 
+# Follow-up scanner thresholds (used to maintain Task.stalls_at)
+STALLED_DAYS = 3
+NUDGE_COOLDOWN_HOURS = 24
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _aware(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
 class TaskStatus(str, Enum):
     TODO = "To Do"
     IN_PROGRESS = "In Progress"
@@ -37,6 +45,8 @@ class TaskBase(SQLModel):
 
 
 class Task(TaskBase, table=True):
+    __table_args__ = (Index("ix_task_workspace_change_seq", "workspace_id", "change_seq"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, sa_column=Column(Integer, ForeignKey("user.id"), nullable=True, index=True))
     workspace_id: Optional[int] = Field(default=None, sa_column=Column(Integer, ForeignKey("workspace.id"), nullable=True, index=True))
@@ -51,6 +61,37 @@ class Task(TaskBase, table=True):
     # Follow-up nudge columns
     agent_nudge: Optional[str] = Field(default=None, sa_column=Column(Text))
     agent_nudge_at: Optional[datetime] = None
+    # When the follow-up scanner should next look at this task; NULL = never (done, subtask, no workspace)
+    stalls_at: Optional[datetime] = None
+    # Workspace data_version of the last write to this task (see services/task_feed.py)
+    change_seq: Optional[int] = None
+    # Incremented by every write; PATCH /tasks/{id} compares it against If-Match
+    version: int = Field(default=1, sa_column=Column(Integer, nullable=False, server_default="1"))
+
+
+def compute_stalls_at(task: Task) -> Optional[datetime]:
+    """Stall deadline: STALLED_DAYS after the last update, but not inside the nudge cooldown."""
+    if task.status == TaskStatus.DONE or task.parent_task_id is not None or task.workspace_id is None:
+        return None
+    deadline = _aware(task.updated_at or _utcnow()) + timedelta(days=STALLED_DAYS)
+    if task.agent_nudge_at is not None:
+        deadline = max(deadline, _aware(task.agent_nudge_at) + timedelta(hours=NUDGE_COOLDOWN_HOURS))
+    return deadline
+
+
+@event.listens_for(Task, "before_insert")
+@event.listens_for(Task, "before_update")
+def _maintain_stalls_at(mapper, connection, task: Task):
+    # Every ORM write path (REST, agent tools, copy/move, nudges) goes through here
+    task.stalls_at = compute_stalls_at(task)
+
+
+@event.listens_for(Task, "before_update")
+def _bump_version(mapper, connection, task: Task):
+    state = sa_inspect(task)
+    if any(attr.history.has_changes() for attr in state.attrs if attr.key != "stalls_at"):
+        # Incremented in SQL so concurrent writers never hand out the same version twice
+        task.version = Task.__table__.c.version + 1
 
 
 class TaskCreate(TaskBase):
@@ -82,3 +123,4 @@ class TaskPublic(TaskBase):
     parent_task_id: Optional[int] = None
     agent_nudge: Optional[str] = None
     agent_nudge_at: Optional[datetime] = None
+    version: int = 1
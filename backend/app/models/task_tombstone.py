@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TaskTombstone(SQLModel, table=True):
+    """Records a task leaving a workspace (deleted or moved out) for delta sync."""
+
+    __table_args__ = (Index("ix_tasktombstone_workspace_seq", "workspace_id", "seq"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    workspace_id: int
+    seq: int
+    deleted_at: datetime = Field(default_factory=_utcnow)
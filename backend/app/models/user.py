@@ -21,6 +21,8 @@ class User(UserBase, table=True):
     email_verified: bool = Field(default=False)
     verification_token: Optional[str] = Field(default=None, max_length=64)
     verification_token_expires: Optional[datetime] = None
+    # Last successful write request; reads stay on the primary for READ_YOUR_WRITES_SECONDS after it
+    last_write_at: Optional[datetime] = None
 
 
 class UserCreate(SQLModel):
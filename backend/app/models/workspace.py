@@ -23,6 +23,10 @@ class Workspace(SQLModel, table=True):
     description: Optional[str] = Field(default=None, max_length=255)
     owner_id: int = Field(sa_column=Column(Integer, ForeignKey("user.id"), nullable=False, index=True))
     created_at: datetime = Field(default_factory=_utcnow)
+    # Bumped on every task write in the workspace; task change feed sequence numbers come from here
+    data_version: int = Field(default=0)
+    # Bumped when the workspace, its columns, members or invites change; backs ETags on those reads
+    meta_version: int = Field(default=0)
 
 
 class WorkspaceMember(SQLModel, table=True):
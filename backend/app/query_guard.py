@@ -0,0 +1,61 @@
+"""Per-request SQL query budget and N+1 detection.
+
+``metrics_middleware`` counts every statement a request executes (see
+``metrics.RequestDBStats``) and hands the totals to ``check_request``, which
+flags requests that run more than ``DB_QUERY_BUDGET`` statements or repeat
+the same statement ``DB_N_PLUS_ONE_THRESHOLD`` times (the signature of a query
+in a loop). Flagged requests are logged, or raise ``QueryBudgetExceeded`` when
+``DB_QUERY_GUARD_RAISE`` is set, which tests use to turn regressions into
+failures. ``DB_DEBUG_HEADERS`` adds X-DB-Queries / X-DB-Time-Ms to responses.
+"""
+
+import logging
+import re
+
+from .config import settings
+from .metrics import RequestDBStats
+
+logger = logging.getLogger(__name__)
+
+# Expanded IN lists differ in length per call; collapse them so they group together.
+# Placeholders are matched explicitly, since psycopg2's %(name)s style contains parentheses.
+_PLACEHOLDER = r"(?:%\(\w+\)s|%s|\?|:\w+|\$\d+)"
+_IN_LIST = re.compile(rf"\bIN \(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more SQL than its budget, or the same statement in a loop."""
+
+
+def fingerprint(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def repeated_statements(stats: RequestDBStats, threshold: int) -> list[tuple[str, int]]:
+    """``(fingerprint, count)`` for statements run at least ``threshold`` times, most repeated first."""
+    counts: dict[str, int] = {}
+    for statement, count in stats.statements.items():
+        key = fingerprint(statement)
+        counts[key] = counts.get(key, 0) + count
+    return sorted(((sql, n) for sql, n in counts.items() if n >= threshold), key=lambda item: -item[1])
+
+
+def check_request(method: str, route: str, stats: RequestDBStats) -> None:
+    problems = []
+    budget = settings.DB_QUERY_BUDGET
+    if budget and stats.queries > budget:
+        problems.append(f"{stats.queries} queries (budget {budget})")
+    if settings.DB_N_PLUS_ONE_THRESHOLD:
+        for sql, count in repeated_statements(stats, settings.DB_N_PLUS_ONE_THRESHOLD):
+            problems.append(f"possible N+1, {count}x: {sql[:200]}")
+    if not problems:
+        return
+    message = f"{method} {route}: " + "; ".join(problems)
+    if settings.DB_QUERY_GUARD_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning("SQL query budget exceeded — %s", message)
+
+
+def debug_headers(stats: RequestDBStats) -> dict[str, str]:
+    return {"X-DB-Queries": str(stats.queries), "X-DB-Time-Ms": f"{stats.seconds * 1000:.1f}"}
@@ -0,0 +1,34 @@
+"""Route templates for metrics labels and span names.
+
+``/api/v1/tasks/{task_id}`` rather than the raw path, so label cardinality stays
+bounded. ``scope["route"]`` is the route as its router declared it; depending on
+the FastAPI version its ``path`` may or may not include the prefix given to
+``include_router``, and never includes the mount (``root_path``). The prefix is
+recovered as the part of the request path in front of what the route matched.
+"""
+
+from typing import Optional
+
+
+def _include_prefix(path: str, route) -> str:
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return ""
+    # Router prefixes are static, so try each "/" boundary until the rest matches the route
+    for i, char in enumerate(path):
+        if char == "/" and i and regex.match(path[i:]):
+            return path[:i]
+    return ""
+
+
+def route_template(scope) -> Optional[str]:
+    """The matched route's full template, or None if no route matched (404s, rejected WebSockets)."""
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    if not route_path:
+        return None
+    root_path = scope.get("root_path", "")
+    path = scope.get("path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return f"{root_path}{_include_prefix(path, route)}{route_path}"
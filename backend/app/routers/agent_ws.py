@@ -10,6 +10,7 @@ from jose import JWTError
 from sqlmodel import Session
 
 from ..auth import decode_access_token
+from .. import metrics, tracing
 from ..config import settings
 from ..database import engine
 from ..models.task import Task
@@ -206,7 +207,7 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
     # 2. Get API key
     bridge = get_agent_bridge()
     try:
-        api_key = await _ensure_api_key(bridge, user_id)
+        api_key = await bridge.ensure_user_api_key(user_id)
     except Exception as e:
         logger.error("Failed to get agent API key: %s", e)
         await ws.send_json({"type": "error", "message": "Agent service unavailable", "code": "SERVICE_UNAVAILABLE"})
@@ -228,6 +229,7 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
             upstream_url + upstream_params,
             open_timeout=10,
             close_timeout=5,
+            **tracing.websocket_connect_kwargs(),
         )
     except Exception as e:
         logger.error("Failed to connect to agents service: %s", e)
@@ -250,7 +252,8 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
                     original = data.get("content", "")
                     data["content"] = f"{context}\n{original}"
                     first_message = False
-                await upstream.send(json.dumps(data))
+                with tracing.span("agent_ws.send", **{"agent_ws.message_type": str(data.get("type"))}):
+                    await upstream.send(json.dumps(data))
         except WebSocketDisconnect:
             pass
         except Exception as e:
@@ -258,9 +261,10 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
 
     async def upstream_to_frontend():
         nonlocal session_saved
+        # Each message is handled inside its own span, covering any local tool run it triggers
+        messages = tracing.message_spans(upstream, "agent_ws.upstream_message")
         try:
-            async for raw in upstream:
-                msg = json.loads(raw)
+            async for msg in messages:
                 msg_type = msg.get("type")
 
                 # Intercept session_established to save session_id
@@ -337,8 +341,11 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
 
         except Exception as e:
             logger.debug("upstream_to_frontend ended: %s", e)
+        finally:
+            await messages.aclose()
 
     # Run both relay tasks concurrently
+    metrics.AGENT_WS_RELAYS.inc()
     try:
         done, pending = await asyncio.wait(
             [
@@ -350,6 +357,7 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
         for t in pending:
             t.cancel()
     finally:
+        metrics.AGENT_WS_RELAYS.dec()
         try:
             await upstream.close()
         except Exception:
@@ -358,54 +366,3 @@ async def agent_chat_ws(ws: WebSocket, task_id: int, token: str):
             await ws.close()
         except Exception:
             pass
-
-
-async def _ensure_api_key(bridge, user_id: int) -> str:
-    """Get or provision API key. Uses sync DB in thread + async httpx for provisioning."""
-    from ..models.agent_binding import AgentApiKey
-    from sqlmodel import select as sql_select
-
-    # In-memory cache
-    if user_id in bridge._key_cache:
-        return bridge._key_cache[user_id]
-
-    # Check DB in thread
-    def _check_db():
-        with Session(engine) as session:
-            record = session.exec(
-                sql_select(AgentApiKey).where(AgentApiKey.user_id == user_id)
-            ).first()
-            if record:
-                return bridge._decrypt(record.api_key_encrypted)
-            return None
-
-    cached = await asyncio.to_thread(_check_db)
-    if cached:
-        bridge._key_cache[user_id] = cached
-        return cached
-
-    # Provision via async httpx
-    if not settings.AGENTS_API_KEY:
-        raise RuntimeError("Agent service not configured")
-
-    import httpx
-    async with httpx.AsyncClient(base_url=settings.AGENTS_SERVICE_URL, timeout=30.0) as client:
-        resp = await client.post(
-            "/api/keys",
-            json={"user_id": bridge._agents_user_id(user_id), "name": f"taskme-user-{user_id}"},
-            headers={"X-API-Key": settings.AGENTS_API_KEY},
-        )
-        resp.raise_for_status()
-
-    raw_key = resp.json()["key"]
-
-    # Store in DB via thread
-    def _store_db():
-        with Session(engine) as session:
-            record = AgentApiKey(user_id=user_id, api_key_encrypted=bridge._encrypt(raw_key))
-            session.add(record)
-            session.commit()
-
-    await asyncio.to_thread(_store_db)
-    bridge._key_cache[user_id] = raw_key
-    return raw_key
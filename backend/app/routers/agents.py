@@ -10,6 +10,7 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from sqlmodel import Session, select
 
+from .. import tracing
 from ..config import settings
 from ..database import SessionDep, engine
 from ..dependencies import CurrentUserDep, get_workspace_member, require_editor
@@ -89,7 +90,7 @@ async def bind_agent(
 
     # Ensure user has an API key provisioned (lazy creation)
     bridge = get_agent_bridge()
-    await bridge.ensure_user_api_key(current_user.id, session)
+    await bridge.ensure_user_api_key(current_user.id)
 
     task.agent_id = body.agent_id
     task.agent_mode = body.mode
@@ -145,7 +146,7 @@ async def get_agent_status(
     if task.agent_session_id:
         bridge = get_agent_bridge()
         try:
-            api_key = await bridge.ensure_user_api_key(current_user.id, session)
+            api_key = await bridge.ensure_user_api_key(current_user.id)
             result.session_info = await bridge.get_session(api_key, task.agent_session_id)
         except Exception:
             pass
@@ -168,7 +169,7 @@ async def get_agent_messages(
         return []
 
     bridge = get_agent_bridge()
-    api_key = await bridge.ensure_user_api_key(current_user.id, session)
+    api_key = await bridge.ensure_user_api_key(current_user.id)
     return await bridge.get_session_messages(api_key, task.agent_session_id)
 
 
@@ -228,7 +229,7 @@ async def breakdown_task(
     task = _get_task(task_id, workspace_id, session)
 
     bridge = get_agent_bridge()
-    api_key = await bridge.ensure_user_api_key(current_user.id, session)
+    api_key = await bridge.ensure_user_api_key(current_user.id)
 
     # Build task context message
     parts = [
@@ -255,10 +256,10 @@ async def breakdown_task(
     created_subtasks = []
 
     try:
-        async with websockets.connect(upstream_url + upstream_params, open_timeout=10, close_timeout=5) as ws:
+        async with websockets.connect(upstream_url + upstream_params, open_timeout=10, close_timeout=5,
+                                      **tracing.websocket_connect_kwargs()) as ws:
             # Wait for session_established
-            raw = await asyncio.wait_for(ws.recv(), timeout=10)
-            msg = json.loads(raw)
+            msg = await tracing.recv_message(ws, timeout=10)
             if msg.get("type") != "session_established":
                 raise HTTPException(status_code=502, detail="Unexpected response from agent service")
 
@@ -272,11 +273,10 @@ async def breakdown_task(
             timeout_at = asyncio.get_event_loop().time() + 60  # 60s max
             while asyncio.get_event_loop().time() < timeout_at:
                 try:
-                    raw = await asyncio.wait_for(ws.recv(), timeout=30)
+                    msg = await tracing.recv_message(ws, timeout=30)
                 except asyncio.TimeoutError:
                     break
 
-                msg = json.loads(raw)
                 msg_type = msg.get("type")
 
                 # Handle tool approval request — auto-approve and wait for result
@@ -304,7 +304,8 @@ async def breakdown_task(
                                     results.append(st)
                                 db.commit()
                                 return results
-                        created_subtasks = await asyncio.to_thread(_create_from_approval)
+                        with tracing.span("breakdown.create_subtasks", count=len(subtasks_data)):
+                            created_subtasks = await asyncio.to_thread(_create_from_approval)
 
                     # Approve the tool so the workflow continues
                     await ws.send(json.dumps({
@@ -317,8 +318,7 @@ async def breakdown_task(
                     # Wait for completion
                     try:
                         while True:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=15)
-                            end_msg = json.loads(raw)
+                            end_msg = await tracing.recv_message(ws, timeout=15)
                             if end_msg.get("type") in ("end", "error"):
                                 break
                     except (asyncio.TimeoutError, Exception):
@@ -349,7 +349,8 @@ async def breakdown_task(
                             db.commit()
                             return results
 
-                    created_subtasks = await asyncio.to_thread(_create_subtasks)
+                    with tracing.span("breakdown.create_subtasks", count=len(subtasks_data)):
+                        created_subtasks = await asyncio.to_thread(_create_subtasks)
 
                     # Send tool result back so agent completes cleanly
                     await ws.send(json.dumps({
@@ -364,8 +365,7 @@ async def breakdown_task(
                     # Wait briefly for agent to finish
                     try:
                         while True:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=10)
-                            end_msg = json.loads(raw)
+                            end_msg = await tracing.recv_message(ws, timeout=10)
                             if end_msg.get("type") == "end":
                                 break
                     except (asyncio.TimeoutError, Exception):
@@ -427,3 +427,10 @@ async def trigger_scanner(_: CurrentUserDep):
     from ..services.followup_scanner import scan_once
     asyncio.create_task(scan_once())
     return {"status": "scanner triggered"}
+
+
+@router.get("/scanner/stats")
+async def scanner_stats(_: CurrentUserDep):
+    """Follow-up scanner metrics: last scan duration/throughput and running totals."""
+    from ..services.followup_scanner import get_scanner_metrics
+    return get_scanner_metrics()
@@ -49,38 +49,35 @@ def _accept_pending_invites(session, user):
                 func.lower(WorkspaceInvite.email) == func.lower(user.email)
             )
         ).all()
+        if not invites:
+            return
+        # One lookup for every invited workspace instead of one per invite
+        member_of = set(session.exec(
+            select(WorkspaceMember.workspace_id).where(
+                WorkspaceMember.user_id == user.id,
+                WorkspaceMember.workspace_id.in_(list({invite.workspace_id for invite in invites})),
+            )
+        ).all())
+        now = datetime.now(timezone.utc)
+        accepted = []
         for invite in invites:
+            session.delete(invite)
             if invite.expires_at:
                 exp = invite.expires_at if invite.expires_at.tzinfo else invite.expires_at.replace(tzinfo=timezone.utc)
-                if exp < datetime.now(timezone.utc):
-                    session.delete(invite)
-                    session.commit()
+                if exp < now:
                     continue
-
-            existing = session.exec(
-                select(WorkspaceMember).where(
-                    WorkspaceMember.workspace_id == invite.workspace_id,
-                    WorkspaceMember.user_id == user.id,
-                )
-            ).first()
-            if existing:
-                session.delete(invite)
-                session.commit()
+            if invite.workspace_id in member_of:
                 continue
-
-            ws_id = invite.workspace_id
-            role = invite.role
-            inviter = invite.inviter_id
-
-            member = WorkspaceMember(
-                workspace_id=ws_id,
+            member_of.add(invite.workspace_id)
+            session.add(WorkspaceMember(
+                workspace_id=invite.workspace_id,
                 user_id=user.id,
-                role=role,
-                inviter_id=inviter,
-            )
-            session.add(member)
-            session.delete(invite)
-            session.commit()
+                role=invite.role,
+                inviter_id=invite.inviter_id,
+            ))
+            accepted.append((invite.workspace_id, invite.role))
+        session.commit()
+        for ws_id, role in accepted:
             seed_core_columns_for_workspace(session, ws_id, user.id)
             logger.info("Auto-accepted invite: user %s added to workspace %d as %s", user.email, ws_id, role)
     except Exception as e:
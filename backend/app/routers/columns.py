@@ -2,12 +2,13 @@ import json
 import re
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy import or_
 from sqlmodel import select
 
 from ..database import SessionDep
 from ..dependencies import CurrentUserDep
+from ..etags import conditional_response, weak_etag
 from ..models.column_config import (
     ColumnConfig,
     ColumnConfigCreate,
@@ -15,6 +16,8 @@ from ..models.column_config import (
     ColumnConfigUpdate,
 )
 from ..models.workspace import WorkspaceMember
+from ..services.llm_service import invalidate_custom_fields_cache
+from ..services.workspace_versions import meta_versions
 
 router = APIRouter(prefix="/columns", tags=["columns"])
 
@@ -42,9 +45,22 @@ def _user_owns_column(col, user_id: int, ws_ids: list[int]) -> bool:
     return False
 
 
+def _invalidate_prompt_cache(col) -> None:
+    """Evict memoized parse-prompt custom field rules for the column's scope."""
+    if col.workspace_id:
+        invalidate_custom_fields_cache(("workspace", col.workspace_id))
+    if col.user_id:
+        invalidate_custom_fields_cache(("user", col.user_id))
+
+
 @router.get("", response_model=list[ColumnConfigPublic])
-def list_columns(session: SessionDep, current_user: CurrentUserDep, workspace_id: Optional[int] = None):
+def list_columns(request: Request, response: Response, session: SessionDep, current_user: CurrentUserDep, workspace_id: Optional[int] = None):
     if workspace_id:
+        meta_version = meta_versions(session, [workspace_id]).get(workspace_id)
+        if meta_version is not None:
+            not_modified = conditional_response(request, response, weak_etag("columns", workspace_id, meta_version))
+            if not_modified is not None:
+                return not_modified
         statement = select(ColumnConfig).where(ColumnConfig.workspace_id == workspace_id).order_by(ColumnConfig.position)
     else:
         statement = select(ColumnConfig).where(ColumnConfig.user_id == current_user.id).order_by(ColumnConfig.position)
@@ -109,17 +125,20 @@ def create_column(col_in: ColumnConfigCreate, session: SessionDep, current_user:
     session.add(col)
     session.commit()
     session.refresh(col)
+    _invalidate_prompt_cache(col)
     return col
 
 
 @router.patch("/reorder", response_model=list[ColumnConfigPublic])
 def reorder_columns(items: list[dict], session: SessionDep, current_user: CurrentUserDep, workspace_id: Optional[int] = None):
     ws_ids = _user_workspace_ids(session, current_user.id)
-    for item in items:
-        col = session.get(ColumnConfig, item["id"])
-        if col and _user_owns_column(col, current_user.id, ws_ids):
-            col.position = item["position"]
+    positions = {item["id"]: item["position"] for item in items}
+    cols = session.exec(select(ColumnConfig).where(ColumnConfig.id.in_(list(positions)))).all() if positions else []
+    for col in cols:
+        if _user_owns_column(col, current_user.id, ws_ids):
+            col.position = positions[col.id]
             session.add(col)
+            _invalidate_prompt_cache(col)
     session.commit()
 
     if workspace_id:
@@ -153,6 +172,7 @@ def update_column(col_id: int, col_in: ColumnConfigUpdate, session: SessionDep,
     session.add(col)
     session.commit()
     session.refresh(col)
+    _invalidate_prompt_cache(col)
     return col
 
 
@@ -165,6 +185,7 @@ def delete_column(col_id: int, session: SessionDep, current_user: CurrentUserDep
     if col.is_core:
         raise HTTPException(status_code=400, detail="Cannot delete core column")
 
+    _invalidate_prompt_cache(col)
     session.delete(col)
     session.commit()
     return {"ok": True}
@@ -5,8 +5,7 @@ from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
 from sqlmodel import select
 
-from ..database import SessionDep
-from ..dependencies import CurrentUserDep, get_workspace_member
+from ..dependencies import CurrentUserDep, ReadSessionDep, get_workspace_member
 from ..models.column_config import ColumnConfig
 from ..models.task import Task, TaskPriority, TaskStatus
 from ..services.export_service import generate_excel
@@ -16,7 +15,7 @@ router = APIRouter(prefix="/export", tags=["export"])
 
 @router.get("/excel")
 def export_excel(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     workspace_id: int = Query(...),
     status: Optional[TaskStatus] = None,
@@ -1,14 +1,16 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 from sqlmodel import select
 
 from ..database import SessionDep, seed_core_columns_for_workspace
-from ..dependencies import CurrentUserDep, get_workspace_member, require_owner
+from ..dependencies import CurrentUserDep, ReadSessionDep, get_workspace_member, require_owner
+from ..etags import conditional_response, weak_etag
 from ..models.user import User
 from ..models.workspace import WorkspaceMember, WorkspaceInvite, WorkspaceRole
+from ..services.workspace_versions import meta_versions
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["members"])
@@ -38,25 +40,31 @@ class InvitePublic(BaseModel):
 
 
 @router.get("/workspaces/{workspace_id}/members")
-def list_members(workspace_id: int, session: SessionDep, current_user: CurrentUserDep):
+def list_members(workspace_id: int, request: Request, response: Response, session: ReadSessionDep, current_user: CurrentUserDep):
     get_workspace_member(workspace_id, session, current_user)
-    memberships = session.exec(
-        select(WorkspaceMember).where(
+    meta_version = meta_versions(session, [workspace_id])[workspace_id]
+    not_modified = conditional_response(request, response, weak_etag("members", workspace_id, meta_version))
+    if not_modified is not None:
+        return not_modified
+
+    rows = session.exec(
+        select(WorkspaceMember, User)
+        .join(User, User.id == WorkspaceMember.user_id)
+        .where(
             WorkspaceMember.workspace_id == workspace_id,
             WorkspaceMember.status == "accepted",
         )
     ).all()
-    members = []
-    for m in memberships:
-        user = session.get(User, m.user_id)
-        if user:
-            members.append({
-                "user_id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": m.role,
-                "joined_at": m.joined_at.isoformat() if m.joined_at else None,
-            })
+    members = [
+        {
+            "user_id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "role": m.role,
+            "joined_at": m.joined_at.isoformat() if m.joined_at else None,
+        }
+        for m, user in rows
+    ]
 
     invites = session.exec(
         select(WorkspaceInvite).where(WorkspaceInvite.workspace_id == workspace_id)
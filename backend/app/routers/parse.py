@@ -1,13 +1,19 @@
+import json
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from sqlmodel import select
 
+from ..config import settings
 from ..database import SessionDep
 from ..dependencies import CurrentUserDep
 from ..models.column_config import ColumnConfig
-from ..services.llm_service import parse_natural_language
+from ..models.parse_batch import ParseBatch
+from ..services.batch_parse_service import empty_indexes, get_offline_batch, parse_batch, submit_offline_batch
+from ..services.llm_router import get_llm_router
+from ..services.llm_service import cached_custom_fields_spec, parse_natural_language, store_custom_fields_spec
+from ..services.workspace_versions import meta_versions
 
 router = APIRouter(prefix="/parse", tags=["parse"])
 
@@ -19,16 +25,33 @@ class ParseRequest(BaseModel):
     workspace_id: Optional[int] = None
 
 
-@router.post("")
-def parse_text(body: ParseRequest, session: SessionDep, current_user: CurrentUserDep):
-    if not body.text.strip():
-        raise HTTPException(status_code=400, detail="Text cannot be empty")
+class ParseBatchRequest(BaseModel):
+    texts: list[str]
+    provider: Optional[str] = None
+    tone: Optional[str] = None
+    workspace_id: Optional[int] = None
+    mode: str = "sync"  # sync | offline
+
 
-    # Fetch custom columns so LLM knows about them (scoped to workspace or user)
-    if body.workspace_id:
-        col_filter = ColumnConfig.workspace_id == body.workspace_id
+def _custom_fields_spec(session, workspace_id: Optional[int], current_user) -> tuple[list[dict], tuple]:
+    """Fetch custom columns so LLM knows about them (scoped to workspace or user).
+
+    Returns (spec, cache_key) — cache_key identifies the scope for prompt memoization.
+    A workspace's spec is cached against its meta_version, so repeat requests read
+    one workspace row instead of its columns.
+    """
+    version = None
+    if workspace_id:
+        col_filter = ColumnConfig.workspace_id == workspace_id
+        cache_key = ("workspace", workspace_id)
+        version = meta_versions(session, [workspace_id]).get(workspace_id)
+        if version is not None:
+            cached = cached_custom_fields_spec(cache_key, version)
+            if cached is not None:
+                return cached, cache_key
     else:
         col_filter = ColumnConfig.user_id == current_user.id
+        cache_key = ("user", current_user.id)
     custom_cols = session.exec(
         select(ColumnConfig)
         .where(col_filter, ColumnConfig.is_core == False, ColumnConfig.is_visible == True)
@@ -39,11 +62,83 @@ def parse_text(body: ParseRequest, session: SessionDep, current_user: CurrentUse
          "options": c.options}
         for c in custom_cols
     ]
+    if version is not None:
+        store_custom_fields_spec(cache_key, version, custom_fields_spec)
+    return custom_fields_spec, cache_key
+
+
+@router.post("")
+def parse_text(body: ParseRequest, session: SessionDep, current_user: CurrentUserDep):
+    if not body.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+
+    custom_fields_spec, cache_key = _custom_fields_spec(session, body.workspace_id, current_user)
 
     try:
-        tasks = parse_natural_language(body.text, body.provider, custom_fields_spec, tone=body.tone)
+        tasks = parse_natural_language(body.text, body.provider, custom_fields_spec, tone=body.tone, cache_key=cache_key)
         return {"tasks": tasks}
     except Exception as e:
         import logging
         logging.getLogger(__name__).exception("LLM parsing failed")
         raise HTTPException(status_code=500, detail="LLM parsing failed. Please try again later.")
+
+
+@router.post("/batch")
+def parse_text_batch(body: ParseBatchRequest, session: SessionDep, current_user: CurrentUserDep):
+    """Parse many independent texts. Results keep input order; failures (including
+    blank texts) are reported per item in both modes.
+
+    mode="offline" submits to the provider's Batch API instead and returns a batch_id
+    to poll via GET /parse/batch/{batch_id}.
+    """
+    empty = empty_indexes(body.texts)
+    if len(empty) == len(body.texts):
+        raise HTTPException(status_code=400, detail="texts cannot be empty")
+    if len(body.texts) > settings.PARSE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PARSE_BATCH_MAX_ITEMS} texts per batch")
+    if body.mode not in ("sync", "offline"):
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'offline'")
+
+    # Loaded once and shared by every item in the batch
+    custom_fields_spec, cache_key = _custom_fields_spec(session, body.workspace_id, current_user)
+
+    if body.mode == "sync":
+        results = parse_batch(body.texts, body.provider, custom_fields_spec, tone=body.tone, cache_key=cache_key)
+        return {"results": results}
+
+    try:
+        submitted = submit_offline_batch(body.texts, body.provider, custom_fields_spec, tone=body.tone, cache_key=cache_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        import logging
+        logging.getLogger(__name__).exception("Offline batch submission failed")
+        raise HTTPException(status_code=502, detail="Failed to submit batch. Please try again later.")
+
+    # Batch ids are provider-wide, so only the submitter may poll one
+    session.add(ParseBatch(batch_id=submitted["batch_id"], provider=submitted["provider"],
+                           user_id=current_user.id, empty_indexes=json.dumps(empty)))
+    session.commit()
+    return submitted
+
+
+@router.get("/batch/{batch_id}")
+def get_parse_batch(batch_id: str, session: SessionDep, current_user: CurrentUserDep):
+    """Poll an offline parse batch; includes results once the provider has finished."""
+    batch = session.get(ParseBatch, batch_id)
+    if not batch or batch.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    try:
+        return get_offline_batch(batch_id, batch.provider, json.loads(batch.empty_indexes))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        import logging
+        logging.getLogger(__name__).exception("Offline batch lookup failed")
+        raise HTTPException(status_code=502, detail="Failed to fetch batch. Please try again later.")
+
+
+@router.get("/providers")
+def provider_metrics(current_user: CurrentUserDep):
+    """Per-provider latency percentiles, error rates and circuit breaker state."""
+    return {"providers": get_llm_router().snapshot()}
@@ -13,7 +13,7 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 from ..database import SessionDep
-from ..dependencies import CurrentUserDep, require_editor
+from ..dependencies import CurrentUserDep, PublicReadSessionDep, require_editor
 from ..models.share import SharedList
 from ..models.task import Task, TaskPublic
 
@@ -105,11 +105,17 @@ async def send_share_email(req: ShareEmailRequest, session: SessionDep, current_
 
 
 @router.get("/{token}", response_model=list[TaskPublic])
-def get_shared_tasks(token: str, session: SessionDep):
+def get_shared_tasks(token: str, session: PublicReadSessionDep, primary: SessionDep):
     try:
         shared = session.exec(
             select(SharedList).where(SharedList.share_token == token)
         ).first()
+        if not shared and session is not primary:
+            # A link opened right after it was created may not have reached the replica yet
+            session = primary
+            shared = session.exec(
+                select(SharedList).where(SharedList.share_token == token)
+            ).first()
         if not shared:
             raise HTTPException(status_code=404, detail="Share link not found")
         if shared.expires_at:
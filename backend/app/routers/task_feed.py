@@ -0,0 +1,124 @@
+"""WebSocket task change feed — pushes per-workspace task diffs to the frontend."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from jose import JWTError
+from sqlmodel import Session, select
+
+from .. import database
+from ..auth import decode_access_token
+from ..config import settings
+from ..models.task import TaskPublic
+from ..models.workspace import Workspace, WorkspaceMember
+from ..services.task_feed import changes_since, get_task_feed
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["task-feed"])
+
+
+def _authorize(token: str, workspace_id: int) -> Optional[int]:
+    """Return the workspace's data_version if the token's user is a member, else None."""
+    try:
+        user_id = decode_access_token(token).get("user_id")
+    except JWTError:
+        return None
+    if not user_id:
+        return None
+    with Session(database.engine) as session:
+        member = session.exec(
+            select(WorkspaceMember).where(
+                WorkspaceMember.workspace_id == workspace_id,
+                WorkspaceMember.user_id == user_id,
+                WorkspaceMember.status == "accepted",
+            )
+        ).first()
+        if not member:
+            return None
+        return _data_version(session, workspace_id)
+
+
+def _data_version(session: Session, workspace_id: int) -> int:
+    return session.exec(select(Workspace.data_version).where(Workspace.id == workspace_id)).one()
+
+
+def _current_version(workspace_id: int) -> int:
+    with Session(database.engine) as session:
+        return _data_version(session, workspace_id)
+
+
+def _load_changes(workspace_id: int, since: int) -> dict:
+    with Session(database.engine) as session:
+        result = changes_since(session, workspace_id, since, settings.TASK_FEED_CATCH_UP_LIMIT)
+        result["tasks"] = [TaskPublic.model_validate(t).model_dump(mode="json") for t in result["tasks"]]
+        return result
+
+
+@router.websocket("/ws/task-feed")
+async def task_feed_ws(ws: WebSocket, workspace_id: int, token: str, since: Optional[int] = None):
+    """Stream task changes for a workspace.
+
+    Messages: ``{"type": "hello", "seq"}`` on connect, then
+    ``{"type": "task_change", "seq", "op", "task_id", "task"|"changes"}`` per write.
+    Gaps the in-memory buffer can't cover (reconnects, slow consumers, writes
+    from other worker processes) arrive as ``{"type": "changes", "seq", "tasks",
+    "deleted", "has_more"}`` read from the database. Reconnect with ``since=<last seq>``.
+    """
+    current = await asyncio.to_thread(_authorize, token, workspace_id)
+    if current is None:
+        await ws.close(code=4004, reason="Workspace not found or access denied")
+        return
+    await ws.accept()
+
+    feed = get_task_feed()
+    last_seq = current if since is None else since
+    sub, backlog = feed.subscribe(workspace_id, last_seq, current)
+
+    async def catch_up():
+        nonlocal last_seq
+        while True:
+            result = await asyncio.to_thread(_load_changes, workspace_id, last_seq)
+            await ws.send_json({"type": "changes", **result})
+            last_seq = result["seq"]
+            if not result["has_more"]:
+                return
+
+    try:
+        await ws.send_json({"type": "hello", "seq": current})
+        if backlog is None:
+            await catch_up()
+        else:
+            for evt in backlog:
+                await ws.send_json({"type": "task_change", **evt})
+                last_seq = max(last_seq, evt["seq"])
+
+        while True:
+            try:
+                evt = await asyncio.wait_for(sub.queue.get(), timeout=settings.TASK_FEED_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # Writes from other worker processes don't reach this feed — catch them by version
+                if sub.queue.empty() and await asyncio.to_thread(_current_version, workspace_id) > last_seq:
+                    await catch_up()
+                continue
+            if sub.lagged:
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.lagged = False
+                await catch_up()
+                continue
+            if evt["seq"] <= last_seq:
+                continue
+            await ws.send_json({"type": "task_change", **evt})
+            last_seq = evt["seq"]
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.debug("Task feed for workspace %d ended: %s", workspace_id, e)
+    finally:
+        feed.unsubscribe(sub)
+        try:
+            await ws.close()
+        except Exception:
+            pass
@@ -1,16 +1,25 @@
 import json
 import logging
+from contextlib import contextmanager
 from datetime import date, datetime, timezone
+from types import SimpleNamespace
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import Text, case, cast, func, literal, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import col, select
 
 logger = logging.getLogger(__name__)
 
+from ..config import settings
 from ..database import SessionDep
-from ..dependencies import CurrentUserDep, get_workspace_member, require_editor
+from ..dependencies import CurrentUserDep, ReadSessionDep, get_workspace_member, require_editor
+from ..etags import conditional_response, weak_etag
+from ..fast_json import FastJSONResponse, model_columns, projected_model, rows_as_dicts
 from ..models.task import (
     Task,
     TaskCreate,
@@ -18,14 +27,29 @@ from ..models.task import (
     TaskPublic,
     TaskStatus,
     TaskUpdate,
+    compute_stalls_at,
 )
+from ..models.workspace import Workspace
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+MAX_BULK_UPDATE = 1000
+
+
+def _parse_fields(fields: str) -> tuple[str, ...]:
+    """``fields=task_name,status`` as the TaskPublic field names to return; ``id`` is always included."""
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - TaskPublic.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {sorted(unknown)}")
+    return tuple(name for name in TaskPublic.model_fields if name in requested or name == "id")
+
 
 @router.get("", response_model=list[TaskPublic])
 def list_tasks(
-    session: SessionDep,
+    request: Request,
+    response: Response,
+    session: ReadSessionDep,
     current_user: CurrentUserDep,
     workspace_id: int = Query(...),
     status: Optional[TaskStatus] = None,
@@ -40,10 +64,26 @@ def list_tasks(
     order: Optional[str] = Query(default="desc"),
     offset: int = 0,
     limit: int = Query(default=100, le=500),
+    fields: Optional[str] = Query(default=None, description="Comma-separated TaskPublic fields to return"),
 ):
     # Verify workspace membership (any role can read)
     get_workspace_member(workspace_id, session, current_user)
-    statement = select(Task).where(Task.workspace_id == workspace_id)
+    projection = _parse_fields(fields) if fields else None
+    # Any task write bumps data_version, so it plus the query string identifies the result
+    data_version = session.exec(select(Workspace.data_version).where(Workspace.id == workspace_id)).one()
+    etag = weak_etag("tasks", workspace_id, data_version, sorted(request.query_params.multi_items()))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    fast = settings.TASK_LIST_FAST_JSON
+    # Fast path: only TaskPublic's columns as row tuples, encoded without revalidation.
+    # A sparse fieldset always selects row tuples, limited to the requested columns.
+    if fast or projection:
+        statement = select(*model_columns(Task, TaskPublic, projection))
+    else:
+        statement = select(Task)
+    statement = statement.where(Task.workspace_id == workspace_id)
 
     if status:
         statement = statement.where(Task.status == status)
@@ -87,10 +127,39 @@ def list_tasks(
         statement = statement.order_by(sort_column.desc())
 
     statement = statement.offset(offset).limit(limit)
+    if fast:
+        # A returned Response bypasses the injected one, so carry its ETag/Cache-Control over
+        return FastJSONResponse(rows_as_dicts(session.exec(statement)), headers=response.headers)
+    if projection:
+        # The trimmed model would fail list[TaskPublic] validation, so encode it here
+        adapter = TypeAdapter(list[projected_model(TaskPublic, projection)])
+        tasks = adapter.validate_python(rows_as_dicts(session.exec(statement)))
+        return Response(adapter.dump_json(tasks), media_type="application/json", headers=response.headers)
     tasks = session.exec(statement).all()
     return tasks
 
 
+class TaskChanges(BaseModel):
+    seq: int
+    tasks: list[TaskPublic]
+    deleted: list[int]
+    has_more: bool
+
+
+@router.get("/changes", response_model=TaskChanges)
+def list_task_changes(
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    workspace_id: int = Query(...),
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=2000),
+):
+    """Tasks created/updated and ids deleted since the ``since`` token. Pass the returned ``seq`` next time."""
+    get_workspace_member(workspace_id, session, current_user)
+    from ..services.task_feed import changes_since
+    return changes_since(session, workspace_id, since, limit)
+
+
 class SmartSearchRequest(BaseModel):
     query: str = Field(..., max_length=500)
     provider: Optional[str] = None
@@ -191,9 +260,20 @@ def _get_task_with_access(task_id: int, session: SessionDep, current_user: Curre
 
 
 @router.get("/{task_id}", response_model=TaskPublic)
-def get_task(task_id: int, session: SessionDep, current_user: CurrentUserDep):
-    task, _member = _get_task_with_access(task_id, session, current_user)
-    return task
+def get_task(task_id: int, request: Request, response: Response, session: SessionDep, current_user: CurrentUserDep):
+    # Revalidation only needs the task's version, not the row itself
+    row = session.exec(select(Task.workspace_id, Task.version).where(Task.id == task_id)).first()
+    if not row or not row.workspace_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        get_workspace_member(row.workspace_id, session, current_user)
+    except HTTPException:
+        raise HTTPException(status_code=404, detail="Task not found")
+    # Strong ETag: the same value works for If-Match on PATCH
+    not_modified = conditional_response(request, response, f'"{row.version}"')
+    if not_modified is not None:
+        return not_modified
+    return session.get(Task, task_id)
 
 
 @router.post("", response_model=TaskPublic, status_code=201)
@@ -224,28 +304,232 @@ def create_bulk_tasks(tasks_in: list[TaskCreate], session: SessionDep, current_u
     return tasks
 
 
+def _parse_if_match(if_match: str) -> Optional[int]:
+    """Expected task version from an If-Match header (``"3"``); None for ``*``."""
+    if if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail='If-Match must be a task version, e.g. "3"')
+
+
+def _claim_version(session, task_id: int, expected: int) -> None:
+    """Compare-and-swap guard: lock the row if it is still at ``expected``, else 412.
+
+    The no-op UPDATE takes the row's write lock for the rest of the transaction,
+    so no other writer can slip in between this check and our commit. Callers
+    lock the workspace row first (``task_feed.lock_workspace``), keeping the
+    workspace-then-task lock order of the flush hook.
+    """
+    table = Task.__table__
+    claimed = session.connection().execute(
+        update(table).where(table.c.id == task_id, table.c.version == expected).values(version=table.c.version)
+    ).rowcount
+    if not claimed:
+        raise HTTPException(status_code=412, detail="Task was modified by someone else; reload and retry")
+
+
+def _merge_custom_fields_expr(session, incoming: dict):
+    """SQL expression merging ``incoming`` into the stored custom_fields JSON in place (no read round trip).
+
+    Same result as ``stored.update(incoming)`` on both backends: top-level keys are
+    replaced whole (no deep merge) and null values are stored as null.
+    """
+    stored = func.coalesce(Task.__table__.c.custom_fields, "{}")
+    patch = json.dumps(incoming)
+    if session.get_bind().dialect.name == "postgresql":
+        return cast(cast(stored, JSONB).op("||")(cast(patch, JSONB)), Text)
+    # SQLite's json_patch is RFC 7396 (deep, null deletes), so rebuild the object from json_each rows instead
+    old = func.json_each(stored).table_valued("key", "value", "type").alias("old")
+    new = func.json_each(literal(patch)).table_valued("key", "value", "type").alias("new")
+    rows = union_all(
+        select(old.c.key, old.c.value, old.c.type).where(old.c.key.not_in(select(new.c.key))),
+        select(new.c.key, new.c.value, new.c.type),
+    ).subquery("merged")
+    # json_each returns booleans as 0/1 and nested values as text; turn them back into JSON
+    value = case(
+        (rows.c.type == "true", func.json("true")),
+        (rows.c.type == "false", func.json("false")),
+        (rows.c.type.in_(["object", "array"]), func.json(rows.c.value)),
+        else_=rows.c.value,
+    )
+    return select(func.json_group_object(rows.c.key, value)).scalar_subquery()
+
+
+@contextmanager
+def _invalid_stored_custom_fields(session):
+    """Stored custom_fields that isn't JSON makes the merge fail in the database; answer 400 as before, not 500."""
+    try:
+        yield
+    except DBAPIError as e:
+        message = str(e.orig).lower()
+        if "malformed json" not in message and "invalid input syntax for type json" not in message:
+            raise
+        session.rollback()
+        raise HTTPException(status_code=400, detail="Invalid JSON in custom_fields")
+
+
+class TaskBulkItem(TaskUpdate):
+    id: int
+
+
+class BulkTaskUpdate(BaseModel):
+    """Either one ``update`` applied to every task in ``ids``, or per-task ``updates``."""
+    ids: Optional[list[int]] = Field(default=None, max_length=MAX_BULK_UPDATE)
+    update: Optional[TaskUpdate] = None
+    updates: Optional[list[TaskBulkItem]] = Field(default=None, max_length=MAX_BULK_UPDATE)
+
+
+def _bulk_changes(body: BulkTaskUpdate) -> dict[int, dict]:
+    """``{task_id: fields to set}`` from either request shape."""
+    if body.updates is not None and body.ids is None and body.update is None:
+        changes = {}
+        for item in body.updates:
+            changes.setdefault(item.id, {}).update(item.model_dump(exclude_unset=True, exclude={"id"}))
+        return changes
+    if body.ids is not None and body.update is not None and body.updates is None:
+        fields = body.update.model_dump(exclude_unset=True)
+        return {task_id: dict(fields) for task_id in body.ids}
+    raise HTTPException(status_code=400, detail="Send either ids + update, or updates")
+
+
+def _parse_custom_fields(raw: str) -> dict:
+    try:
+        incoming = json.loads(raw)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in custom_fields")
+    if not isinstance(incoming, dict):
+        raise HTTPException(status_code=400, detail="custom_fields must be a JSON object")
+    return incoming
+
+
+@router.patch("/bulk", response_model=list[TaskPublic])
+def update_bulk_tasks(body: BulkTaskUpdate, session: SessionDep, current_user: CurrentUserDep):
+    """Update many tasks in one transaction, checking access once per workspace.
+
+    Like _save_nudges, the writes are bulk statements rather than ORM flushes,
+    so stalls_at, change_seq, version and the feed events are set here.
+    """
+    from ..models.workspace import WorkspaceMember
+    from ..services import task_feed
+
+    changes = _bulk_changes(body)
+    if not changes:
+        return []
+    custom_fields = {
+        task_id: _parse_custom_fields(fields.pop("custom_fields"))
+        for task_id, fields in changes.items()
+        if fields.get("custom_fields") is not None
+    }
+
+    rows = session.exec(
+        select(Task.id, Task.workspace_id, Task.status, Task.parent_task_id, Task.agent_nudge_at)
+        .where(col(Task.id).in_(list(changes)))
+    ).all()
+    roles = dict(session.exec(
+        select(WorkspaceMember.workspace_id, WorkspaceMember.role).where(
+            WorkspaceMember.user_id == current_user.id,
+            WorkspaceMember.status == "accepted",
+            col(WorkspaceMember.workspace_id).in_({row.workspace_id for row in rows if row.workspace_id}),
+        )
+    ).all())
+    rows = [row for row in rows if row.workspace_id in roles]
+    if len(rows) != len(changes):
+        raise HTTPException(status_code=404, detail="Task not found")
+    if any(roles[row.workspace_id] == "viewer" for row in rows):
+        raise HTTPException(status_code=403, detail="Editor access required")
+
+    by_workspace: dict[int, list] = {}
+    for row in rows:
+        by_workspace.setdefault(row.workspace_id, []).append(row)
+    # Workspace rows before task rows, the lock order every write path uses (see task_feed)
+    first_seq = {
+        ws_id: task_feed.reserve_seqs(session, ws_id, len(ws_rows)) for ws_id, ws_rows in sorted(by_workspace.items())
+    }
+
+    table = Task.__table__
+    ids = list(changes)
+    session.connection().execute(
+        update(table).where(table.c.id.in_(ids)).values(version=table.c.version + 1)
+    )
+    with _invalid_stored_custom_fields(session):
+        if body.update is not None and custom_fields:
+            session.connection().execute(
+                update(table).where(table.c.id.in_(ids))
+                .values(custom_fields=_merge_custom_fields_expr(session, next(iter(custom_fields.values()))))
+            )
+        else:
+            for task_id, incoming in custom_fields.items():
+                session.connection().execute(
+                    update(table).where(table.c.id == task_id)
+                    .values(custom_fields=_merge_custom_fields_expr(session, incoming))
+                )
+    stored = dict(session.connection().execute(
+        select(table.c.id, table.c.custom_fields).where(table.c.id.in_(list(custom_fields)))
+    ).all()) if custom_fields else {}
+
+    now = datetime.now(timezone.utc)
+    updates, events = [], []
+    for workspace_id, ws_rows in by_workspace.items():
+        seq = first_seq[workspace_id]
+        for row in ws_rows:
+            fields = changes[row.id]
+            after = SimpleNamespace(**{**row._mapping, "updated_at": now, **fields})
+            updates.append({"id": row.id, **fields, "updated_at": now,
+                            "stalls_at": compute_stalls_at(after), "change_seq": seq})
+            evt_changes = {**fields, "updated_at": now}
+            if row.id in stored:
+                evt_changes["custom_fields"] = stored[row.id]
+            events.append({"workspace_id": workspace_id, "seq": seq, "op": "update", "task_id": row.id,
+                           "changes": evt_changes})
+            seq += 1
+    # One executemany (grouped by key set) for the plain columns
+    session.execute(update(Task), updates)
+    task_feed.queue_events(session, [{**evt, "changes": jsonable_encoder(evt["changes"])} for evt in events])
+    session.commit()
+
+    return session.exec(
+        select(Task).where(col(Task.id).in_(ids)).order_by(Task.id).execution_options(populate_existing=True)
+    ).all()
+
+
 @router.patch("/{task_id}", response_model=TaskPublic)
-def update_task(task_id: int, task_in: TaskUpdate, session: SessionDep, current_user: CurrentUserDep):
+def update_task(
+    task_id: int,
+    task_in: TaskUpdate,
+    response: Response,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    if_match: Optional[str] = Header(default=None),
+):
     task, member = _get_task_with_access(task_id, session, current_user)
     if member.role == "viewer":
         raise HTTPException(status_code=403, detail="Editor access required")
     update_data = task_in.model_dump(exclude_unset=True)
 
-    # Merge custom_fields instead of replacing
+    expected = _parse_if_match(if_match) if if_match else None
+    if expected is not None:
+        if task.version != expected:
+            raise HTTPException(status_code=412, detail="Task was modified by someone else; reload and retry")
+        from ..services import task_feed
+
+        # The claim locks the task row, so take the workspace row first like every other write path
+        task_feed.lock_workspace(session, task.workspace_id)
+        _claim_version(session, task_id, expected)
+
+    # Merge custom_fields in the database instead of read-modify-write, so concurrent edits to different keys both land
     if "custom_fields" in update_data and update_data["custom_fields"] is not None:
-        try:
-            existing_cf = json.loads(task.custom_fields or "{}")
-            incoming_cf = json.loads(update_data["custom_fields"])
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON in custom_fields")
-        existing_cf.update(incoming_cf)
-        update_data["custom_fields"] = json.dumps(existing_cf)
+        incoming_cf = _parse_custom_fields(update_data["custom_fields"])
+        update_data["custom_fields"] = _merge_custom_fields_expr(session, incoming_cf)
 
     task.sqlmodel_update(update_data)
     task.updated_at = datetime.now(timezone.utc)
     session.add(task)
-    session.commit()
+    with _invalid_stored_custom_fields(session):
+        session.commit()
     session.refresh(task)
+    response.headers["ETag"] = f'"{task.version}"'
     return task
 
 
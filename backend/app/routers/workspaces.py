@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from sqlmodel import select
 
 from ..database import SessionDep, seed_core_columns_for_workspace
-from ..dependencies import CurrentUserDep, require_owner
+from ..dependencies import CurrentUserDep, ReadSessionDep, require_owner
+from ..etags import conditional_response, weak_etag
 from ..models.workspace import Workspace, WorkspaceMember, WorkspaceCreate, WorkspaceUpdate, WorkspacePublic
+from ..services.workspace_versions import meta_versions
 
 router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
 
 @router.get("")
-def list_workspaces(session: SessionDep, current_user: CurrentUserDep):
+def list_workspaces(request: Request, response: Response, session: ReadSessionDep, current_user: CurrentUserDep):
     memberships = session.exec(
         select(WorkspaceMember).where(
             WorkspaceMember.user_id == current_user.id,
@@ -20,6 +22,11 @@ def list_workspaces(session: SessionDep, current_user: CurrentUserDep):
         return []
     role_map = {m.workspace_id: m.role for m in memberships}
     ws_ids = list(role_map.keys())
+    versions = meta_versions(session, ws_ids)
+    etag = weak_etag("workspaces", sorted((ws_id, versions.get(ws_id), role) for ws_id, role in role_map.items()))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     workspaces = session.exec(
         select(Workspace).where(Workspace.id.in_(ws_ids)).order_by(Workspace.created_at)
     ).all()
@@ -1,17 +1,19 @@
 """Agent Bridge — HTTP proxy to TaskMeAgents service with auth bridging."""
 
+import asyncio
 import base64
 import hashlib
 import logging
 from typing import Optional
 
-import httpx
-from cryptography.fernet import Fernet
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
+from .. import database, tracing
 from ..config import settings
 from ..models.agent_binding import AgentApiKey
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +28,21 @@ class AgentBridge:
     """Proxy to TaskMeAgents service. Handles auth bridging and HTTP calls."""
 
     def __init__(self):
+        # Deferred until the bridge is first used; both are slow to import (httpx
+        # pulls in brotli and zstandard), so each method below imports httpx itself
+        import httpx
+        from cryptography.fernet import Fernet
+
         self._client = httpx.AsyncClient(
             base_url=settings.AGENTS_SERVICE_URL,
             timeout=30.0,
+            transport=tracing.wrap_transport(httpx.AsyncHTTPTransport()),
         )
         self._fernet = Fernet(_derive_fernet_key(settings.JWT_SECRET_KEY))
-        self._key_cache: dict[int, str] = {}  # user_id -> decrypted key (TTL via dict size)
+        # user_id -> decrypted key
+        self._key_cache = TTLCache(settings.AGENT_KEY_CACHE_MAX_SIZE, settings.AGENT_KEY_CACHE_TTL_SECONDS)
+        # user_id -> in-flight lookup/provision shared by concurrent callers
+        self._key_inflight: dict[int, asyncio.Task] = {}
 
     def _encrypt(self, plaintext: str) -> str:
         return self._fernet.encrypt(plaintext.encode()).decode()
@@ -43,22 +54,32 @@ class AgentBridge:
         """Map TaskMe integer user_id to TaskMeAgents string user_id."""
         return f"taskme-user-{user_id}"
 
-    async def ensure_user_api_key(self, user_id: int, db_session: Session) -> str:
-        """Get cached API key or provision a new one from TaskMeAgents."""
-        # In-memory cache check
-        if user_id in self._key_cache:
-            return self._key_cache[user_id]
-
-        # DB check
-        record = db_session.exec(
-            select(AgentApiKey).where(AgentApiKey.user_id == user_id)
-        ).first()
-        if record:
-            key = self._decrypt(record.api_key_encrypted)
+    async def ensure_user_api_key(self, user_id: int) -> str:
+        """Get cached API key or provision a new one from TaskMeAgents.
+
+        Single-flight: concurrent callers for the same user share one DB lookup /
+        provisioning request instead of each POSTing /api/keys.
+        """
+        cached = self._key_cache.get(user_id)
+        if cached:
+            return cached
+
+        task = self._key_inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load_or_provision_key(user_id))
+            self._key_inflight[user_id] = task
+            task.add_done_callback(lambda _t: self._key_inflight.pop(user_id, None))
+        # Shield so one caller disconnecting doesn't cancel the shared provision
+        return await asyncio.shield(task)
+
+    async def _load_or_provision_key(self, user_id: int) -> str:
+        import httpx
+
+        key = await asyncio.to_thread(self._load_key_from_db, user_id)
+        if key:
             self._key_cache[user_id] = key
             return key
 
-        # Provision new key from TaskMeAgents
         if not settings.AGENTS_API_KEY:
             raise HTTPException(status_code=503, detail="Agent service not configured")
 
@@ -76,21 +97,32 @@ class AgentBridge:
             logger.error("Failed to provision agent API key: %s", e)
             raise HTTPException(status_code=503, detail="Agent service unavailable")
 
-        raw_key = resp.json()["key"]
-
-        # Store encrypted
-        record = AgentApiKey(
-            user_id=user_id,
-            api_key_encrypted=self._encrypt(raw_key),
-        )
-        db_session.add(record)
-        db_session.commit()
-
-        self._key_cache[user_id] = raw_key
-        return raw_key
+        key = await asyncio.to_thread(self._store_key_in_db, user_id, resp.json()["key"])
+        self._key_cache[user_id] = key
+        return key
+
+    def _load_key_from_db(self, user_id: int) -> Optional[str]:
+        with Session(database.engine) as session:
+            record = session.exec(
+                select(AgentApiKey).where(AgentApiKey.user_id == user_id)
+            ).first()
+            return self._decrypt(record.api_key_encrypted) if record else None
+
+    def _store_key_in_db(self, user_id: int, raw_key: str) -> str:
+        """Store encrypted. If another worker stored a key first, keep and return theirs."""
+        with Session(database.engine) as session:
+            session.add(AgentApiKey(user_id=user_id, api_key_encrypted=self._encrypt(raw_key)))
+            try:
+                session.commit()
+                return raw_key
+            except IntegrityError:
+                session.rollback()
+        return self._load_key_from_db(user_id) or raw_key
 
     async def list_agent_templates(self) -> list[dict]:
         """GET /api/agents — list all agent templates."""
+        import httpx
+
         try:
             resp = await self._client.get(
                 "/api/agents",
@@ -104,6 +136,8 @@ class AgentBridge:
 
     async def get_session_messages(self, api_key: str, session_id: str) -> list[dict]:
         """GET /api/sessions/{id}/messages."""
+        import httpx
+
         try:
             resp = await self._client.get(
                 f"/api/sessions/{session_id}/messages",
@@ -119,6 +153,8 @@ class AgentBridge:
 
     async def get_session(self, api_key: str, session_id: str) -> Optional[dict]:
         """GET /api/sessions/{id}."""
+        import httpx
+
         try:
             resp = await self._client.get(
                 f"/api/sessions/{session_id}",
@@ -143,6 +179,8 @@ class AgentBridge:
 
     async def proxy_get(self, path: str, params: dict | None = None) -> dict | list:
         """GET proxy to TaskMeAgents with admin key."""
+        import httpx
+
         try:
             resp = await self._client.get(
                 path,
@@ -159,6 +197,8 @@ class AgentBridge:
 
     async def proxy_post(self, path: str, body: dict) -> dict:
         """POST proxy to TaskMeAgents with admin key."""
+        import httpx
+
         try:
             resp = await self._client.post(
                 path,
@@ -175,6 +215,8 @@ class AgentBridge:
 
     async def proxy_put(self, path: str, body: dict) -> dict:
         """PUT proxy to TaskMeAgents with admin key."""
+        import httpx
+
         try:
             resp = await self._client.put(
                 path,
@@ -191,6 +233,8 @@ class AgentBridge:
 
     async def proxy_delete(self, path: str) -> int:
         """DELETE proxy to TaskMeAgents with admin key. Returns status code."""
+        import httpx
+
         try:
             resp = await self._client.delete(
                 path,
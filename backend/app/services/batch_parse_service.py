@@ -0,0 +1,180 @@
+"""Batch parsing — many independent texts through the LLM parser in one call.
+
+Two modes:
+- ``parse_batch``: runs texts concurrently on a bounded thread pool and returns
+  results in input order, with per-item errors instead of failing the batch.
+- ``submit_offline_batch`` / ``get_offline_batch``: hands the batch to the
+  provider's asynchronous Batch API (cheaper, results within 24h) for
+  non-urgent work such as email backlogs.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from ..config import settings
+from .llm_service import (
+    _anthropic_client,
+    _anthropic_parse_params,
+    _openai_client,
+    _openai_parse_body,
+    _tasks_from_anthropic_text,
+    _tasks_from_openai_content,
+    parse_natural_language,
+)
+
+logger = logging.getLogger(__name__)
+
+ITEM_ERROR = "LLM parsing failed. Please try again later."
+EMPTY_ERROR = "Text cannot be empty"
+
+
+def _custom_id(index: int) -> str:
+    return f"item-{index}"
+
+
+def _index_from_custom_id(custom_id: str) -> int:
+    return int(custom_id.rsplit("-", 1)[1])
+
+
+def empty_indexes(texts: list[str]) -> list[int]:
+    """Indexes of blank texts. Both modes skip these and report ``EMPTY_ERROR`` for them."""
+    return [i for i, text in enumerate(texts) if not text.strip()]
+
+
+def parse_batch(
+    texts: list[str],
+    provider: Optional[str] = None,
+    custom_fields_spec: list[dict] | None = None,
+    tone: str | None = None,
+    cache_key: object = None,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """Parse each text independently. Returns ``[{"index", "tasks"} | {"index", "error"}]`` in input order."""
+    results: list[dict] = [{"index": i} for i in range(len(texts))]
+
+    def _run(i: int, text: str):
+        try:
+            results[i]["tasks"] = parse_natural_language(text, provider, custom_fields_spec, tone=tone, cache_key=cache_key)
+        except Exception:
+            logger.exception("LLM parsing failed for batch item %d", i)
+            results[i]["error"] = ITEM_ERROR
+
+    pending = []
+    for i, text in enumerate(texts):
+        if not text.strip():
+            results[i]["error"] = EMPTY_ERROR
+        else:
+            pending.append((i, text))
+
+    if pending:
+        workers = min(max_workers or settings.PARSE_BATCH_MAX_WORKERS, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parse-batch") as pool:
+            for future in [pool.submit(_run, i, text) for i, text in pending]:
+                future.result()
+    return results
+
+
+# ── Offline provider batches ──
+
+def submit_offline_batch(
+    texts: list[str],
+    provider: Optional[str] = None,
+    custom_fields_spec: list[dict] | None = None,
+    tone: str | None = None,
+    cache_key: object = None,
+) -> dict:
+    """Submit texts to the provider's Batch API. Returns ``{"provider", "batch_id", "status"}``.
+
+    Blank texts are left out; items keep their input index in ``custom_id``.
+    """
+    provider = provider or settings.LLM_PROVIDER
+    items = [(i, text) for i, text in enumerate(texts) if text.strip()]
+    if provider == "openai":
+        client = _openai_client()
+        lines = [
+            json.dumps({
+                "custom_id": _custom_id(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _openai_parse_body(text, custom_fields_spec, tone=tone, cache_key=cache_key),
+            })
+            for i, text in items
+        ]
+        input_file = client.files.create(
+            file=("parse_batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return {"provider": provider, "batch_id": batch.id, "status": batch.status}
+    elif provider == "anthropic":
+        client = _anthropic_client()
+        batch = client.messages.batches.create(requests=[
+            {"custom_id": _custom_id(i), "params": _anthropic_parse_params(text, custom_fields_spec, tone=tone, cache_key=cache_key)}
+            for i, text in items
+        ])
+        return {"provider": provider, "batch_id": batch.id, "status": batch.processing_status}
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def get_offline_batch(batch_id: str, provider: Optional[str] = None, empty: list[int] = ()) -> dict:
+    """Poll an offline batch. ``results`` is included (in input order) once the batch has finished.
+
+    ``empty`` are the input indexes that were left out at submit time; they come back as errors.
+    """
+    provider = provider or settings.LLM_PROVIDER
+    empty_results = [{"index": i, "error": EMPTY_ERROR} for i in empty]
+    if provider == "openai":
+        client = _openai_client()
+        batch = client.batches.retrieve(batch_id)
+        out = {"provider": provider, "batch_id": batch_id, "status": batch.status}
+        if batch.status != "completed":
+            return out
+
+        results = list(empty_results)
+        file_ids = [fid for fid in (batch.output_file_id, batch.error_file_id) if fid]
+        for file_id in file_ids:
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                item = {"index": _index_from_custom_id(entry["custom_id"])}
+                response = entry.get("response") or {}
+                try:
+                    if entry.get("error") or response.get("status_code") != 200:
+                        raise ValueError(entry.get("error") or response.get("status_code"))
+                    item["tasks"] = _tasks_from_openai_content(response["body"]["choices"][0]["message"]["content"])
+                except Exception:
+                    logger.warning("Offline batch %s item %s failed", batch_id, entry.get("custom_id"))
+                    item["error"] = ITEM_ERROR
+                results.append(item)
+        out["results"] = sorted(results, key=lambda r: r["index"])
+        return out
+    elif provider == "anthropic":
+        client = _anthropic_client()
+        batch = client.messages.batches.retrieve(batch_id)
+        out = {"provider": provider, "batch_id": batch_id, "status": batch.processing_status}
+        if batch.processing_status != "ended":
+            return out
+
+        results = list(empty_results)
+        for entry in client.messages.batches.results(batch_id):
+            item = {"index": _index_from_custom_id(entry.custom_id)}
+            try:
+                if entry.result.type != "succeeded":
+                    raise ValueError(entry.result.type)
+                item["tasks"] = _tasks_from_anthropic_text(entry.result.message.content[0].text)
+            except Exception:
+                logger.warning("Offline batch %s item %s failed", batch_id, entry.custom_id)
+                item["error"] = ITEM_ERROR
+            results.append(item)
+        out["results"] = sorted(results, key=lambda r: r["index"])
+        return out
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
@@ -1,11 +1,12 @@
 import json
 from io import BytesIO
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-
 
 def generate_excel(tasks: list[dict], custom_columns: list[dict] | None = None) -> BytesIO:
+    # openpyxl is slow to import and only needed for exports
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Font, PatternFill
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Tasks"
@@ -3,62 +3,143 @@
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import and_, func, or_, update
 from sqlmodel import Session, select, col
 
+from .. import metrics, tracing
 from ..config import settings
 from ..database import engine
-from ..models.task import Task, TaskStatus
+from ..models.task import NUDGE_COOLDOWN_HOURS, STALLED_DAYS, Task, TaskStatus
+from ..services import scanner_lease, task_feed
 from ..services.agent_bridge import get_agent_bridge
 
 logger = logging.getLogger(__name__)
 
-STALLED_DAYS = 3
-NUDGE_COOLDOWN_HOURS = 24
 SCAN_INTERVAL_SECONDS = 1800  # 30 minutes
+MIN_SCAN_INTERVAL_SECONDS = 60
 AGENT_ID = "follow-up-agent"
+LEASE_NAME = "followup-scanner"
+
+# Metrics for the most recent scan plus running totals (see get_scanner_metrics)
+_metrics: dict = {"scans": 0, "nudges_total": 0, "failures_total": 0, "skipped_not_leader": 0, "last_scan": None}
+
+
+def _stalled_conditions(days: int = STALLED_DAYS) -> list:
+    """WHERE clauses for tasks needing a nudge: stale, open, top-level, outside the nudge cooldown."""
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=days)
+    nudge_cutoff = now - timedelta(hours=NUDGE_COOLDOWN_HOURS)
+    return [
+        Task.updated_at < cutoff,
+        col(Task.status).notin_([TaskStatus.DONE]),
+        Task.parent_task_id == None,  # noqa: E711 — skip subtasks
+        or_(Task.agent_nudge_at == None, Task.agent_nudge_at < nudge_cutoff),  # noqa: E711
+    ]
 
 
 def _get_stalled_tasks(db: Session, workspace_id: int, days: int = STALLED_DAYS) -> list[Task]:
     """Find tasks not updated in N days, excluding Done/Cancelled, respecting nudge cooldown."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    nudge_cutoff = datetime.now(timezone.utc) - timedelta(hours=NUDGE_COOLDOWN_HOURS)
-
-    stmt = (
-        select(Task)
-        .where(
-            Task.workspace_id == workspace_id,
-            Task.updated_at < cutoff,
-            col(Task.status).notin_([TaskStatus.DONE]),
-            Task.parent_task_id == None,  # noqa: E711 — skip subtasks
-        )
+    stmt = select(Task).where(Task.workspace_id == workspace_id, *_stalled_conditions(days))
+    return list(db.exec(stmt).all())
+
+
+def _stalled_tasks_page(db: Session, after: tuple | None = None, limit: int = 500) -> list[Task]:
+    """One page of tasks whose stall deadline has passed, keyset-paginated on (stalls_at, id).
+
+    Served by the ix_task_stalls_at index, so the cost tracks the number of
+    stalled tasks rather than the size of the task table. Pass the
+    (stalls_at, id) of the last row of the previous page as ``after``.
+    """
+    stmt = select(Task).where(Task.stalls_at != None, Task.stalls_at <= datetime.now(timezone.utc))  # noqa: E711
+    if after is not None:
+        last_stalls_at, last_id = after
+        stmt = stmt.where(or_(
+            Task.stalls_at > last_stalls_at,
+            and_(Task.stalls_at == last_stalls_at, Task.id > last_id),
+        ))
+    stmt = stmt.order_by(Task.stalls_at, Task.id).limit(limit)
+    return list(db.exec(stmt).all())
+
+
+def _next_stall_at(after: datetime) -> datetime | None:
+    """Earliest stall deadline later than ``after``, so the loop can sleep until there is new work.
+
+    Deadlines before ``after`` (the start of the last scan) were already seen: tasks
+    whose nudge failed or that hit the per-workspace cap wait for the next regular
+    scan instead of waking the loop every MIN_SCAN_INTERVAL_SECONDS.
+    """
+    with Session(engine) as db:
+        return db.exec(select(func.min(Task.stalls_at)).where(Task.stalls_at > after)).one()
+
+
+def _fetch_stalled_page(after: tuple | None, limit: int) -> list[Task]:
+    with Session(engine) as db:
+        return _stalled_tasks_page(db, after, limit)
+
+
+def _days_stalled(task: Task) -> int:
+    updated = task.updated_at.replace(tzinfo=timezone.utc) if task.updated_at.tzinfo is None else task.updated_at
+    return (datetime.now(timezone.utc) - updated).days
+
+
+async def _ask_follow_up_agent(content: str) -> str | None:
+    """Open one follow-up agent session, send ``content`` and return the final reply text."""
+    import websockets
+
+    _base = settings.AGENTS_SERVICE_URL.replace('https://', '').replace('http://', '')
+    _scheme = 'wss' if settings.AGENTS_SERVICE_URL.startswith('https') else 'ws'
+    url = (
+        f"{_scheme}://{_base}"
+        f"/ws/chat?api_key={settings.AGENTS_API_KEY}&agent_id={AGENT_ID}"
     )
-    tasks = list(db.exec(stmt).all())
 
-    # Filter out recently nudged tasks
-    return [
-        t for t in tasks
-        if t.agent_nudge_at is None
-        or (t.agent_nudge_at.replace(tzinfo=timezone.utc) if t.agent_nudge_at.tzinfo is None else t.agent_nudge_at) < nudge_cutoff
-    ]
+    async with websockets.connect(url, open_timeout=10, **tracing.websocket_connect_kwargs()) as ws:
+        # Wait for session_established
+        await tracing.recv_message(ws, timeout=10)
+
+        # Send task context
+        await ws.send(json.dumps({"type": "user_message", "content": content}))
+
+        # Collect response
+        reply = ""
+        for _ in range(20):
+            try:
+                msg = await tracing.recv_message(ws, timeout=30)
+                msg_type = msg.get("type")
+
+                if msg_type == "assistant_message":
+                    reply = msg.get("content", "")
+                    if msg.get("is_final"):
+                        break
+                elif msg_type == "tool_approval_request":
+                    # Auto-approve server tools
+                    await ws.send(json.dumps({
+                        "type": "server_tool_approval",
+                        "tool_use_id": msg.get("tool_use_id"),
+                        "tool_name": msg.get("tool_name"),
+                        "approved": True,
+                    }))
+                elif msg_type in ("end", "error"):
+                    break
+            except asyncio.TimeoutError:
+                break
+
+        return reply.strip() or None
 
 
 async def generate_nudge(task: Task) -> str | None:
     """Generate a nudge message for a stalled task via the follow-up agent."""
-    bridge = get_agent_bridge()
-
     if not settings.AGENTS_API_KEY:
         return None
 
-    updated = task.updated_at.replace(tzinfo=timezone.utc) if task.updated_at.tzinfo is None else task.updated_at
-    days_stalled = (datetime.now(timezone.utc) - updated).days
-
     context = (
         f"Task: {task.task_name}\n"
         f"Status: {task.status}\n"
         f"Priority: {task.priority}\n"
-        f"Days since last update: {days_stalled}\n"
+        f"Days since last update: {_days_stalled(task)}\n"
     )
     if task.description:
         context += f"Description: {task.description[:200]}\n"
@@ -70,97 +151,322 @@ async def generate_nudge(task: Task) -> str | None:
     context += "\nGenerate a brief nudge message for this stalled task."
 
     try:
-        import websockets
+        return await _ask_follow_up_agent(context)
+    except Exception as e:
+        logger.error("Failed to generate nudge for task %d: %s", task.id, e)
+        return None
 
-        _base = settings.AGENTS_SERVICE_URL.replace('https://', '').replace('http://', '')
-        _scheme = 'wss' if settings.AGENTS_SERVICE_URL.startswith('https') else 'ws'
-        url = (
-            f"{_scheme}://{_base}"
-            f"/ws/chat?api_key={settings.AGENTS_API_KEY}&agent_id={AGENT_ID}"
-        )
 
-        async with websockets.connect(url, open_timeout=10) as ws:
-            # Wait for session_established
-            raw = await asyncio.wait_for(ws.recv(), timeout=10)
-
-            # Send task context
-            await ws.send(json.dumps({"type": "user_message", "content": context}))
-
-            # Collect response
-            nudge_text = ""
-            for _ in range(20):
-                try:
-                    raw = await asyncio.wait_for(ws.recv(), timeout=30)
-                    msg = json.loads(raw)
-                    msg_type = msg.get("type")
-
-                    if msg_type == "assistant_message":
-                        nudge_text = msg.get("content", "")
-                        if msg.get("is_final"):
-                            break
-                    elif msg_type == "tool_approval_request":
-                        # Auto-approve server tools
-                        await ws.send(json.dumps({
-                            "type": "server_tool_approval",
-                            "tool_use_id": msg.get("tool_use_id"),
-                            "tool_name": msg.get("tool_name"),
-                            "approved": True,
-                        }))
-                    elif msg_type in ("end", "error"):
-                        break
-                except asyncio.TimeoutError:
-                    break
+def _batch_nudge_prompt(tasks: list[Task]) -> str:
+    items = []
+    for task in tasks:
+        item = {
+            "task_id": task.id,
+            "task": task.task_name,
+            "status": str(task.status),
+            "priority": str(task.priority),
+            "days_since_update": _days_stalled(task),
+        }
+        if task.description:
+            item["description"] = task.description[:200]
+        if task.due_date:
+            item["due_date"] = str(task.due_date)
+        if task.owner:
+            item["owner"] = task.owner
+        items.append(item)
+    return (
+        f"Generate a brief nudge message for each of these {len(tasks)} stalled tasks.\n"
+        'Reply with only a JSON object of the form {"nudges": [{"task_id": <task_id>, "nudge": "<message>"}]}, '
+        "one entry per task, using the task_id given below.\n\n"
+        f"Tasks:\n{json.dumps(items, indent=1)}"
+    )
 
-            return nudge_text.strip() if nudge_text.strip() else None
 
+def _parse_batch_nudges(reply: str, task_ids: set[int]) -> dict[int, str]:
+    """Pull {task_id: nudge} out of the agent's batch reply, ignoring unknown ids and blanks."""
+    start, end = reply.find("{"), reply.rfind("}")
+    if start == -1 or end < start:
+        return {}
+    try:
+        data = json.loads(reply[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    nudges = {}
+    for entry in data.get("nudges") or []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            task_id = int(entry.get("task_id"))
+        except (TypeError, ValueError):
+            continue
+        nudge = entry.get("nudge")
+        if task_id in task_ids and isinstance(nudge, str) and nudge.strip():
+            nudges[task_id] = nudge.strip()
+    return nudges
+
+
+async def generate_nudges_batch(tasks: list[Task]) -> dict[int, str]:
+    """Generate nudges for many stalled tasks in one agent session. Returns {task_id: nudge}.
+
+    Tasks missing from the reply get no nudge this scan and are retried on the next one.
+    """
+    if not settings.AGENTS_API_KEY or not tasks:
+        return {}
+    try:
+        reply = await _ask_follow_up_agent(_batch_nudge_prompt(tasks))
     except Exception as e:
-        logger.error("Failed to generate nudge for task %d: %s", task.id, e)
-        return None
+        logger.error("Failed to generate batch of %d nudges: %s", len(tasks), e)
+        return {}
+    nudges = _parse_batch_nudges(reply or "", {t.id for t in tasks})
+    if len(nudges) < len(tasks):
+        logger.warning("Batch nudge reply covered %d of %d tasks", len(nudges), len(tasks))
+    return nudges
+
+
+class _RateLimiter:
+    """Async token bucket shared by all nudge workers (global LLM/agent call rate)."""
+
+    def __init__(self, rate_per_second: float):
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _interleave(by_workspace: dict[int, list[Task]]):
+    """Round-robin across workspaces so one big workspace can't starve the rest of a page."""
+    queues = [list(tasks) for tasks in by_workspace.values()]
+    i = 0
+    while queues:
+        i %= len(queues)
+        yield queues[i].pop(0)
+        if not queues[i]:
+            queues.pop(i)
+        else:
+            i += 1
+
+
+def _save_nudges(nudges: dict[int, str]):
+    """Write nudges back with one executemany UPDATE and a single commit."""
+    if not nudges:
+        return
+    now = datetime.now(timezone.utc)
+    # Bulk UPDATE skips the stalls_at mapper hook; the task was already stalled, so the cooldown decides
+    stalls_at = now + timedelta(hours=NUDGE_COOLDOWN_HOURS)
+    with Session(engine) as db:
+        # ...and the change feed hook, so stamp change_seq here too
+        by_workspace: dict[int, list[int]] = {}
+        for task_id, workspace_id in db.exec(select(Task.id, Task.workspace_id).where(col(Task.id).in_(list(nudges)))):
+            by_workspace.setdefault(workspace_id, []).append(task_id)
+        rows, events = [], []
+        for workspace_id, task_ids in sorted(by_workspace.items()):
+            seq = task_feed.reserve_seqs(db, workspace_id, len(task_ids))
+            for task_id in task_ids:
+                rows.append({"id": task_id, "agent_nudge": nudges[task_id], "agent_nudge_at": now,
+                             "stalls_at": stalls_at, "change_seq": seq})
+                events.append({"workspace_id": workspace_id, "seq": seq, "op": "update", "task_id": task_id,
+                               "changes": {"agent_nudge": nudges[task_id], "agent_nudge_at": now.isoformat()}})
+                seq += 1
+        if rows:
+            db.execute(update(Task), rows)
+            # Same for the If-Match version: a nudge changes what GET /tasks/{id} returns
+            db.execute(
+                update(Task.__table__)
+                .where(Task.__table__.c.id.in_([row["id"] for row in rows]))
+                .values(version=Task.__table__.c.version + 1)
+            )
+            task_feed.queue_events(db, events)
+        db.commit()
 
 
 async def scan_once():
-    """Scan all workspaces for stalled tasks and generate nudges."""
+    """Scan all workspaces for stalled tasks and generate nudges.
+
+    Producer/consumer: the producer streams stalled tasks page by page from one
+    global query and feeds them (round-robin across workspaces within a page)
+    into a bounded queue in batches of SCANNER_NUDGE_BATCH_SIZE;
+    SCANNER_CONCURRENCY workers generate each batch's nudges in one agent
+    session and write them back with one UPDATE, throttled by a shared
+    SCANNER_RATE_LIMIT_PER_SECOND limiter.
+
+    Only the worker holding the scanner lease scans. After each page is fully
+    processed its cursor is checkpointed, so a scan cut short (crash, deploy,
+    lost lease) resumes where it stopped instead of starting over.
+    """
     if not settings.AGENTS_API_KEY:
         return
 
+    ttl = settings.SCANNER_LEASE_TTL_SECONDS
+    if not await asyncio.to_thread(scanner_lease.acquire, LEASE_NAME, ttl):
+        _metrics["skipped_not_leader"] += 1
+        logger.debug("Another worker holds the scanner lease, skipping scan")
+        return
+
     # Check if agent service is available
     bridge = get_agent_bridge()
     if not await bridge.is_available():
         logger.debug("Agent service unavailable, skipping scan")
         return
 
-    with Session(engine) as db:
-        # Get all distinct workspace IDs that have tasks
-        workspace_ids = db.exec(
-            select(Task.workspace_id).where(Task.workspace_id != None).distinct()  # noqa: E711
-        ).all()
-
-        total_nudges = 0
-        for ws_id in workspace_ids:
-            if ws_id is None:
-                continue
-            stalled = _get_stalled_tasks(db, ws_id)
-            for task in stalled:
-                nudge = await generate_nudge(task)
-                if nudge:
-                    task.agent_nudge = nudge
-                    task.agent_nudge_at = datetime.now(timezone.utc)
-                    db.add(task)
-                    db.commit()
-                    total_nudges += 1
-                    logger.info("Generated nudge for task %d: %s", task.id, nudge[:60])
-
-        if total_nudges:
-            logger.info("Scan complete: %d nudges generated", total_nudges)
+    started = time.monotonic()
+    started_at = datetime.now(timezone.utc)
+    resume_from = await asyncio.to_thread(scanner_lease.load_checkpoint, LEASE_NAME)
+    if resume_from:
+        logger.info("Resuming scan after task %d", resume_from[1])
+
+    concurrency = max(1, settings.SCANNER_CONCURRENCY)
+    batch_size = max(1, settings.SCANNER_NUDGE_BATCH_SIZE)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    limiter = _RateLimiter(settings.SCANNER_RATE_LIMIT_PER_SECOND)
+    counts = {"considered": 0, "nudges": 0, "failures": 0}
+    # Workers share one writer: each batch is a single UPDATE, no point contending for the DB
+    write_lock = asyncio.Lock()
+
+    per_workspace: dict[int, int] = {}
+    state = {"completed": False, "lease_lost": False}
+
+    async def page_done(cursor) -> bool:
+        """Wait for the queued page to drain (renewing the lease meanwhile), then checkpoint it."""
+        join = asyncio.ensure_future(queue.join())
+        while not join.done():
+            await asyncio.wait({join}, timeout=ttl / 3)
+            if not join.done() and not await asyncio.to_thread(scanner_lease.acquire, LEASE_NAME, ttl):
+                join.cancel()
+                return False
+        return (
+            await asyncio.to_thread(scanner_lease.acquire, LEASE_NAME, ttl)
+            and await asyncio.to_thread(scanner_lease.save_checkpoint, LEASE_NAME, cursor)
+        )
+
+    async def producer():
+        after = resume_from
+        while True:
+            page = await asyncio.to_thread(_fetch_stalled_page, after, settings.SCANNER_PAGE_SIZE)
+            if not page:
+                state["completed"] = True
+                break
+            after = (page[-1].stalls_at, page[-1].id)
+            by_workspace: dict[int, list[Task]] = {}
+            for task in page:
+                seen = per_workspace.get(task.workspace_id, 0)
+                if seen >= settings.SCANNER_MAX_NUDGES_PER_WORKSPACE:
+                    continue
+                per_workspace[task.workspace_id] = seen + 1
+                by_workspace.setdefault(task.workspace_id, []).append(task)
+            ordered = list(_interleave(by_workspace))
+            for i in range(0, len(ordered), batch_size):
+                await queue.put(ordered[i:i + batch_size])
+            if not await page_done(after):
+                state["lease_lost"] = True
+                logger.warning("Scanner lease lost mid-scan, stopping")
+                break
+            if len(page) < settings.SCANNER_PAGE_SIZE:
+                state["completed"] = True
+                break
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            counts["considered"] += len(batch)
+            # One agent session per batch, so the rate limit is per batch too
+            await limiter.acquire()
+            try:
+                if len(batch) == 1:
+                    nudge = await generate_nudge(batch[0])
+                    nudges = {batch[0].id: nudge} if nudge else {}
+                else:
+                    nudges = await generate_nudges_batch(batch)
+                async with write_lock:
+                    await asyncio.to_thread(_save_nudges, nudges)
+                counts["nudges"] += len(nudges)
+                counts["failures"] += len(batch) - len(nudges)
+                for task_id, nudge in nudges.items():
+                    logger.info("Generated nudge for task %d: %s", task_id, nudge[:60])
+            except Exception as e:
+                counts["failures"] += len(batch)
+                logger.error("Nudge worker failed for tasks %s: %s", [t.id for t in batch], e)
+            finally:
+                queue.task_done()
+
+    await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+
+    if state["completed"]:
+        await asyncio.to_thread(scanner_lease.save_checkpoint, LEASE_NAME, None)
+        # Keep leadership until our next scan so other workers don't rescan in between
+        await asyncio.to_thread(scanner_lease.acquire, LEASE_NAME, SCAN_INTERVAL_SECONDS + ttl)
+
+    duration = time.monotonic() - started
+    metrics.SCAN_SECONDS.observe(duration)
+    metrics.SCAN_NUDGES.inc(counts["nudges"])
+    _metrics["scans"] += 1
+    _metrics["nudges_total"] += counts["nudges"]
+    _metrics["failures_total"] += counts["failures"]
+    _metrics["last_scan"] = {
+        "started_at": started_at.isoformat(),
+        "duration_seconds": round(duration, 3),
+        "workspaces": len(per_workspace),
+        "tasks_considered": counts["considered"],
+        "nudges_generated": counts["nudges"],
+        "failures": counts["failures"],
+        "tasks_per_second": round(counts["considered"] / duration, 3) if duration else 0.0,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "resumed": resume_from is not None,
+        "completed": state["completed"],
+        "lease_lost": state["lease_lost"],
+    }
+
+    if counts["nudges"]:
+        logger.info("Scan complete: %d nudges generated in %.1fs", counts["nudges"], duration)
+
+
+def get_scanner_metrics() -> dict:
+    """Per-scan throughput/duration for the last scan plus running totals."""
+    return {**_metrics, "last_scan": dict(_metrics["last_scan"]) if _metrics["last_scan"] else None}
+
+
+async def _sleep_until_next_stall(scan_started: datetime):
+    """Sleep until a task stalls that the scan begun at ``scan_started`` did not see, at most SCAN_INTERVAL_SECONDS."""
+    delay = SCAN_INTERVAL_SECONDS
+    try:
+        next_at = await asyncio.to_thread(_next_stall_at, scan_started)
+    except Exception as e:
+        logger.warning("Could not read next stall deadline: %s", e)
+        next_at = None
+    if next_at is not None:
+        until = (next_at.replace(tzinfo=timezone.utc) if next_at.tzinfo is None else next_at) - datetime.now(timezone.utc)
+        delay = min(delay, max(MIN_SCAN_INTERVAL_SECONDS, until.total_seconds()))
+    await asyncio.sleep(delay)
 
 
 async def run_scanner_loop():
-    """Background loop that runs the scanner on an interval."""
+    """Background loop that runs the scanner whenever tasks stall (at least every SCAN_INTERVAL_SECONDS)."""
     # Wait a bit before first scan to let the app start up
     await asyncio.sleep(60)
-    while True:
+    try:
+        while True:
+            scan_started = datetime.now(timezone.utc)
+            try:
+                await scan_once()
+            except Exception as e:
+                logger.error("Scanner loop error: %s", e)
+            await _sleep_until_next_stall(scan_started)
+    finally:
+        # Hand the lease over on shutdown instead of making other workers wait out the TTL
         try:
-            await scan_once()
+            await asyncio.to_thread(scanner_lease.release, LEASE_NAME)
         except Exception as e:
-            logger.error("Scanner loop error: %s", e)
-        await asyncio.sleep(SCAN_INTERVAL_SECONDS)
+            logger.warning("Failed to release scanner lease: %s", e)
@@ -0,0 +1,243 @@
+"""LLM provider router — latency tracking, circuit breaking, hedging and failover.
+
+Every LLM call goes through ``LLMRouter.call`` with one callable per provider.
+The preferred provider is tried first; if its circuit is open or the call fails,
+the next configured provider answers instead. With hedging enabled, a second
+provider is started when the first has not answered within its observed p95.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Callable, Optional, TypeVar
+
+from .. import metrics, tracing
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROVIDERS = ("openai", "anthropic")
+LATENCY_WINDOW = 200  # samples kept per provider for percentiles
+MIN_HEDGE_SAMPLES = 20  # below this, fall back to LLM_HEDGE_DEFAULT_DELAY_SECONDS
+
+
+class ProviderUnavailableError(Exception):
+    """Raised when every candidate provider's circuit is open."""
+
+
+def _percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class ProviderStats:
+    """Rolling latency window, counters and circuit breaker for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.state = "closed"  # closed | open | half_open
+        self.opened_at = 0.0
+
+    def available(self) -> bool:
+        """Whether ``allow()`` would let a request through now, without claiming the trial slot."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            return time.monotonic() - self.opened_at >= settings.LLM_BREAKER_COOLDOWN_SECONDS
+
+    def allow(self) -> bool:
+        """Claim the right to send a request now. Moves open → half_open after the cooldown.
+
+        Only call this right before actually calling the provider: in half_open it
+        hands out the single trial request for the cooldown window.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # One trial request per cooldown window while open/half-open
+            now = time.monotonic()
+            if now - self.opened_at >= settings.LLM_BREAKER_COOLDOWN_SECONDS:
+                self.state = "half_open"
+                self.opened_at = now
+                return True
+            return False
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            if ok:
+                self.consecutive_failures = 0
+                self.state = "closed"
+                return
+            self.errors += 1
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= settings.LLM_BREAKER_FAILURE_THRESHOLD:
+                if self.state != "open":
+                    logger.warning("LLM circuit opened for %s after %d failures", self.name, self.consecutive_failures)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            values = sorted(self._latencies)
+        return _percentile(values, pct)
+
+    def sample_count(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = sorted(self._latencies)
+            requests, errors, state = self.requests, self.errors, self.state
+        return {
+            "state": state,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "p50_ms": _ms(_percentile(values, 50)),
+            "p95_ms": _ms(_percentile(values, 95)),
+            "p99_ms": _ms(_percentile(values, 99)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def _is_configured(provider: str) -> bool:
+    if provider == "openai":
+        return bool(settings.OPENAI_API_KEY)
+    if provider == "anthropic":
+        return bool(settings.ANTHROPIC_API_KEY)
+    return False
+
+
+class LLMRouter:
+    """Routes LLM calls across providers. Thread-safe; calls are synchronous."""
+
+    def __init__(self):
+        self.stats: dict[str, ProviderStats] = {p: ProviderStats(p) for p in PROVIDERS}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=settings.LLM_ROUTER_MAX_WORKERS, thread_name_prefix="llm-hedge")
+            return self._pool
+
+    def _candidates(self, primary: str, funcs: dict[str, Callable[[], T]]) -> list[str]:
+        """Primary first, then other configured providers; providers with an open circuit are skipped.
+
+        Only checks the circuits; the caller claims each one with ``_claim`` when it gets to it.
+        """
+        order = [primary]
+        if settings.LLM_FAILOVER_ENABLED:
+            order += [p for p in funcs if p != primary and _is_configured(p)]
+        return [p for p in order if p in funcs and self.stats[p].available()]
+
+    def _claim(self, providers: list[str]) -> Optional[str]:
+        """Pop providers until one's circuit lets a request through (another caller may have taken a trial slot)."""
+        while providers:
+            provider = providers.pop(0)
+            if self.stats[provider].allow():
+                return provider
+        return None
+
+    def _timed(self, provider: str, fn: Callable[[], T]) -> T:
+        start = time.perf_counter()
+        try:
+            with tracing.span("llm.call", **{"llm.provider": provider}):
+                result = fn()
+        except Exception:
+            elapsed = time.perf_counter() - start
+            self.stats[provider].record(elapsed, ok=False)
+            metrics.LLM_CALL_SECONDS.labels(provider, "error").observe(elapsed)
+            raise
+        elapsed = time.perf_counter() - start
+        self.stats[provider].record(elapsed, ok=True)
+        metrics.LLM_CALL_SECONDS.labels(provider, "ok").observe(elapsed)
+        return result
+
+    def _hedge_delay(self, provider: str) -> float:
+        stats = self.stats[provider]
+        if stats.sample_count() < MIN_HEDGE_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return stats.percentile(95)
+
+    def call(self, primary: str, funcs: dict[str, Callable[[], T]]) -> T:
+        """Run ``funcs[primary]`` with failover (and optional hedging) to the other providers."""
+        candidates = self._candidates(primary, funcs)
+        if not candidates:
+            raise ProviderUnavailableError(f"LLM provider circuit open: {primary}")
+
+        if settings.LLM_HEDGE_ENABLED and len(candidates) > 1:
+            return self._call_hedged(candidates, funcs)
+
+        last_error: Optional[Exception] = None
+        while (provider := self._claim(candidates)) is not None:
+            try:
+                return self._timed(provider, funcs[provider])
+            except Exception as e:
+                logger.warning("LLM call to %s failed: %s", provider, e)
+                last_error = e
+        if last_error is None:
+            raise ProviderUnavailableError(f"LLM provider circuit open: {primary}")
+        raise last_error
+
+    def _call_hedged(self, candidates: list[str], funcs: dict[str, Callable[[], T]]) -> T:
+        pool = self._executor()
+        backups = list(candidates)
+        primary = self._claim(backups)
+        if primary is None:
+            raise ProviderUnavailableError(f"LLM provider circuit open: {candidates[0]}")
+        # copy_context() keeps each hedged call under the caller's trace span
+        running: dict[Future, str] = {pool.submit(copy_context().run, self._timed, primary, funcs[primary]): primary}
+
+        done, _ = wait(running, timeout=self._hedge_delay(primary))
+        last_error: Optional[Exception] = None
+        while True:
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning("LLM call to %s failed: %s", provider, e)
+                    last_error = e
+            # Primary is slow or failed — start the next provider
+            provider = self._claim(backups)
+            if provider is not None:
+                running[pool.submit(copy_context().run, self._timed, provider, funcs[provider])] = provider
+            if not running:
+                raise last_error
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+    def snapshot(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+
+# Singleton
+_router: Optional[LLMRouter] = None
+
+
+def get_llm_router() -> LLMRouter:
+    global _router
+    if _router is None:
+        _router = LLMRouter()
+    return _router
@@ -1,16 +1,21 @@
 import json
 from datetime import date
+from functools import partial
 from typing import Optional
 
 from pydantic import BaseModel, field_validator
 
 from ..config import settings
+from .llm_router import get_llm_router
+from .ttl_cache import TTLCache
 
+# Static instructions — identical for every request, so it can serve as a provider
+# cache prefix once it is long enough (see PROMPT_CACHE_MIN_TOKENS). Workspace-specific
+# custom field rules, tone and today's date are appended after it
+# (see _build_system_prompt_parts); keep anything request-specific out of this block.
 SYSTEM_PROMPT = """You are a task extraction assistant. Your job is to parse free-form human
 language text and extract structured task information.
 
-Today's date is {current_date}.
-
 RULES:
 1. Extract EVERY distinct task mentioned in the text.
 2. For each task, extract these fields:
@@ -20,10 +25,11 @@ RULES:
      use the custom_fields object instead.
    - owner: The person responsible (first name, full name, or role as given)
    - email: Email address if mentioned, otherwise null
-   - start_date: In YYYY-MM-DD format. If "today" use {current_date}. If not mentioned, set to null.
+   - start_date: In YYYY-MM-DD format. If "today" use today's date (given at the
+     end of these instructions). If not mentioned, set to null.
    - due_date: In YYYY-MM-DD format. Interpret relative dates like "next week"
      (= next Monday), "by Friday" (= this coming Friday), "end of month", etc.
-     relative to {current_date}. If not mentioned, set to null.
+     relative to today's date. If not mentioned, set to null.
    - priority: Infer from language cues. Words like "urgent", "ASAP", "critical"
      = "High" or "Critical". "when you get a chance", "low priority" = "Low".
      Default to "Medium" if no cues.
@@ -33,22 +39,22 @@ RULES:
 5. Do NOT invent information not present in the text.
 6. For ambiguous dates, make your best reasonable interpretation and note the
    assumption in the description field.
-{custom_fields_rules}{tone_instruction}
+
 Respond with ONLY valid JSON matching this exact schema:
-{{
+{
   "tasks": [
-    {{
+    {
       "task_name": "string",
       "description": "string or null",
       "owner": "string or null",
       "email": "string or null",
       "start_date": "YYYY-MM-DD or null",
       "due_date": "YYYY-MM-DD or null",
-      "priority": "Low | Medium | High | Critical"{custom_fields_schema}
-    }}
+      "priority": "Low | Medium | High | Critical"
+    }
   ]
-}}"""
-
+}
+"""
 
 class ParsedTask(BaseModel):
     task_name: str
@@ -73,84 +79,184 @@ TONE_MAP = {
 }
 
 
-def _build_system_prompt(custom_fields_spec: list[dict] | None = None, tone: str | None = None) -> str:
-    current_date = date.today().isoformat()
+# Rendered custom field rules per workspace: cache_key -> (spec fingerprint, rules text).
+# The fingerprint check means a column change in another worker is still picked up;
+# the columns router also evicts eagerly via invalidate_custom_fields_cache().
+# Both caches are LRU-bounded and expire, so idle workspaces do not pile up.
+_custom_fields_cache = TTLCache(settings.CUSTOM_FIELDS_CACHE_MAX_SIZE, settings.CUSTOM_FIELDS_CACHE_TTL_SECONDS)
+
+# Custom column specs per workspace: cache_key -> (workspace meta_version, spec).
+# meta_version moves on every column change (services/workspace_versions.py), so a
+# version match means the ColumnConfig rows need not be read again, in any worker.
+_custom_fields_spec_cache = TTLCache(settings.CUSTOM_FIELDS_CACHE_MAX_SIZE, settings.CUSTOM_FIELDS_CACHE_TTL_SECONDS)
+
+# Anthropic and OpenAI only cache prefixes of at least 1024 tokens; shorter ones are
+# sent normally and billed in full, so there is no point marking them.
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def _spec_fingerprint(custom_fields_spec: list[dict]) -> tuple:
+    return tuple(
+        (cf["field_key"], cf["display_name"], cf["field_type"], cf.get("options"))
+        for cf in custom_fields_spec
+    )
 
-    custom_fields_rules = ""
-    custom_fields_schema = ""
 
+def _render_custom_fields_rules(custom_fields_spec: list[dict]) -> str:
+    lines = ["7. IMPORTANT — Extract these custom fields when their values appear in the text:"]
+    for cf in custom_fields_spec:
+        desc = f'   - {cf["display_name"]} ({cf["field_type"]})'
+        if cf.get("options"):
+            try:
+                opts = json.loads(cf["options"])
+                desc += f' — valid options: {", ".join(opts)}'
+            except (json.JSONDecodeError, TypeError):
+                pass
+        desc += f': Extract into custom_fields.{cf["field_key"]}'
+        lines.append(desc)
+    lines.append('   Look for patterns like "FieldName: value", "FieldName = value", or')
+    lines.append('   "FieldName is value". These MUST go into custom_fields, NOT description.')
+    lines.append("   If none of these custom fields are mentioned, set custom_fields to null.")
+    lines.append("   Only include a custom field in the object if its value is explicitly stated.")
+    example_obj = ", ".join(f'"{cf["field_key"]}": "value"' for cf in custom_fields_spec)
+    lines.append(f'   Add this key to every task object: "custom_fields": {{{example_obj}}} or null')
+    return "\n".join(lines) + "\n"
+
+
+def _custom_fields_rules(custom_fields_spec: list[dict], cache_key: object = None) -> str:
+    """Return the custom field rules section, memoized per workspace (cache_key)."""
+    if cache_key is None:
+        return _render_custom_fields_rules(custom_fields_spec)
+    fingerprint = _spec_fingerprint(custom_fields_spec)
+    cached = _custom_fields_cache.get(cache_key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    rules = _render_custom_fields_rules(custom_fields_spec)
+    _custom_fields_cache[cache_key] = (fingerprint, rules)
+    return rules
+
+
+def cached_custom_fields_spec(cache_key: object, version: int) -> list[dict] | None:
+    """The custom column spec stored for ``cache_key`` at ``version``, or None if missing or stale."""
+    cached = _custom_fields_spec_cache.get(cache_key)
+    if cached and cached[0] == version:
+        return cached[1]
+    return None
+
+
+def store_custom_fields_spec(cache_key: object, version: int, custom_fields_spec: list[dict]) -> None:
+    _custom_fields_spec_cache[cache_key] = (version, custom_fields_spec)
+
+
+def invalidate_custom_fields_cache(cache_key: object = None) -> None:
+    """Drop memoized custom field specs and rules for one workspace, or all when cache_key is None."""
+    if cache_key is None:
+        _custom_fields_cache.clear()
+        _custom_fields_spec_cache.clear()
+    else:
+        _custom_fields_cache.pop(cache_key, None)
+        _custom_fields_spec_cache.pop(cache_key, None)
+
+
+def _build_system_prompt_parts(
+    custom_fields_spec: list[dict] | None = None,
+    tone: str | None = None,
+    cache_key: object = None,
+) -> tuple[str, str]:
+    """Split the parse prompt into (static prefix, request-specific suffix)."""
+    suffix = ""
     if custom_fields_spec:
-        lines = ["7. IMPORTANT — Extract these custom fields when their values appear in the text:"]
-        for cf in custom_fields_spec:
-            desc = f'   - {cf["display_name"]} ({cf["field_type"]})'
-            if cf.get("options"):
-                try:
-                    opts = json.loads(cf["options"])
-                    desc += f' — valid options: {", ".join(opts)}'
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            desc += f': Extract into custom_fields.{cf["field_key"]}'
-            lines.append(desc)
-        lines.append('   Look for patterns like "FieldName: value", "FieldName = value", or')
-        lines.append('   "FieldName is value". These MUST go into custom_fields, NOT description.')
-        lines.append("   If none of these custom fields are mentioned, set custom_fields to null.")
-        lines.append("   Only include a custom field in the object if its value is explicitly stated.")
-        custom_fields_rules = "\n".join(lines) + "\n"
-
-        example_obj = ", ".join(f'"{cf["field_key"]}": "value"' for cf in custom_fields_spec)
-        custom_fields_schema = f',\n      "custom_fields": {{{example_obj}}} or null'
-
-    tone_instruction = ""
+        suffix += _custom_fields_rules(custom_fields_spec, cache_key)
+
     if tone and tone != "none" and tone in TONE_MAP:
         rule_num = 8 if custom_fields_spec else 7
-        tone_instruction = (
+        suffix += (
             f"{rule_num}. REPHRASING: {TONE_MAP[tone]}\n"
             f"   Keep all factual information (names, dates, emails) unchanged — "
             f"only rephrase the wording of task_name and description.\n"
         )
 
-    return SYSTEM_PROMPT.format(
-        current_date=current_date,
-        custom_fields_rules=custom_fields_rules,
-        custom_fields_schema=custom_fields_schema,
-        tone_instruction=tone_instruction,
-    )
+    suffix += f"\nToday's date is {date.today().isoformat()}."
+    return SYSTEM_PROMPT, suffix
+
+
+def _build_system_prompt(
+    custom_fields_spec: list[dict] | None = None,
+    tone: str | None = None,
+    cache_key: object = None,
+) -> str:
+    static, dynamic = _build_system_prompt_parts(custom_fields_spec, tone=tone, cache_key=cache_key)
+    return static + dynamic
+
 
+def _estimated_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; only used against PROMPT_CACHE_MIN_TOKENS
+    return len(text) // 4
 
-def parse_with_openai(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None) -> list[dict]:
+
+def _anthropic_system_blocks(static: str, dynamic: str) -> list[dict]:
+    """System prompt as content blocks, with a cache breakpoint after the static prefix if it is cacheable.
+
+    The parse and search prefixes are currently ~500 tokens, below the minimum,
+    so no breakpoint is sent; it is added automatically if they grow past it.
+    """
+    static_block = {"type": "text", "text": static}
+    if _estimated_tokens(static) >= PROMPT_CACHE_MIN_TOKENS:
+        static_block["cache_control"] = {"type": "ephemeral"}
+    return [static_block, {"type": "text", "text": dynamic}]
+
+
+def _openai_client():
     from openai import OpenAI
 
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    system_prompt = _build_system_prompt(custom_fields_spec, tone=tone)
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL or None,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+    )
 
-    completion = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        messages=[
+
+def _anthropic_client():
+    import anthropic
+
+    return anthropic.Anthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        base_url=settings.ANTHROPIC_BASE_URL or None,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+    )
+
+
+def _openai_parse_body(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None, cache_key: object = None) -> dict:
+    """Chat completions request body for a parse call (shared with the offline Batch API)."""
+    system_prompt = _build_system_prompt(custom_fields_spec, tone=tone, cache_key=cache_key)
+    return {
+        "model": settings.OPENAI_MODEL,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": text},
         ],
-        response_format={"type": "json_object"},
-    )
+        "response_format": {"type": "json_object"},
+    }
 
-    raw = completion.choices[0].message.content
-    parsed = ParsedTaskList.model_validate(json.loads(raw))
-    return [task.model_dump() for task in parsed.tasks]
 
+def _anthropic_parse_params(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None, cache_key: object = None) -> dict:
+    """Messages API params for a parse call (shared with Message Batches)."""
+    static, dynamic = _build_system_prompt_parts(custom_fields_spec, tone=tone, cache_key=cache_key)
+    return {
+        "model": settings.ANTHROPIC_MODEL,
+        "max_tokens": 4096,
+        "system": _anthropic_system_blocks(static, dynamic),
+        "messages": [{"role": "user", "content": text}],
+    }
 
-def parse_with_anthropic(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None) -> list[dict]:
-    import anthropic
 
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    system_prompt = _build_system_prompt(custom_fields_spec, tone=tone)
+def _tasks_from_openai_content(raw: str) -> list[dict]:
+    parsed = ParsedTaskList.model_validate(json.loads(raw))
+    return [task.model_dump() for task in parsed.tasks]
 
-    message = client.messages.create(
-        model=settings.ANTHROPIC_MODEL,
-        max_tokens=4096,
-        system=system_prompt,
-        messages=[{"role": "user", "content": text}],
-    )
 
-    raw = message.content[0].text.strip()
+def _tasks_from_anthropic_text(raw: str) -> list[dict]:
+    raw = raw.strip()
     # Strip markdown code fences if present (e.g. ```json ... ```)
     if raw.startswith("```"):
         raw = raw.split("\n", 1)[1]  # remove opening fence line
@@ -159,10 +265,29 @@ def parse_with_anthropic(text: str, custom_fields_spec: list[dict] | None = None
     return [task.model_dump() for task in parsed.tasks]
 
 
+def parse_with_openai(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None, cache_key: object = None) -> list[dict]:
+    client = _openai_client()
+
+    # OpenAI caches prompt prefixes of PROMPT_CACHE_MIN_TOKENS+ automatically (the
+    # static prefix is shorter today); the cache key routes requests sharing it to
+    # the same cache shard once it qualifies.
+    completion = client.chat.completions.create(
+        **_openai_parse_body(text, custom_fields_spec, tone=tone, cache_key=cache_key),
+        extra_body={"prompt_cache_key": "taskme-parse"},
+    )
+
+    return _tasks_from_openai_content(completion.choices[0].message.content)
+
+
+def parse_with_anthropic(text: str, custom_fields_spec: list[dict] | None = None, tone: str | None = None, cache_key: object = None) -> list[dict]:
+    client = _anthropic_client()
+    message = client.messages.create(**_anthropic_parse_params(text, custom_fields_spec, tone=tone, cache_key=cache_key))
+    return _tasks_from_anthropic_text(message.content[0].text)
+
+
 SEARCH_SYSTEM_PROMPT = """You are a search query parser for a task management application.
 Given a natural language search query, extract structured filters.
-
-Today's date is {current_date}.
+Relative dates are resolved against today's date, given at the end of these instructions.
 
 Available filters:
 - status: array of exact values from ["To Do", "In Progress", "Done", "Blocked"]
@@ -191,7 +316,7 @@ Interpretation rules:
 - If no specific filter is mentioned for a field, set it to null
 
 Return ONLY valid JSON with no markdown formatting:
-{{
+{
   "status": ["In Progress"] or null,
   "priority": ["Critical"] or null,
   "owner": "string" or null,
@@ -200,7 +325,8 @@ Return ONLY valid JSON with no markdown formatting:
   "date_to": "YYYY-MM-DD" or null,
   "sort_by": "field_name" or null,
   "order": "asc" or null
-}}"""
+}
+"""
 
 
 VALID_STATUSES = {"To Do", "In Progress", "Done", "Blocked"}
@@ -257,14 +383,17 @@ class ParsedFilters(BaseModel):
             return None
 
 
+def _build_search_prompt_parts() -> tuple[str, str]:
+    return SEARCH_SYSTEM_PROMPT, f"\nToday's date is {date.today().isoformat()}."
+
+
 def _build_search_prompt() -> str:
-    return SEARCH_SYSTEM_PROMPT.format(current_date=date.today().isoformat())
+    static, dynamic = _build_search_prompt_parts()
+    return static + dynamic
 
 
 def _parse_search_openai(text: str) -> dict:
-    from openai import OpenAI
-
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = _openai_client()
     system_prompt = _build_search_prompt()
 
     completion = client.chat.completions.create(
@@ -274,6 +403,7 @@ def _parse_search_openai(text: str) -> dict:
             {"role": "user", "content": text},
         ],
         response_format={"type": "json_object"},
+        extra_body={"prompt_cache_key": "taskme-search"},
     )
 
     raw = completion.choices[0].message.content if completion.choices else None
@@ -284,15 +414,13 @@ def _parse_search_openai(text: str) -> dict:
 
 
 def _parse_search_anthropic(text: str) -> dict:
-    import anthropic
-
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    system_prompt = _build_search_prompt()
+    client = _anthropic_client()
+    static, dynamic = _build_search_prompt_parts()
 
     message = client.messages.create(
         model=settings.ANTHROPIC_MODEL,
         max_tokens=1024,
-        system=system_prompt,
+        system=_anthropic_system_blocks(static, dynamic),
         messages=[{"role": "user", "content": text}],
     )
 
@@ -306,21 +434,24 @@ def _parse_search_anthropic(text: str) -> dict:
     return parsed.model_dump(exclude_none=True)
 
 
+_SEARCH_PARSERS = {"openai": _parse_search_openai, "anthropic": _parse_search_anthropic}
+_PARSERS = {"openai": parse_with_openai, "anthropic": parse_with_anthropic}
+
+
 def parse_search_query(text: str, provider: Optional[str] = None) -> dict:
     provider = provider or settings.LLM_PROVIDER
-    if provider == "openai":
-        return _parse_search_openai(text)
-    elif provider == "anthropic":
-        return _parse_search_anthropic(text)
-    else:
+    if provider not in _SEARCH_PARSERS:
         raise ValueError(f"Unknown LLM provider: {provider}")
+    return get_llm_router().call(
+        provider, {name: partial(fn, text) for name, fn in _SEARCH_PARSERS.items()},
+    )
 
 
-def parse_natural_language(text: str, provider: Optional[str] = None, custom_fields_spec: list[dict] | None = None, tone: str | None = None) -> list[dict]:
+def parse_natural_language(text: str, provider: Optional[str] = None, custom_fields_spec: list[dict] | None = None, tone: str | None = None, cache_key: object = None) -> list[dict]:
     provider = provider or settings.LLM_PROVIDER
-    if provider == "openai":
-        return parse_with_openai(text, custom_fields_spec, tone=tone)
-    elif provider == "anthropic":
-        return parse_with_anthropic(text, custom_fields_spec, tone=tone)
-    else:
+    if provider not in _PARSERS:
         raise ValueError(f"Unknown LLM provider: {provider}")
+    return get_llm_router().call(
+        provider,
+        {name: partial(fn, text, custom_fields_spec, tone=tone, cache_key=cache_key) for name, fn in _PARSERS.items()},
+    )
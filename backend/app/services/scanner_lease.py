@@ -0,0 +1,87 @@
+"""Lease-based leader election for background jobs (the follow-up scanner).
+
+Every uvicorn worker and replica runs the scanner loop, but only the holder of
+the job's lease row scans. The lease is taken with a conditional UPDATE (free,
+expired, or already ours) so it works the same on PostgreSQL and on a shared
+SQLite file. The holder renews it as it goes; if a worker dies mid-scan the
+lease expires and another worker picks the scan up from the stored checkpoint.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from .. import database
+from ..models.scanner_lease import ScannerLease
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process as a lease holder
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire(name: str, ttl_seconds: float, holder: str = HOLDER_ID) -> bool:
+    """Take or renew the lease. Returns False if another live holder has it."""
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    with Session(database.engine) as db:
+        result = db.execute(
+            update(ScannerLease)
+            .where(
+                ScannerLease.name == name,
+                or_(ScannerLease.holder == holder, ScannerLease.expires_at < now),
+            )
+            .values(holder=holder, expires_at=expires_at, updated_at=now)
+        )
+        db.commit()
+        if result.rowcount:
+            return True
+        try:
+            db.add(ScannerLease(name=name, holder=holder, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            # Row exists and is held by someone else
+            db.rollback()
+            return False
+
+
+def release(name: str, holder: str = HOLDER_ID) -> None:
+    """Expire the lease now so another worker can take it without waiting out the TTL."""
+    now = datetime.now(timezone.utc)
+    with Session(database.engine) as db:
+        db.execute(
+            update(ScannerLease)
+            .where(ScannerLease.name == name, ScannerLease.holder == holder)
+            .values(expires_at=now, updated_at=now)
+        )
+        db.commit()
+
+
+def load_checkpoint(name: str) -> Optional[tuple[datetime, int]]:
+    """The (stalls_at, id) cursor an unfinished scan stopped at, or None to start fresh."""
+    with Session(database.engine) as db:
+        lease = db.get(ScannerLease, name)
+        if lease is None or lease.checkpoint_task_id is None:
+            return None
+        return lease.checkpoint_stalls_at, lease.checkpoint_task_id
+
+
+def save_checkpoint(name: str, cursor: Optional[tuple[datetime, int]], holder: str = HOLDER_ID) -> bool:
+    """Store the resume cursor (None clears it). Returns False if the lease was lost."""
+    stalls_at, task_id = cursor if cursor else (None, None)
+    with Session(database.engine) as db:
+        result = db.execute(
+            update(ScannerLease)
+            .where(ScannerLease.name == name, ScannerLease.holder == holder)
+            .values(checkpoint_stalls_at=stalls_at, checkpoint_task_id=task_id)
+        )
+        db.commit()
+        return bool(result.rowcount)
@@ -0,0 +1,292 @@
+"""Per-workspace task change feed.
+
+Every task write bumps its workspace's ``data_version`` and stamps the task with
+the new value as ``change_seq``. That happens in a ``before_flush`` hook, so all
+ORM write paths (REST routes, agent tools, copy/move) feed it without extra
+code. Bulk statements that skip the ORM call ``reserve_seqs`` + ``queue_events``
+themselves. Events are published in-process after the transaction commits.
+
+The counter is a row in the writer's own transaction on purpose: the row lock
+makes sequence numbers commit in order, so a reader that has seen ``seq`` N can
+never later miss a write numbered below N. A sequence or counter outside the
+transaction would hand out numbers that commit out of order. The cost is that
+writers to one workspace queue on that row from their task flush (normally
+inside ``commit()``) to COMMIT; writers in different workspaces do not.
+``scripts/bench_feed_contention.py`` measures it.
+
+Lock order: every write path locks the workspace rows it needs (in ascending
+id order) before it touches any task row. The flush hook does this by itself,
+since it runs before the flush's UPDATEs; code issuing its own task statements
+calls ``reserve_seqs`` (or ``lock_workspace``) first. Taking the task row
+first anywhere would let two writers deadlock on PostgreSQL.
+
+Subscribers resume from a sequence number. The last FEED_BUFFER_SIZE events per
+workspace are kept in memory; older gaps (or writes made by another worker
+process) are filled from the database with ``changes_since``, the same query
+behind GET /tasks/changes.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.sql import ClauseElement
+from sqlmodel import select as sqlmodel_select
+
+from ..config import settings
+from ..models.task import Task, TaskPublic
+from ..models.task_tombstone import TaskTombstone
+from ..models.workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_FIELDS = tuple(TaskPublic.model_fields)
+
+_PENDING_KEY = "task_feed_pending"
+_EVENTS_KEY = "task_feed_events"
+
+
+def reserve_seqs(session, workspace_id: int, count: int) -> int:
+    """Bump the workspace's data_version by ``count`` and return the first reserved sequence number.
+
+    Locks the workspace row until the transaction ends, so call it before any
+    statement that touches this workspace's task rows (see the module docstring).
+    """
+    conn = session.connection()
+    conn.execute(
+        update(Workspace.__table__)
+        .where(Workspace.__table__.c.id == workspace_id)
+        .values(data_version=Workspace.__table__.c.data_version + count)
+    )
+    latest = conn.execute(
+        select(Workspace.__table__.c.data_version).where(Workspace.__table__.c.id == workspace_id)
+    ).scalar_one()
+    return latest - count + 1
+
+
+def lock_workspace(session, workspace_id: int) -> None:
+    """Take the workspace row's lock without reserving a number, for a task statement that runs before the flush."""
+    session.connection().execute(
+        update(Workspace.__table__)
+        .where(Workspace.__table__.c.id == workspace_id)
+        .values(data_version=Workspace.__table__.c.data_version)
+    )
+
+
+def queue_events(session, events: list[dict]) -> None:
+    """Publish ``events`` once the session's transaction commits (dropped on rollback)."""
+    session.info.setdefault(_EVENTS_KEY, []).extend(events)
+
+
+def _task_changes(task: Task) -> dict:
+    # Raw values; encoded in _collect_task_events once SQL-expression values (e.g. merged custom_fields) are known
+    state = sa_inspect(task)
+    return {
+        name: getattr(task, name)
+        for name in PUBLIC_FIELDS
+        if name in state.attrs and state.attrs[name].history.has_changes()
+    }
+
+
+def _resolved_changes(task: Task, changes: dict) -> dict:
+    return jsonable_encoder({
+        name: getattr(task, name) if isinstance(value, ClauseElement) else value
+        for name, value in changes.items()
+    })
+
+
+def _full_task(task: Task) -> dict:
+    return jsonable_encoder({name: getattr(task, name) for name in PUBLIC_FIELDS})
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _stamp_task_writes(session, flush_context, instances):
+    # (workspace_id, op, task) for every task write in this flush
+    writes: list[tuple[int, str, Task]] = []
+    for obj in session.new:
+        if isinstance(obj, Task) and obj.workspace_id:
+            writes.append((obj.workspace_id, "create", obj))
+    for obj in session.dirty:
+        if not isinstance(obj, Task) or not session.is_modified(obj):
+            continue
+        moved_from = sa_inspect(obj).attrs.workspace_id.history.deleted
+        if moved_from and moved_from[0] and moved_from[0] != obj.workspace_id:
+            # Moving to another workspace looks like a delete to the old one
+            writes.append((moved_from[0], "delete", obj))
+            if obj.workspace_id:
+                writes.append((obj.workspace_id, "create", obj))
+        elif obj.workspace_id:
+            writes.append((obj.workspace_id, "update", obj))
+    for obj in session.deleted:
+        if isinstance(obj, Task) and obj.workspace_id:
+            writes.append((obj.workspace_id, "delete", obj))
+    if not writes:
+        return
+
+    counts: dict[int, int] = {}
+    for workspace_id, _op, _task in writes:
+        counts[workspace_id] = counts.get(workspace_id, 0) + 1
+    next_seq = {ws_id: reserve_seqs(session, ws_id, counts[ws_id]) for ws_id in sorted(counts)}
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for workspace_id, op, task in writes:
+        seq = next_seq[workspace_id]
+        next_seq[workspace_id] += 1
+        if op == "delete":
+            # Lets delta sync (GET /tasks/changes) report the removal
+            session.add(TaskTombstone(task_id=task.id, workspace_id=workspace_id, seq=seq))
+        else:
+            task.change_seq = seq
+        # Diffs are taken now, before the flush clears attribute history
+        pending.append((workspace_id, op, seq, task, _task_changes(task) if op == "update" else None))
+
+
+@event.listens_for(OrmSession, "after_flush_postexec")
+def _collect_task_events(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    events = []
+    for workspace_id, op, seq, task, changes in pending:
+        evt = {"workspace_id": workspace_id, "seq": seq, "op": op, "task_id": task.id}
+        if op == "create":
+            evt["task"] = _full_task(task)
+        elif op == "update":
+            evt["changes"] = _resolved_changes(task, changes)
+        events.append(evt)
+    queue_events(session, events)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_task_events(session):
+    events = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        get_task_feed().publish(events)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _drop_task_events(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_EVENTS_KEY, None)
+
+
+def changes_since(session, workspace_id: int, since: int, limit: int) -> dict:
+    """Tasks written and tasks removed after sequence ``since``, oldest first, at most ``limit`` entries.
+
+    Returns ``{"seq", "tasks", "deleted", "has_more"}``; pass ``seq`` back as the
+    next ``since``. ``since=0`` is a full sync.
+    """
+    tasks = session.exec(
+        sqlmodel_select(Task)
+        .where(Task.workspace_id == workspace_id, Task.change_seq > since)
+        .order_by(Task.change_seq)
+        .limit(limit + 1)
+    ).all()
+    tombstones = session.exec(
+        sqlmodel_select(TaskTombstone)
+        .where(TaskTombstone.workspace_id == workspace_id, TaskTombstone.seq > since)
+        .order_by(TaskTombstone.seq)
+        .limit(limit + 1)
+    ).all()
+    merged = sorted(
+        [(t.change_seq, "task", t) for t in tasks] + [(d.seq, "deleted", d) for d in tombstones],
+        key=lambda entry: entry[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    if has_more:
+        seq = merged[-1][0]
+    else:
+        seq = max(since, session.exec(
+            sqlmodel_select(Workspace.data_version).where(Workspace.id == workspace_id)
+        ).one())
+
+    changed = [t for _, kind, t in merged if kind == "task"]
+    present = {t.id for t in changed}
+    # A task can leave and come back (moved out and in again); its latest state wins
+    deleted = sorted({d.task_id for _, kind, d in merged if kind == "deleted"} - present)
+    return {"seq": seq, "tasks": changed, "deleted": deleted, "has_more": has_more}
+
+
+class Subscription:
+    """One feed consumer. Events are pushed from any thread onto its event loop."""
+
+    def __init__(self, workspace_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.workspace_id = workspace_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.lagged = False
+        self._loop = loop
+
+    def _put(self, evt: dict):
+        try:
+            self.queue.put_nowait(evt)
+        except asyncio.QueueFull:
+            # Slow consumer: stop buffering, it gets caught up from the DB instead
+            self.lagged = True
+
+    def push(self, evt: dict):
+        self._loop.call_soon_threadsafe(self._put, evt)
+
+
+class TaskFeed:
+    """In-process fan-out of task change events with a short per-workspace replay buffer."""
+
+    def __init__(self, buffer_size: int | None = None):
+        self._buffer_size = buffer_size or settings.TASK_FEED_BUFFER_SIZE
+        self._lock = threading.Lock()
+        self._buffers: dict[int, deque] = {}
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def publish(self, events: list[dict]) -> None:
+        with self._lock:
+            for evt in events:
+                buffer = self._buffers.setdefault(evt["workspace_id"], deque(maxlen=self._buffer_size))
+                buffer.append(evt)
+                for sub in self._subscribers.get(evt["workspace_id"], ()):
+                    sub.push(evt)
+
+    def subscribe(self, workspace_id: int, since: int, current: int) -> tuple[Subscription, Optional[list[dict]]]:
+        """Register a subscriber. Returns (subscription, backlog after ``since``).
+
+        ``current`` is the workspace's data_version read from the DB just before
+        subscribing. The backlog is None when the buffer can't cover the gap.
+        """
+        sub = Subscription(workspace_id, asyncio.get_running_loop(), settings.TASK_FEED_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(workspace_id, set()).add(sub)
+            buffered = [evt for evt in self._buffers.get(workspace_id, ()) if evt["seq"] > since]
+        if since >= current:
+            return sub, buffered
+        # Every seq in (since, current] must be in the buffer
+        seqs = {evt["seq"] for evt in buffered}
+        if all(seq in seqs for seq in range(since + 1, current + 1)):
+            return sub, buffered
+        return sub, None
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.workspace_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.workspace_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+# Singleton
+_feed: Optional[TaskFeed] = None
+
+
+def get_task_feed() -> TaskFeed:
+    global _feed
+    if _feed is None:
+        _feed = TaskFeed()
+    return _feed
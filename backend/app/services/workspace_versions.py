@@ -0,0 +1,57 @@
+"""Workspace metadata version.
+
+``Workspace.meta_version`` is bumped whenever a workspace's settings, columns,
+members or invites change, so reads of those can carry an ETag without loading
+them. The member list also shows each member's username and email, so a change
+to either bumps every workspace the user belongs to. Task writes use ``data_version`` instead (see ``task_feed``). Like the
+task feed, the bump happens in a ``before_flush`` hook so every ORM write path
+is covered.
+"""
+
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.orm import Session as OrmSession
+
+from ..models.column_config import ColumnConfig
+from ..models.user import User
+from ..models.workspace import Workspace, WorkspaceInvite, WorkspaceMember
+
+_TRACKED = (ColumnConfig, WorkspaceMember, WorkspaceInvite)
+# User fields shown by GET /workspaces/{id}/members
+_MEMBER_FIELDS = ("username", "email")
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _bump_meta_versions(session, flush_context, instances):
+    touched = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, _TRACKED) and obj.workspace_id:
+            touched.add(obj.workspace_id)
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, _TRACKED) and obj.workspace_id:
+            touched.add(obj.workspace_id)
+        elif isinstance(obj, Workspace):
+            touched.add(obj.id)
+        elif isinstance(obj, User) and any(
+            sa_inspect(obj).attrs[name].history.has_changes() for name in _MEMBER_FIELDS
+        ):
+            members = WorkspaceMember.__table__
+            touched.update(session.connection().execute(
+                select(members.c.workspace_id).where(members.c.user_id == obj.id)
+            ).scalars())
+    if not touched:
+        return
+    table = Workspace.__table__
+    session.connection().execute(
+        update(table).where(table.c.id.in_(touched)).values(meta_version=table.c.meta_version + 1)
+    )
+
+
+def meta_versions(session, workspace_ids: list[int]) -> dict[int, int]:
+    """``{workspace_id: meta_version}`` for the given workspaces."""
+    table = Workspace.__table__
+    rows = session.execute(
+        select(table.c.id, table.c.meta_version).where(table.c.id.in_(workspace_ids))
+    ).all()
+    return dict(rows)
@@ -0,0 +1,79 @@
+"""Startup profiling.
+
+``python -m app.startup_profile`` reports how long each module takes to import
+(parsed from ``python -X importtime``) and how long each lifespan step takes.
+Setting STARTUP_PROFILE=true logs the lifespan step timings on a normal boot too.
+"""
+
+import logging
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# (step name, milliseconds) for the most recent lifespan run
+step_timings: list[tuple[str, float]] = []
+
+
+@contextmanager
+def startup_step(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        step_timings.append((name, elapsed_ms))
+        if settings.STARTUP_PROFILE:
+            logger.info("Startup step %s took %.1f ms", name, elapsed_ms)
+
+
+def import_times(module: str = "app.main") -> list[tuple[str, float, float]]:
+    """``(module, self ms, cumulative ms)`` for everything imported by ``import module``, in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def _run_lifespan():
+    import asyncio
+
+    from .main import app
+
+    async def _boot():
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(_boot())
+
+
+def main(top: int = 25):
+    rows = import_times()
+    total = next((cumulative for name, _self, cumulative in rows if name == "app.main"), 0.0)
+    print(f"import app.main: {total:.1f} ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_ms, cumulative_ms in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_ms:>14.1f} {self_ms:>9.1f}  {name}")
+
+    _run_lifespan()
+    # Under ``python -m`` this file is __main__; the lifespan recorded into the imported app.startup_profile
+    from . import startup_profile
+
+    print("\nlifespan steps:")
+    for name, elapsed_ms in startup_profile.step_timings:
+        print(f"{elapsed_ms:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
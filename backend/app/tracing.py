@@ -0,0 +1,276 @@
+"""Optional OpenTelemetry tracing.
+
+Off unless ``TRACING_ENABLED`` is set and the opentelemetry SDK is installed;
+until ``configure()`` runs, every helper here is a no-op. When on, spans cover:
+
+- HTTP requests and WebSocket connections (``TracingMiddleware``, named by route template);
+- SQL statements on every engine (SQLAlchemy cursor events);
+- AgentBridge httpx calls (``wrap_transport``) and upstream agent WebSocket
+  messages (``span()`` around each send, ``message_spans()`` per received message);
+- LLM provider calls (``LLMRouter._timed``).
+
+Trace context is taken from incoming ``traceparent`` headers and sent on to the
+agents service on both HTTP and WebSocket connects (``trace_headers()``).
+Work moved to ``asyncio.to_thread`` keeps its parent span, since contextvars
+are copied into the thread.
+
+Exporters (``TRACING_EXPORTER``): ``otlp`` (needs opentelemetry-exporter-otlp),
+``console``, or ``file`` — JSON lines at ``TRACING_FILE``, one span per line,
+which is what tests read back.
+"""
+
+import json
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .route_template import route_template
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+_provider = None
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+class JsonLinesFileExporter:
+    """SpanExporter appending each finished span to ``path`` as one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = [json.dumps(_span_dict(s)) + "\n" for s in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _span_dict(span) -> dict:
+    ctx, parent = span.get_span_context(), span.parent
+    return {
+        "name": span.name,
+        "trace_id": f"{ctx.trace_id:032x}",
+        "span_id": f"{ctx.span_id:016x}",
+        "parent_id": f"{parent.span_id:016x}" if parent else None,
+        "kind": span.kind.name,
+        "status": span.status.status_code.name,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "attributes": dict(span.attributes or {}),
+    }
+
+
+def _build_exporter(kind: str):
+    if kind == "file":
+        return JsonLinesFileExporter(settings.TRACING_FILE)
+    if kind == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()  # endpoint from OTEL_EXPORTER_OTLP_ENDPOINT
+    raise ValueError(f"Unknown TRACING_EXPORTER: {kind}")
+
+
+def configure(exporter=None) -> bool:
+    """Start tracing if enabled (or ``exporter`` is given, as tests do). Returns whether tracing is on."""
+    global _tracer, _provider
+    if exporter is None and not settings.TRACING_ENABLED:
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+    except ModuleNotFoundError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing stays off")
+        return False
+
+    shutdown()
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}))
+    if exporter is not None:
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        processor = SimpleSpanProcessor if settings.TRACING_EXPORTER == "file" else BatchSpanProcessor
+        provider.add_span_processor(processor(_build_exporter(settings.TRACING_EXPORTER)))
+    # Our own provider rather than the global one, so configure() can be called again (tests)
+    _provider, _tracer = provider, provider.get_tracer("taskme")
+    return True
+
+
+def shutdown() -> None:
+    """Flush and stop the current provider; helpers go back to no-ops."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+def span(name: str, **attributes):
+    """Context manager for a child span of the current one; no-op when tracing is off."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def trace_headers() -> dict[str, str]:
+    """``traceparent`` (and ``tracestate``) for the current span, to send to the agents service."""
+    if _tracer is None:
+        return {}
+    from opentelemetry import propagate
+
+    headers: dict[str, str] = {}
+    propagate.inject(headers)
+    return headers
+
+
+def websocket_connect_kwargs() -> dict:
+    """Trace headers as ``websockets.connect`` keyword arguments (the name changed in websockets 14)."""
+    headers = trace_headers()
+    if not headers:
+        return {}
+    import websockets
+
+    major = int(websockets.__version__.split(".")[0])
+    return {"additional_headers" if major >= 14 else "extra_headers": headers}
+
+
+async def recv_message(ws, timeout: float) -> dict:
+    """Wait for and decode one upstream agent WebSocket message, inside an ``agent_ws.recv`` span."""
+    import asyncio
+
+    with span("agent_ws.recv") as current:
+        msg = json.loads(await asyncio.wait_for(ws.recv(), timeout=timeout))
+        if current is not None:
+            current.set_attribute("agent_ws.message_type", str(msg.get("type")))
+        return msg
+
+
+async def message_spans(ws, name: str):
+    """Decode each message from upstream WebSocket ``ws`` and yield it inside a ``name`` span.
+
+    The span stays open while the caller handles the message, so the work it
+    triggers nests under it. Call ``aclose()`` from the same task when done.
+    """
+    async for raw in ws:
+        msg = json.loads(raw)
+        with span(name, **{"agent_ws.message_type": str(msg.get("type"))}):
+            yield msg
+
+
+@contextmanager
+def _server_span(scope):
+    from opentelemetry import context, propagate, trace
+
+    carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+    kind = "WS" if scope["type"] == "websocket" else scope["method"]
+    token = context.attach(propagate.extract(carrier))
+    try:
+        with _tracer.start_as_current_span(f"{kind} {scope['path']}", kind=trace.SpanKind.SERVER,
+                                           attributes={"http.method": kind, "http.target": scope["path"]}) as current:
+            try:
+                yield current
+            finally:
+                route = route_template(scope)
+                if route:
+                    # Name by template so spans group the way the metrics do
+                    current.update_name(f"{kind} {route}")
+                    current.set_attribute("http.route", route)
+    finally:
+        context.detach(token)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request or WebSocket connection."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        with _server_span(scope) as current:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    current.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        from opentelemetry.trace import Status, StatusCode
+                        current.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def wrap_transport(transport):
+    """Wrap an httpx async transport so each request gets a client span and carries the trace context."""
+    import httpx
+
+    class TracingTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            if _tracer is None:
+                return await transport.handle_async_request(request)
+            from opentelemetry import trace
+
+            with _tracer.start_as_current_span(
+                f"{request.method} {request.url.path}", kind=trace.SpanKind.CLIENT,
+                attributes={"http.method": request.method, "http.url": str(request.url.copy_with(query=None))},
+            ) as current:
+                request.headers.update(trace_headers())
+                response = await transport.handle_async_request(request)
+                current.set_attribute("http.status_code", response.status_code)
+                return response
+
+        async def aclose(self):
+            await transport.aclose()
+
+    return TracingTransport()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None or context is None:
+        return
+    from opentelemetry import trace
+
+    context._otel_span = _tracer.start_span("db.query", kind=trace.SpanKind.CLIENT, attributes={
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:2000],
+        "db.executemany": executemany,
+    })
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+    current = getattr(context, "_otel_span", None)
+    if current is not None:
+        current.end()
+        context._otel_span = None
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(exception_context):
+    current = getattr(exception_context.execution_context, "_otel_span", None)
+    if current is not None:
+        from opentelemetry.trace import Status, StatusCode
+
+        current.record_exception(exception_context.original_exception)
+        current.set_status(Status(StatusCode.ERROR))
+        current.end()
+        exception_context.execution_context._otel_span = None
@@ -0,0 +1,128 @@
+"""
+Bandwidth/latency trade-off of response compression (see app/compression.py).
+
+Builds GET /tasks-shaped JSON payloads of several sizes, compresses each with every
+installed encoder, and reports the compression ratio, encode time and the estimated
+time to deliver the body (encode + transfer) over a few link speeds, next to identity.
+
+The "endpoint" section then requests GET /api/v1/tasks through the real app (and so
+through every middleware layer) with each Accept-Encoding, reporting the bytes that
+actually went on the wire and the in-process latency.
+
+Usage:
+    python -m scripts.bench_compression
+    python -m scripts.bench_compression --rows 10 100 500 --mbps 1 10 100
+    python -m scripts.bench_compression --json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _payload(rows: int) -> bytes:
+    """A list page shaped like TaskPublic rows."""
+    tasks = [{
+        "id": i, "task_name": f"Task {i}", "description": "Follow up with the vendor about the renewal terms. " * 4,
+        "owner": f"Owner {i % 7}", "email": f"owner{i % 7}@example.com", "start_date": None,
+        "due_date": f"2026-0{1 + i % 9}-1{i % 10}", "status": ["To Do", "In Progress", "Done"][i % 3],
+        "priority": ["Low", "Medium", "High"][i % 3], "custom_fields": json.dumps({"cf_sprint": str(i % 12)}),
+        "created_at": "2026-01-05T09:30:00Z", "updated_at": "2026-01-06T10:00:00Z", "agent_mode": None,
+        "agent_id": None, "agent_session_id": None, "agent_status": None, "parent_task_id": None,
+        "agent_nudge": None, "agent_nudge_at": None, "version": 1,
+    } for i in range(rows)]
+    return json.dumps(tasks, separators=(",", ":")).encode()
+
+
+def _encode_ms(encoder, body: bytes, iterations: int) -> tuple[float, int]:
+    samples, size = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        size = len(encoder(body))
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, size
+
+
+def _bench(args) -> list[dict]:
+    from app.compression import available_encoders
+
+    encoders = {"identity": lambda body: body, **available_encoders()}
+    results = []
+    for rows in args.rows:
+        body = _payload(rows)
+        for name, encoder in encoders.items():
+            encode_ms, size = _encode_ms(encoder, body, args.iterations)
+            # bytes * 8 / (Mbit/s * 1e6) seconds -> ms
+            deliver = {f"{mbps}mbps_ms": round(encode_ms + size * 8 / (mbps * 1000), 3) for mbps in args.mbps}
+            results.append({
+                "rows": rows, "encoding": name, "bytes": size, "ratio": round(len(body) / size, 2),
+                "encode_ms": round(encode_ms, 3), **deliver,
+            })
+    return results
+
+
+def _bench_endpoint(args) -> list[dict]:
+    """Wire bytes and latency of GET /tasks through the full middleware stack, per Accept-Encoding."""
+    import tempfile
+
+    from fastapi.testclient import TestClient
+
+    from app.compression import available_encoders
+    from scripts.bench_task_list import _setup_app, _time
+
+    rows = max(args.rows)
+    results = []
+    with tempfile.TemporaryDirectory() as db_dir:
+        app, _engine, workspace_id, headers = _setup_app(db_dir, rows)
+        client = TestClient(app, headers=headers)
+        url = f"/api/v1/tasks?workspace_id={workspace_id}&limit={min(rows, 500)}"
+        for name in ("identity", *available_encoders()):
+            with client.stream("GET", url, headers={"Accept-Encoding": name}) as resp:
+                wire = len(b"".join(resp.iter_raw()))
+                applied = resp.headers.get("content-encoding", "identity")
+            timing = _time(lambda: client.get(url, headers={"Accept-Encoding": name}).raise_for_status(), args.iterations)
+            results.append({"rows": rows, "encoding": name, "applied": applied, "wire_bytes": wire, **timing})
+    return results
+
+
+def _print_table(results: list[dict], endpoint: list[dict], args):
+    print("=" * 88)
+    print(f"Response compression — median of {args.iterations} encodes; deliver = encode + transfer")
+    print("=" * 88)
+    speeds = "".join(f"{f'@{mbps}Mbps':>12}" for mbps in args.mbps)
+    for rows in args.rows:
+        print(f"\n{rows} rows:")
+        print(f"  {'encoding':<10}{'bytes':>10}{'ratio':>8}{'encode':>10}{speeds}")
+        for r in (r for r in results if r["rows"] == rows):
+            delivered = "".join(f"{r[f'{mbps}mbps_ms']:>10}ms" for mbps in args.mbps)
+            print(f"  {r['encoding']:<10}{r['bytes']:>10}{r['ratio']:>8}{r['encode_ms']:>8}ms{delivered}")
+    if endpoint:
+        print(f"\nendpoint (GET /api/v1/tasks, {endpoint[0]['rows']} rows, full middleware stack):")
+        print(f"  {'requested':<10}{'applied':<10}{'wire bytes':>12}{'mean':>10}{'p50':>10}")
+        for r in endpoint:
+            print(f"  {r['encoding']:<10}{r['applied']:<10}{r['wire_bytes']:>12}{r['mean_ms']:>8}ms{r['p50_ms']:>8}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the bandwidth/latency trade-off of response compression")
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 100, 500])
+    parser.add_argument("--mbps", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = _bench(args)
+    endpoint = _bench_endpoint(args)
+    if args.json:
+        print(json.dumps({"encoders": results, "endpoint": endpoint}, indent=2))
+    else:
+        _print_table(results, endpoint, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Cost of the change feed's per-workspace sequence counter (see app/services/task_feed.py).
+
+Every task write bumps its workspace's data_version inside the write transaction, so
+writers to the same workspace queue on that row until the previous one commits.
+This runs the same task updates from several threads twice — all writers in one
+workspace, then each writer in its own workspace — and reports throughput and
+commit latency for both. The gap between the two is what the counter costs.
+
+SQLite allows one writer per database whatever the workspace, so both cases queue
+there; point --database-url at a scratch PostgreSQL database for meaningful numbers.
+The tables are created if missing and the seeded rows are left behind.
+
+Usage:
+    python -m scripts.bench_feed_contention
+    python -m scripts.bench_feed_contention --database-url postgresql://localhost/taskme_bench --writers 16
+    python -m scripts.bench_feed_contention --json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _setup(database_url: str, writers: int):
+    """Point the app at ``database_url`` and seed one shared workspace plus one workspace per writer."""
+    from app.config import settings
+
+    settings.DATABASE_URL = database_url
+
+    import app.database as database
+    database.engine = database._build_engine()
+    database.create_db_and_tables()
+
+    from sqlmodel import Session
+    from app.models.task import Task
+    from app.models.user import User
+    from app.models.workspace import Workspace
+
+    with Session(database.engine) as session:
+        user = User(username=f"bench-{time.time_ns()}", email=f"bench-{time.time_ns()}@taskme.local",
+                    hashed_password="!", email_verified=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        workspaces = [Workspace(name=f"Bench {i}", owner_id=user.id) for i in range(writers + 1)]
+        session.add_all(workspaces)
+        session.commit()
+        shared, own = workspaces[0].id, [ws.id for ws in workspaces[1:]]
+        tasks = {
+            "shared": [Task(task_name=f"Shared {i}", workspace_id=shared, user_id=user.id) for i in range(writers)],
+            "separate": [Task(task_name=f"Own {i}", workspace_id=ws_id, user_id=user.id) for i, ws_id in enumerate(own)],
+        }
+        session.add_all(tasks["shared"] + tasks["separate"])
+        session.commit()
+        return database.engine, {case: [t.id for t in rows] for case, rows in tasks.items()}
+
+
+def _run(engine, task_ids: list[int], writes: int) -> dict:
+    """Each thread updates its own task ``writes`` times, one transaction per write."""
+    from sqlmodel import Session
+    from app.models.task import Task
+
+    samples: list[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(task_ids))
+
+    def _writer(task_id: int):
+        own = []
+        barrier.wait()
+        for i in range(writes):
+            start = time.perf_counter()
+            with Session(engine) as session:
+                task = session.get(Task, task_id)
+                task.description = f"write {i}"
+                session.commit()
+            own.append(time.perf_counter() - start)
+        with lock:
+            samples.extend(own)
+
+    threads = [threading.Thread(target=_writer, args=(task_id,)) for task_id in task_ids]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    return {
+        "writes_per_s": round(len(samples) / elapsed, 1),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def _bench(args) -> list[dict]:
+    with tempfile.TemporaryDirectory() as db_dir:
+        engine, task_ids = _setup(args.database_url or f"sqlite:///{db_dir}/bench.db", args.writers)
+        results = [{"case": case, **_run(engine, task_ids[case], args.writes)} for case in ("separate", "shared")]
+        engine.dispose()
+        return results
+
+
+def _print_table(results: list[dict], args):
+    print("=" * 72)
+    print(f"Change feed counter contention — {args.writers} writers x {args.writes} writes, "
+          f"{(args.database_url or 'sqlite').split(':')[0]}")
+    print("=" * 72)
+    print(f"  {'workspaces':<12}{'writes/s':>12}{'p50':>12}{'p95':>12}")
+    for r in results:
+        print(f"  {r['case']:<12}{r['writes_per_s']:>12}{r['p50_ms']:>10}ms{r['p95_ms']:>10}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure writer contention on the per-workspace change feed counter")
+    parser.add_argument("--database-url", help="Scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writer threads")
+    parser.add_argument("--writes", type=int, default=50, help="Transactions per writer")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = _bench(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results, args)
+
+
+if __name__ == "__main__":
+    main()
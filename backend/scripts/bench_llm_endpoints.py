@@ -0,0 +1,198 @@
+"""
+Offline benchmark for the LLM-backed endpoints: POST /parse and POST /tasks/smart-search.
+
+Runs the FastAPI app in-process (httpx ASGI transport, throwaway SQLite DB) against
+scripts/fake_llm_server.py, so no network or API keys are needed. Reports throughput,
+latency percentiles and how saturated the AnyIO worker threadpool got — sync
+endpoints and the LLM SDK calls both run on that pool.
+
+Usage:
+    python -m scripts.bench_llm_endpoints
+    python -m scripts.bench_llm_endpoints --requests 400 --concurrency 64 --latency 0.5
+    python -m scripts.bench_llm_endpoints --endpoints parse --provider anthropic --threadpool-size 80
+    python -m scripts.bench_llm_endpoints --json
+"""
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.fake_llm_server import FakeLLMConfig, start_fake_llm_server  # noqa: E402
+
+PARSE_TEXT = "Alice needs to finish the quarterly report by Friday, urgent. Bob should book the offsite venue."
+SEARCH_QUERY = "urgent tasks in progress sorted by due date"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _setup_app(db_dir: str, llm_port: int, provider: str):
+    """Point settings at the fake LLM + a scratch DB, then import the app and seed a user."""
+    from app.config import settings
+
+    settings.DATABASE_URL = f"sqlite:///{db_dir}/bench.db"
+    settings.LLM_PROVIDER = provider
+    settings.OPENAI_API_KEY = "fake"
+    settings.ANTHROPIC_API_KEY = "fake"
+    settings.OPENAI_BASE_URL = f"http://127.0.0.1:{llm_port}/v1"
+    settings.ANTHROPIC_BASE_URL = f"http://127.0.0.1:{llm_port}"
+
+    import app.database as database
+    database.engine = database._build_engine()
+    database.create_db_and_tables()
+
+    from sqlmodel import Session
+    from app.auth import create_access_token, hash_password
+    from app.main import app
+    from app.models.user import User
+    from app.models.workspace import Workspace, WorkspaceMember
+
+    with Session(database.engine) as session:
+        user = User(username="bench", email="bench@taskme.local", hashed_password=hash_password("Bench1234"), email_verified=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        ws = Workspace(name="Bench", owner_id=user.id)
+        session.add(ws)
+        session.commit()
+        session.refresh(ws)
+        session.add(WorkspaceMember(workspace_id=ws.id, user_id=user.id, role="owner"))
+        session.commit()
+        database.seed_core_columns_for_workspace(session, ws.id, user.id)
+        token = create_access_token(data={"sub": user.username, "user_id": user.id})
+        return app, ws.id, {"Authorization": f"Bearer {token}"}
+
+
+async def _sample_threadpool(samples: list[tuple[int, int, int]], stop: asyncio.Event):
+    import anyio.to_thread
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    while not stop.is_set():
+        stats = limiter.statistics()
+        samples.append((stats.borrowed_tokens, int(stats.total_tokens), stats.tasks_waiting))
+        await asyncio.sleep(0.01)
+
+
+async def _run_endpoint(client, name: str, method_args: tuple, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            url, body = method_args
+            start = time.perf_counter()
+            resp = await client.post(url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code != 200:
+                errors += 1
+
+    samples: list[tuple[int, int, int]] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_threadpool(samples, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    busy = [b / t for b, t, _ in samples if t]
+    return {
+        "endpoint": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "threadpool_size": samples[-1][1] if samples else None,
+        "threadpool_peak_busy": max((b for b, _, _ in samples), default=0),
+        "threadpool_mean_util": round(statistics.fmean(busy), 3) if busy else 0.0,
+        "threadpool_saturated_pct": round(100 * sum(1 for b, t, _ in samples if t and b >= t) / len(samples), 1) if samples else 0.0,
+        "threadpool_peak_waiting": max((w for _, _, w in samples), default=0),
+    }
+
+
+async def _bench(args) -> list[dict]:
+    import anyio.to_thread
+    import httpx
+
+    llm_server, _ = start_fake_llm_server(config=FakeLLMConfig(args.latency, args.jitter, args.error_rate))
+    try:
+        with tempfile.TemporaryDirectory() as db_dir:
+            app, workspace_id, headers = _setup_app(db_dir, llm_server.server_port, args.provider)
+            if args.threadpool_size:
+                anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+
+            targets = {
+                "parse": ("/api/v1/parse", {"text": PARSE_TEXT, "workspace_id": workspace_id}),
+                "smart-search": ("/api/v1/tasks/smart-search", {"query": SEARCH_QUERY}),
+            }
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+                results = []
+                for name in args.endpoints:
+                    # Warm-up: imports, SDK client construction, first DB connection
+                    await client.post(targets[name][0], json=targets[name][1])
+                    results.append(await _run_endpoint(client, name, targets[name], args.requests, args.concurrency))
+                return results
+    finally:
+        llm_server.shutdown()
+
+
+def _print_table(results: list[dict], args):
+    print("=" * 72)
+    print(f"LLM endpoint benchmark — provider={args.provider} fake latency={args.latency}s ± {args.jitter}s")
+    print("=" * 72)
+    for r in results:
+        print(f"\n{r['endpoint']}: {r['requests']} requests @ concurrency {r['concurrency']}")
+        print(f"  throughput     {r['throughput_rps']:>8} req/s   ({r['elapsed_s']}s, {r['errors']} errors)")
+        print(f"  latency        p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  p99 {r['p99_ms']}ms  max {r['max_ms']}ms")
+        print(f"  threadpool     size {r['threadpool_size']}  peak busy {r['threadpool_peak_busy']}  "
+              f"mean util {r['threadpool_mean_util']:.0%}  saturated {r['threadpool_saturated_pct']}% of samples  "
+              f"peak waiting {r['threadpool_peak_waiting']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /parse and /tasks/smart-search against a fake LLM")
+    parser.add_argument("--endpoints", nargs="+", choices=["parse", "smart-search"], default=["parse", "smart-search"])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake LLM response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--threadpool-size", type=int, default=0, help="Override the AnyIO threadpool size (default 40)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(_bench(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results, args)
+
+
+if __name__ == "__main__":
+    main()
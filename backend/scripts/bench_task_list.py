@@ -0,0 +1,152 @@
+"""
+Micro-benchmark for GET /tasks serialization: the validated response_model path vs the
+fast path (TaskPublic columns as row tuples, encoded with orjson) — see app/fast_json.py.
+
+Seeds a throwaway SQLite DB with one workspace of tasks, then measures both:
+  - serialize: query + encode only, no HTTP
+  - endpoint:  the full GET /api/v1/tasks request in-process, toggling TASK_LIST_FAST_JSON
+
+Usage:
+    python -m scripts.bench_task_list
+    python -m scripts.bench_task_list --tasks 500 --iterations 200
+    python -m scripts.bench_task_list --json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _setup_app(db_dir: str, n_tasks: int):
+    """Point settings at a scratch DB, then import the app and seed a user with ``n_tasks`` tasks."""
+    from app.config import settings
+
+    settings.DATABASE_URL = f"sqlite:///{db_dir}/bench.db"
+
+    import app.database as database
+    database.engine = database._build_engine()
+    database.create_db_and_tables()
+
+    from sqlmodel import Session
+    from app.auth import create_access_token, hash_password
+    from app.main import app
+    from app.models.task import Task, TaskPriority, TaskStatus
+    from app.models.user import User
+    from app.models.workspace import Workspace, WorkspaceMember
+
+    with Session(database.engine) as session:
+        user = User(username="bench", email="bench@taskme.local", hashed_password=hash_password("Bench1234"), email_verified=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        ws = Workspace(name="Bench", owner_id=user.id)
+        session.add(ws)
+        session.commit()
+        session.refresh(ws)
+        session.add(WorkspaceMember(workspace_id=ws.id, user_id=user.id, role="owner"))
+        statuses, priorities = list(TaskStatus), list(TaskPriority)
+        for i in range(n_tasks):
+            session.add(Task(
+                task_name=f"Task {i}", description="Follow up with the vendor about the renewal terms. " * 4,
+                owner=f"Owner {i % 7}", email=f"owner{i % 7}@example.com",
+                status=statuses[i % len(statuses)], priority=priorities[i % len(priorities)],
+                custom_fields=json.dumps({"cf_sprint": str(i % 12), "cf_estimate": i % 8}),
+                workspace_id=ws.id, user_id=user.id,
+            ))
+        session.commit()
+        token = create_access_token(data={"sub": user.username, "user_id": user.id})
+        return app, database.engine, ws.id, {"Authorization": f"Bearer {token}"}
+
+
+def _time(fn, iterations: int) -> dict:
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+    }
+
+
+def _bench(args) -> list[dict]:
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+    from sqlmodel import Session, select
+
+    from app import fast_json
+    from app.config import settings
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        app, engine, workspace_id, headers = _setup_app(db_dir, args.tasks)
+        from app.models.task import Task, TaskPublic
+
+        adapter = TypeAdapter(list[TaskPublic])
+        columns = fast_json.model_columns(Task, TaskPublic)
+
+        def validated():
+            with Session(engine) as session:
+                tasks = session.exec(select(Task).where(Task.workspace_id == workspace_id).limit(args.tasks)).all()
+                return adapter.dump_json(adapter.validate_python(tasks, from_attributes=True))
+
+        def fast():
+            with Session(engine) as session:
+                rows = session.exec(select(*columns).where(Task.workspace_id == workspace_id).limit(args.tasks))
+                return fast_json.dumps(fast_json.rows_as_dicts(rows))
+
+        results = [
+            {"case": "serialize", "path": "validated", **_time(validated, args.iterations)},
+            {"case": "serialize", "path": "fast", **_time(fast, args.iterations)},
+        ]
+
+        client = TestClient(app, headers=headers)
+        url = f"/api/v1/tasks?workspace_id={workspace_id}&limit={min(args.tasks, 500)}"
+        for path, enabled in (("validated", False), ("fast", True)):
+            settings.TASK_LIST_FAST_JSON = enabled
+            results.append({"case": "endpoint", "path": path, **_time(lambda: client.get(url).raise_for_status(), args.iterations)})
+        return results
+
+
+def _print_table(results: list[dict], args):
+    from app import fast_json
+
+    print("=" * 72)
+    print(f"GET /tasks serialization — {args.tasks} tasks, {args.iterations} iterations, "
+          f"encoder={'orjson' if fast_json.orjson else 'json'}")
+    print("=" * 72)
+    by_case: dict[str, dict[str, dict]] = {}
+    for r in results:
+        by_case.setdefault(r["case"], {})[r["path"]] = r
+    for case, paths in by_case.items():
+        print(f"\n{case}:")
+        for path, r in paths.items():
+            print(f"  {path:<10} mean {r['mean_ms']:>8}ms  p50 {r['p50_ms']:>8}ms  min {r['min_ms']:>8}ms")
+        if paths["fast"]["mean_ms"]:
+            print(f"  speedup    {paths['validated']['mean_ms'] / paths['fast']['mean_ms']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the validated and fast GET /tasks serialization paths")
+    parser.add_argument("--tasks", type=int, default=500, help="Tasks to seed (one list page is capped at 500)")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = _bench(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in for the OpenAI and Anthropic HTTP APIs, for offline benchmarks and tests.
+
+Serves POST /v1/chat/completions (OpenAI) and POST /v1/messages (Anthropic) with
+canned JSON after a configurable delay. Parse prompts get a task list, smart-search
+prompts get a filter object.
+
+Usage:
+    python -m scripts.fake_llm_server --port 8765 --latency 0.4 --jitter 0.1
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765
+    OPENAI_API_KEY=fake ANTHROPIC_API_KEY=fake
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_PARSE = {
+    "tasks": [
+        {
+            "task_name": "Finish quarterly report",
+            "description": None,
+            "owner": "Alice",
+            "email": None,
+            "start_date": None,
+            "due_date": "2026-01-09",
+            "priority": "High",
+        },
+        {
+            "task_name": "Book venue for offsite",
+            "description": None,
+            "owner": "Bob",
+            "email": None,
+            "start_date": None,
+            "due_date": None,
+            "priority": "Medium",
+        },
+    ]
+}
+
+CANNED_SEARCH = {"status": ["In Progress"], "priority": ["High", "Critical"], "owner": None,
+                 "search": None, "date_from": None, "date_to": None, "sort_by": "due_date", "order": "asc"}
+
+
+def _system_text(body: dict) -> str:
+    """Concatenate the system prompt from either API shape."""
+    system = body.get("system")
+    if isinstance(system, list):
+        return "".join(block.get("text", "") for block in system)
+    if isinstance(system, str):
+        return system
+    return "".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "system")
+
+
+class FakeLLMConfig:
+    def __init__(self, latency: float = 0.3, jitter: float = 0.0, error_rate: float = 0.0,
+                 parse_response: dict | None = None, search_response: dict | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.parse_response = parse_response or CANNED_PARSE
+        self.search_response = search_response or CANNED_SEARCH
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def payload_for(self, body: dict) -> str:
+        if "search query parser" in _system_text(body):
+            return json.dumps(self.search_response)
+        return json.dumps(self.parse_response)
+
+
+def _make_handler(config: FakeLLMConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 — silence per-request logging
+            pass
+
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):  # noqa: N802
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            config.count()
+            time.sleep(config.delay())
+
+            if random.random() < config.error_rate:
+                self._send(503, {"error": {"type": "overloaded_error", "message": "fake overload"}})
+                return
+
+            content = config.payload_for(body)
+            if self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+            elif self.path.rstrip("/").endswith("/messages"):
+                self._send(200, {
+                    "id": f"msg_{uuid.uuid4().hex[:12]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body.get("model", "fake"),
+                    "content": [{"type": "text", "text": content}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 0, "output_tokens": 0},
+                })
+            else:
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    return Handler
+
+
+def start_fake_llm_server(host: str = "127.0.0.1", port: int = 0, config: FakeLLMConfig | None = None):
+    """Start the server on a daemon thread. Returns (server, config); server.server_port has the bound port."""
+    config = config or FakeLLMConfig()
+    server = ThreadingHTTPServer((host, port), _make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server, config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Anthropic API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds to wait before responding")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--parse-response", help="Path to a JSON file used as the canned parse reply")
+    args = parser.parse_args()
+
+    parse_response = None
+    if args.parse_response:
+        with open(args.parse_response) as f:
+            parse_response = json.load(f)
+
+    config = FakeLLMConfig(args.latency, args.jitter, args.error_rate, parse_response)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(config))
+    print(f"Fake LLM server on http://{args.host}:{args.port} (latency {args.latency}s ± {args.jitter}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+CREATE TABLE user (
+	username VARCHAR(50) NOT NULL, 
+	email VARCHAR(255) NOT NULL, 
+	id INTEGER NOT NULL, 
+	hashed_password VARCHAR(255), 
+	oauth_provider VARCHAR(20), 
+	created_at DATETIME NOT NULL, 
+	email_verified BOOLEAN NOT NULL, 
+	verification_token VARCHAR(64), 
+	verification_token_expires DATETIME, 
+	PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_user_email ON user (email);
+CREATE UNIQUE INDEX ix_user_username ON user (username);
+CREATE TABLE workspace (
+	id INTEGER NOT NULL, 
+	name VARCHAR(100) NOT NULL, 
+	description VARCHAR(255), 
+	owner_id INTEGER NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(owner_id) REFERENCES user (id)
+);
+CREATE INDEX ix_workspace_owner_id ON workspace (owner_id);
+CREATE TABLE task (
+	task_name VARCHAR(255) NOT NULL, 
+	description VARCHAR, 
+	owner VARCHAR(150), 
+	email VARCHAR(255), 
+	start_date DATE, 
+	due_date DATE, 
+	status VARCHAR(11) NOT NULL, 
+	priority VARCHAR(8) NOT NULL, 
+	custom_fields TEXT, 
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	workspace_id INTEGER, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	agent_mode VARCHAR(20), 
+	agent_id VARCHAR(255), 
+	agent_session_id VARCHAR(255), 
+	agent_status VARCHAR(20), 
+	parent_task_id INTEGER, 
+	agent_nudge TEXT, 
+	agent_nudge_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(workspace_id) REFERENCES workspace (id), 
+	FOREIGN KEY(parent_task_id) REFERENCES task (id)
+);
+CREATE INDEX ix_task_workspace_id ON task (workspace_id);
+CREATE INDEX ix_task_priority ON task (priority);
+CREATE INDEX ix_task_owner ON task (owner);
+CREATE INDEX ix_task_user_id ON task (user_id);
+CREATE INDEX ix_task_status ON task (status);
+CREATE INDEX ix_task_task_name ON task (task_name);
+CREATE TABLE sharedlist (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	workspace_id INTEGER, 
+	share_token VARCHAR(64) NOT NULL, 
+	task_ids VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	expires_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(workspace_id) REFERENCES workspace (id)
+);
+CREATE INDEX ix_sharedlist_workspace_id ON sharedlist (workspace_id);
+CREATE UNIQUE INDEX ix_sharedlist_share_token ON sharedlist (share_token);
+CREATE INDEX ix_sharedlist_user_id ON sharedlist (user_id);
+CREATE TABLE columnconfig (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	workspace_id INTEGER, 
+	field_key VARCHAR(100) NOT NULL, 
+	display_name VARCHAR(150) NOT NULL, 
+	field_type VARCHAR(20) NOT NULL, 
+	position INTEGER NOT NULL, 
+	is_visible BOOLEAN NOT NULL, 
+	is_core BOOLEAN NOT NULL, 
+	is_required BOOLEAN NOT NULL, 
+	options TEXT, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	CONSTRAINT uq_user_workspace_field_key UNIQUE (user_id, workspace_id, field_key), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(workspace_id) REFERENCES workspace (id)
+);
+CREATE INDEX ix_columnconfig_field_key ON columnconfig (field_key);
+CREATE INDEX ix_columnconfig_user_id ON columnconfig (user_id);
+CREATE INDEX ix_columnconfig_workspace_id ON columnconfig (workspace_id);
+CREATE TABLE workspacemember (
+	id INTEGER NOT NULL, 
+	workspace_id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	role VARCHAR(20) NOT NULL, 
+	status VARCHAR(20) NOT NULL, 
+	inviter_id INTEGER, 
+	joined_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	CONSTRAINT uq_workspace_user UNIQUE (workspace_id, user_id), 
+	FOREIGN KEY(workspace_id) REFERENCES workspace (id) ON DELETE CASCADE, 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(inviter_id) REFERENCES user (id)
+);
+CREATE INDEX ix_workspacemember_user_id ON workspacemember (user_id);
+CREATE INDEX ix_workspacemember_workspace_id ON workspacemember (workspace_id);
+CREATE TABLE workspaceinvite (
+	id INTEGER NOT NULL, 
+	workspace_id INTEGER NOT NULL, 
+	email VARCHAR(255) NOT NULL, 
+	role VARCHAR(20) NOT NULL, 
+	inviter_id INTEGER NOT NULL, 
+	token VARCHAR(64) NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	expires_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(workspace_id) REFERENCES workspace (id) ON DELETE CASCADE, 
+	FOREIGN KEY(inviter_id) REFERENCES user (id)
+);
+CREATE UNIQUE INDEX ix_workspaceinvite_token ON workspaceinvite (token);
+CREATE INDEX ix_workspaceinvite_email ON workspaceinvite (email);
+CREATE INDEX ix_workspaceinvite_workspace_id ON workspaceinvite (workspace_id);
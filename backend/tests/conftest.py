@@ -125,3 +125,12 @@ def user_c(session):
     """Verified user C (no workspace of their own — used for viewer testing)."""
     user = _create_user(session, "charlie", "charlie@test.com")
     return {"user": user, "headers": _auth_headers(user)}
+
+
+@pytest.fixture
+def query_guard(monkeypatch):
+    """Fail requests that run a statement in a loop, and expose X-DB-Queries on responses."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "DB_QUERY_GUARD_RAISE", True)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 5)
+    monkeypatch.setattr(settings, "DB_DEBUG_HEADERS", True)
@@ -158,3 +158,83 @@ class TestBridgeCaching:
         import httpx
         bridge._client.get = AsyncMock(side_effect=httpx.TimeoutException("timeout"))
         assert await bridge.is_available() is False
+
+
+class TestKeyCache:
+    def test_ttl_expiry(self):
+        from app.services.ttl_cache import TTLCache
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache[1] = "k1"
+        assert cache.get(1) == "k1"
+        cache._data[1] = (0.0, "k1")  # force expiry
+        assert cache.get(1) is None
+        assert 1 not in cache
+
+    def test_size_bound_evicts_least_recent(self):
+        from app.services.ttl_cache import TTLCache
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache[1] = "a"
+        cache[2] = "b"
+        cache.get(1)  # 1 is now most recent
+        cache[3] = "c"
+        assert len(cache) == 2
+        assert cache.get(2) is None
+        assert cache.get(1) == "a"
+
+
+class TestSingleFlightProvisioning:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_provision(self, session, user_a):
+        import asyncio
+        from app.config import settings
+        from app.models.agent_binding import AgentApiKey
+        from sqlmodel import select
+
+        bridge = AgentBridge()
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"key": "tma_new_key"}
+        mock_response.raise_for_status = MagicMock()
+
+        async def _slow_post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return mock_response
+
+        bridge._client.post = AsyncMock(side_effect=_slow_post)
+        user_id = user_a["user"].id
+        with patch.object(settings, "AGENTS_API_KEY", "admin-key"):
+            keys = await asyncio.gather(*(bridge.ensure_user_api_key(user_id) for _ in range(5)))
+
+        assert keys == ["tma_new_key"] * 5
+        assert bridge._client.post.call_count == 1
+        records = session.exec(select(AgentApiKey).where(AgentApiKey.user_id == user_id)).all()
+        assert len(records) == 1
+        assert bridge._key_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_existing_db_key_used_without_provisioning(self, session, user_a):
+        from app.models.agent_binding import AgentApiKey
+
+        bridge = AgentBridge()
+        user_id = user_a["user"].id
+        session.add(AgentApiKey(user_id=user_id, api_key_encrypted=bridge._encrypt("tma_stored")))
+        session.commit()
+        bridge._client.post = AsyncMock()
+
+        assert await bridge.ensure_user_api_key(user_id) == "tma_stored"
+        bridge._client.post.assert_not_called()
+        assert bridge._key_cache[user_id] == "tma_stored"
+
+    @pytest.mark.asyncio
+    async def test_failed_provision_is_not_cached(self, user_a):
+        import httpx
+        from fastapi import HTTPException
+        from app.config import settings
+
+        bridge = AgentBridge()
+        bridge._client.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        with patch.object(settings, "AGENTS_API_KEY", "admin-key"):
+            with pytest.raises(HTTPException) as exc:
+                await bridge.ensure_user_api_key(user_a["user"].id)
+        assert exc.value.status_code == 503
+        assert user_a["user"].id not in bridge._key_cache
+        assert bridge._key_inflight == {}
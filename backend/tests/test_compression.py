@@ -0,0 +1,105 @@
+"""Accept-Encoding negotiation and the response compression middleware."""
+
+import asyncio
+import gzip
+
+from app.compression import CompressionMiddleware, _compressible, negotiate
+
+ENCODERS = {"zstd": None, "br": None, "gzip": None}
+
+
+class TestNegotiate:
+    def test_server_preference_breaks_ties(self):
+        assert negotiate("gzip, br, zstd", ENCODERS) == "zstd"
+        assert negotiate("gzip, br", ENCODERS) == "br"
+
+    def test_q_values_win_over_preference(self):
+        assert negotiate("zstd;q=0.5, gzip", ENCODERS) == "gzip"
+
+    def test_refused_and_unknown(self):
+        assert negotiate("gzip;q=0", ENCODERS) is None
+        assert negotiate("identity", ENCODERS) is None
+        assert negotiate("deflate", {"gzip": None}) is None
+
+    def test_wildcard(self):
+        assert negotiate("*", {"gzip": None}) == "gzip"
+        assert negotiate("*, gzip;q=0", {"br": None, "gzip": None}) == "br"
+
+    def test_unavailable_encoding_falls_back(self):
+        assert negotiate("br, gzip;q=0.8", {"gzip": None}) == "gzip"
+
+
+def test_xlsx_and_encoded_bodies_are_incompressible():
+    xlsx = b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    assert not _compressible([(b"content-type", xlsx)])
+    assert not _compressible([(b"content-type", b"application/json"), (b"content-encoding", b"gzip")])
+    assert _compressible([(b"content-type", b"application/json")])
+
+
+def _seed_tasks(client, user, count):
+    tasks = [{"task_name": f"Task {i}", "description": "Call the vendor about renewal terms. " * 3}
+             for i in range(count)]
+    resp = client.post(f"/api/v1/tasks/bulk?workspace_id={user['workspace'].id}", json=tasks, headers=user["headers"])
+    assert resp.status_code == 201
+
+
+def test_large_list_is_gzipped(client, user_a):
+    _seed_tasks(client, user_a, 30)
+    resp = client.get(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}",
+                      headers={**user_a["headers"], "Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert len(resp.json()) == 30
+
+
+def test_small_body_and_identity_are_not_compressed(client, user_a):
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"message": "TaskMe API is running"}
+
+    _seed_tasks(client, user_a, 30)
+    plain = client.get(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}",
+                       headers={**user_a["headers"], "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.json()) == 30
+
+
+def test_content_length_matches_compressed_body(client, user_a):
+    _seed_tasks(client, user_a, 30)
+    with client.stream("GET", f"/api/v1/tasks?workspace_id={user_a['workspace'].id}",
+                       headers={**user_a["headers"], "Accept-Encoding": "gzip"}) as resp:
+        raw = b"".join(resp.iter_raw())
+    assert int(resp.headers["content-length"]) == len(raw)
+    assert len(gzip.decompress(raw)) > len(raw)
+
+
+def _run_chunked(chunks: list[bytes], content_type: bytes = b"application/json") -> list[dict]:
+    """Messages the middleware sends for an app that streams ``chunks`` (gzip accepted)."""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+    return sent
+
+
+def test_chunked_body_is_buffered_then_compressed():
+    # BaseHTTPMiddleware layers re-send a body as a more_body chunk plus an empty final chunk
+    start, body = _run_chunked([b"x" * 5000, b""])
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    assert gzip.decompress(body["body"]) == b"x" * 5000
+    assert not body.get("more_body")
+
+
+def test_incompressible_stream_passes_through():
+    sent = _run_chunked([b"PK" * 3000, b"PK" * 3000, b""], b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    assert all(k != b"content-encoding" for k, _ in sent[0]["headers"])
+    assert [m["body"] for m in sent[1:]] == [b"PK" * 3000, b"PK" * 3000, b""]
@@ -0,0 +1,102 @@
+"""Connection pool metrics and read replica routing."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app import database
+from app.database import InstrumentedQueuePool
+
+
+class TestPoolMetrics:
+    def test_records_checkouts_and_timeouts(self, tmp_path):
+        eng = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                            pool_size=1, max_overflow=0, pool_timeout=0.05)
+        held = eng.connect()
+        with pytest.raises(PoolTimeoutError):
+            eng.connect()
+        held.close()
+        eng.connect().close()
+
+        metrics = eng.pool.metrics
+        assert (metrics.checkouts, metrics.timeouts) == (2, 1)
+        assert metrics.wait_seconds_max >= 0
+
+    def test_pool_stats_reports_usage(self, tmp_path, monkeypatch):
+        eng = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                            pool_size=2, max_overflow=1)
+        monkeypatch.setattr(database, "engine", eng)
+        with eng.connect():
+            stats = database.pool_stats()["primary"]
+        assert stats["pool"] == "InstrumentedQueuePool"
+        assert (stats["size"], stats["checked_out"], stats["checkouts"]) == (2, 1, 1)
+
+    def test_health_endpoint(self, client, monkeypatch):
+        assert client.get("/health/db").status_code == 404  # off unless enabled
+        monkeypatch.setattr(database.settings, "DB_HEALTH_ENABLED", True)
+        resp = client.get("/health/db")
+        assert resp.status_code == 200
+        assert "primary" in resp.json()["pools"]
+
+
+@pytest.fixture
+def empty_replica(monkeypatch):
+    """A replica that hasn't caught up with anything, so reads served from it are easy to spot."""
+    replica = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(replica)
+    monkeypatch.setattr(database, "replica_engine", replica)
+    yield replica
+    SQLModel.metadata.drop_all(replica)
+
+
+class TestReplicaRouting:
+    def test_writes_are_not_marked_without_replica(self, client, session, user_a):
+        from sqlalchemy import event
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            client.post(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}", json={"task_name": "Fresh"},
+                        headers=user_a["headers"])
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        assert not any("last_write_at" in s for s in statements)
+
+    def test_reads_go_to_replica(self, client, user_a, empty_replica):
+        resp = client.get(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}", headers=user_a["headers"])
+        assert resp.status_code == 404  # the replica doesn't know the workspace yet
+
+    def test_own_writes_are_read_from_primary(self, client, user_a, empty_replica):
+        ws_id = user_a["workspace"].id
+        client.post(f"/api/v1/tasks?workspace_id={ws_id}", json={"task_name": "Fresh"}, headers=user_a["headers"])
+        resp = client.get(f"/api/v1/tasks?workspace_id={ws_id}", headers=user_a["headers"])
+        assert resp.status_code == 200
+        assert [t["task_name"] for t in resp.json()] == ["Fresh"]
+
+    def test_guard_expires(self, client, user_a, empty_replica, monkeypatch):
+        ws_id = user_a["workspace"].id
+        client.post(f"/api/v1/tasks?workspace_id={ws_id}", json={"task_name": "Fresh"}, headers=user_a["headers"])
+        monkeypatch.setattr(database.settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+        resp = client.get(f"/api/v1/tasks?workspace_id={ws_id}", headers=user_a["headers"])
+        assert resp.status_code == 404
+
+    def test_share_link_falls_back_to_primary(self, client, session, user_a, empty_replica):
+        from app.models.share import SharedList
+        from app.models.task import Task
+
+        task = Task(task_name="Shared", workspace_id=user_a["workspace"].id, user_id=user_a["user"].id)
+        session.add(task)
+        session.commit()
+        session.add(SharedList(share_token="tok", task_ids=f"[{task.id}]", user_id=user_a["user"].id,
+                               workspace_id=user_a["workspace"].id))
+        session.commit()
+
+        resp = client.get("/api/v1/share/tok")
+        assert resp.status_code == 200
+        assert [t["task_name"] for t in resp.json()] == ["Shared"]
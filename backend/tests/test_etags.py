@@ -0,0 +1,132 @@
+"""Conditional GET (ETag / If-None-Match) on read endpoints."""
+
+from tests.conftest import _add_member
+
+
+def _get(client, user, url, etag=None):
+    headers = dict(user["headers"])
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+
+def _create_task(client, user, name="Write report"):
+    resp = client.post(f"/api/v1/tasks?workspace_id={user['workspace'].id}",
+                       json={"task_name": name}, headers=user["headers"])
+    assert resp.status_code == 201
+    return resp.json()
+
+
+class TestListTasks:
+    def test_unchanged_returns_304_and_write_invalidates(self, client, user_a):
+        url = f"/api/v1/tasks?workspace_id={user_a['workspace'].id}"
+        _create_task(client, user_a)
+        first = _get(client, user_a, url)
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        again = _get(client, user_a, url, etag)
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+
+        _create_task(client, user_a, "Another")
+        changed = _get(client, user_a, url, etag)
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
+        assert changed.headers["ETag"] != etag
+
+    def test_etag_depends_on_query(self, client, user_a):
+        base = f"/api/v1/tasks?workspace_id={user_a['workspace'].id}"
+        etag = _get(client, user_a, base).headers["ETag"]
+        assert _get(client, user_a, f"{base}&status=Done", etag).status_code == 200
+
+    def test_non_member_gets_404_not_304(self, client, user_a, user_b):
+        url = f"/api/v1/tasks?workspace_id={user_a['workspace'].id}"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_b, url, etag).status_code == 404
+
+
+class TestGetTask:
+    def test_revalidates_on_change_seq(self, client, user_a):
+        task = _create_task(client, user_a)
+        url = f"/api/v1/tasks/{task['id']}"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        # Writes to other tasks in the workspace don't invalidate this one
+        _create_task(client, user_a, "Unrelated")
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        client.patch(url, json={"owner": "Bob"}, headers=user_a["headers"])
+        resp = _get(client, user_a, url, etag)
+        assert resp.status_code == 200
+        assert resp.json()["owner"] == "Bob"
+
+    def test_non_member_gets_404(self, client, user_a, user_b):
+        task = _create_task(client, user_a)
+        url = f"/api/v1/tasks/{task['id']}"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_b, url, etag).status_code == 404
+
+
+class TestMetadataReads:
+    def test_columns_invalidated_by_column_change(self, client, user_a):
+        ws_id = user_a["workspace"].id
+        url = f"/api/v1/columns?workspace_id={ws_id}"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        # Task writes don't touch column metadata
+        _create_task(client, user_a)
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        client.post(url, json={"display_name": "Sprint", "field_type": "text"}, headers=user_a["headers"])
+        assert _get(client, user_a, url, etag).status_code == 200
+
+    def test_members_invalidated_by_membership_change(self, client, session, user_a, user_b):
+        ws = user_a["workspace"]
+        url = f"/api/v1/workspaces/{ws.id}/members"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        _add_member(session, ws, user_b["user"])
+        resp = _get(client, user_a, url, etag)
+        assert resp.status_code == 200
+        assert len(resp.json()["members"]) == 2
+
+    def test_members_invalidated_by_member_profile_change(self, client, session, user_a):
+        ws = user_a["workspace"]
+        url = f"/api/v1/workspaces/{ws.id}/members"
+        etag = _get(client, user_a, url).headers["ETag"]
+
+        user = user_a["user"]
+        user.username = "renamed"
+        session.add(user)
+        session.commit()
+        resp = _get(client, user_a, url, etag)
+        assert resp.status_code == 200
+        assert resp.json()["members"][0]["username"] == "renamed"
+
+    def test_workspaces_invalidated_by_rename_and_role(self, client, session, user_a, user_b):
+        url = "/api/v1/workspaces"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_a, url, etag).status_code == 304
+
+        client.patch(f"/api/v1/workspaces/{user_a['workspace'].id}", json={"name": "Renamed"},
+                     headers=user_a["headers"])
+        resp = _get(client, user_a, url, etag)
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+
+        # Joining another workspace changes the list too
+        _add_member(session, user_b["workspace"], user_a["user"])
+        assert _get(client, user_a, url, etag).status_code == 200
+
+    def test_wildcard_and_list_headers(self, client, user_a):
+        url = f"/api/v1/workspaces/{user_a['workspace'].id}/members"
+        etag = _get(client, user_a, url).headers["ETag"]
+        assert _get(client, user_a, url, "*").status_code == 304
+        assert _get(client, user_a, url, f'W/"stale", {etag}').status_code == 304
+        assert _get(client, user_a, url, etag.removeprefix("W/")).status_code == 304
@@ -0,0 +1,35 @@
+"""End-to-end tests of the real SDK code paths against scripts/fake_llm_server.py."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.services.llm_service import parse_natural_language, parse_search_query
+from scripts.fake_llm_server import FakeLLMConfig, start_fake_llm_server
+
+
+@pytest.fixture
+def fake_llm():
+    server, config = start_fake_llm_server(config=FakeLLMConfig(latency=0.0))
+    port = server.server_port
+    with patch.object(settings, "OPENAI_API_KEY", "fake"), \
+         patch.object(settings, "ANTHROPIC_API_KEY", "fake"), \
+         patch.object(settings, "OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1"), \
+         patch.object(settings, "ANTHROPIC_BASE_URL", f"http://127.0.0.1:{port}"):
+        yield config
+    server.shutdown()
+
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+def test_parse_against_fake_server(fake_llm, provider):
+    tasks = parse_natural_language("Alice: finish the report", provider=provider)
+    assert tasks[0]["task_name"] == "Finish quarterly report"
+    assert fake_llm.requests == 1
+
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+def test_smart_search_against_fake_server(fake_llm, provider):
+    filters = parse_search_query("urgent in progress", provider=provider)
+    assert filters["status"] == ["In Progress"]
+    assert filters["sort_by"] == "due_date"
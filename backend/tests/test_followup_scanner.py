@@ -43,3 +43,264 @@ class TestWsNormalizePriority:
 
     def test_none(self):
         assert ws_normalize_priority(None) == "Medium"
+
+
+# --- Scanner pipeline ---
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import settings
+from app.models.task import Task
+from app.services import followup_scanner, scanner_lease
+from tests.conftest import _create_workspace
+
+
+def _stalled_task(session, workspace, user, name):
+    task = Task(
+        task_name=name, workspace_id=workspace.id, user_id=user.id,
+        updated_at=datetime.now(timezone.utc) - timedelta(days=10),
+    )
+    session.add(task)
+    session.commit()
+    session.refresh(task)
+    return task
+
+
+class TestInterleave:
+    def test_round_robin_across_workspaces(self):
+        order = list(followup_scanner._interleave({1: ["a1", "a2", "a3"], 2: ["b1"], 3: ["c1", "c2"]}))
+        assert order == ["a1", "b1", "c1", "a2", "c2", "a3"]
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_spaces_out_calls(self):
+        limiter = followup_scanner._RateLimiter(20.0)
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        assert time.monotonic() - start >= 0.14
+
+    @pytest.mark.asyncio
+    async def test_zero_rate_is_unlimited(self):
+        limiter = followup_scanner._RateLimiter(0)
+        start = time.monotonic()
+        for _ in range(100):
+            await limiter.acquire()
+        assert time.monotonic() - start < 0.05
+
+
+class TestScanOnce:
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_metrics(self, session, user_a):
+        ws_b = _create_workspace(session, user_a["user"], "Second")
+        tasks = [_stalled_task(session, user_a["workspace"], user_a["user"], f"A{i}") for i in range(5)]
+        tasks += [_stalled_task(session, ws_b, user_a["user"], f"B{i}") for i in range(3)]
+
+        in_flight = 0
+        peak = 0
+
+        async def _fake_nudge(task):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return f"Nudge for {task.task_name}"
+
+        bridge = MagicMock()
+        bridge.is_available = AsyncMock(return_value=True)
+        with patch.object(settings, "AGENTS_API_KEY", "k"), \
+             patch.object(settings, "SCANNER_CONCURRENCY", 3), \
+             patch.object(settings, "SCANNER_NUDGE_BATCH_SIZE", 1), \
+             patch.object(settings, "SCANNER_RATE_LIMIT_PER_SECOND", 0), \
+             patch("app.services.followup_scanner.engine", session.get_bind()), \
+             patch("app.services.followup_scanner.get_agent_bridge", return_value=bridge), \
+             patch("app.services.followup_scanner.generate_nudge", side_effect=_fake_nudge):
+            await followup_scanner.scan_once()
+
+        assert peak == 3
+        last = followup_scanner.get_scanner_metrics()["last_scan"]
+        assert last["tasks_considered"] == 8
+        assert last["nudges_generated"] == 8
+        assert last["workspaces"] == 2
+        for t in tasks:
+            session.refresh(t)
+            assert t.agent_nudge == f"Nudge for {t.task_name}"
+
+
+class TestStalledTasksPage:
+    def test_keyset_pages_cover_all_workspaces_once(self, session, user_a):
+        ws_b = _create_workspace(session, user_a["user"], "Second")
+        expected = {_stalled_task(session, user_a["workspace"], user_a["user"], f"A{i}").id for i in range(4)}
+        expected |= {_stalled_task(session, ws_b, user_a["user"], f"B{i}").id for i in range(3)}
+
+        seen, after = [], None
+        while page := followup_scanner._stalled_tasks_page(session, after, limit=2):
+            seen += [t.id for t in page]
+            after = (page[-1].stalls_at, page[-1].id)
+        assert sorted(seen) == sorted(expected)
+
+    def test_cooldown_and_subtasks_filtered_in_sql(self, session, user_a):
+        ws, user = user_a["workspace"], user_a["user"]
+        due = _stalled_task(session, ws, user, "Due")
+        old_nudge = _stalled_task(session, ws, user, "Old nudge")
+        old_nudge.agent_nudge_at = datetime.now(timezone.utc) - timedelta(hours=followup_scanner.NUDGE_COOLDOWN_HOURS + 1)
+        recent = _stalled_task(session, ws, user, "Recent nudge")
+        recent.agent_nudge_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        sub = _stalled_task(session, ws, user, "Subtask")
+        sub.parent_task_id = due.id
+        session.add_all([old_nudge, recent, sub])
+        session.commit()
+
+        ids = {t.id for t in followup_scanner._stalled_tasks_page(session)}
+        assert ids == {due.id, old_nudge.id}
+
+
+class TestScanLeadership:
+    def _patches(self, session, nudge):
+        bridge = MagicMock()
+        bridge.is_available = AsyncMock(return_value=True)
+        return (
+            patch.object(settings, "AGENTS_API_KEY", "k"),
+            patch.object(settings, "SCANNER_RATE_LIMIT_PER_SECOND", 0),
+            patch.object(settings, "SCANNER_NUDGE_BATCH_SIZE", 1),
+            patch("app.services.followup_scanner.engine", session.get_bind()),
+            patch("app.services.followup_scanner.get_agent_bridge", return_value=bridge),
+            patch("app.services.followup_scanner.generate_nudge", side_effect=nudge),
+        )
+
+    @pytest.mark.asyncio
+    async def test_skips_when_another_worker_holds_lease(self, session, user_a):
+        _stalled_task(session, user_a["workspace"], user_a["user"], "A")
+        scanner_lease.acquire(followup_scanner.LEASE_NAME, 60, holder="other-worker")
+        nudge = AsyncMock(return_value="Nudge")
+
+        p1, p2, p3, p4, p5, p6 = self._patches(session, nudge)
+        with p1, p2, p3, p4, p5, p6:
+            skipped = followup_scanner.get_scanner_metrics()["skipped_not_leader"]
+            await followup_scanner.scan_once()
+
+        nudge.assert_not_called()
+        assert followup_scanner.get_scanner_metrics()["skipped_not_leader"] == skipped + 1
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_and_clears_it(self, session, user_a):
+        tasks = [_stalled_task(session, user_a["workspace"], user_a["user"], f"A{i}") for i in range(4)]
+        ordered = sorted(tasks, key=lambda t: (t.stalls_at, t.id))
+        # A previous leader finished the first two before dying
+        scanner_lease.acquire(followup_scanner.LEASE_NAME, -1, holder="dead-worker")
+        scanner_lease.save_checkpoint(
+            followup_scanner.LEASE_NAME, (ordered[1].stalls_at, ordered[1].id), holder="dead-worker",
+        )
+        nudged = []
+
+        async def _nudge(task):
+            nudged.append(task.id)
+            return "Nudge"
+
+        p1, p2, p3, p4, p5, p6 = self._patches(session, _nudge)
+        with p1, p2, p3, p4, p5, p6, patch.object(settings, "SCANNER_PAGE_SIZE", 1):
+            await followup_scanner.scan_once()
+
+        assert nudged == [ordered[2].id, ordered[3].id]
+        last = followup_scanner.get_scanner_metrics()["last_scan"]
+        assert last["resumed"] is True and last["completed"] is True
+        assert scanner_lease.load_checkpoint(followup_scanner.LEASE_NAME) is None
+
+
+class TestBatchNudges:
+    def test_parse_batch_reply(self):
+        reply = 'Sure!\n```json\n{"nudges": [{"task_id": 1, "nudge": " Ping Alice "}, {"task_id": "2", "nudge": "Ship it"},' \
+                ' {"task_id": 99, "nudge": "unknown"}, {"task_id": 3, "nudge": ""}]}\n```'
+        assert followup_scanner._parse_batch_nudges(reply, {1, 2, 3}) == {1: "Ping Alice", 2: "Ship it"}
+
+    def test_parse_garbage_reply(self):
+        assert followup_scanner._parse_batch_nudges("no json here", {1}) == {}
+        assert followup_scanner._parse_batch_nudges("{not json}", {1}) == {}
+
+    def test_prompt_lists_every_task_id(self, session, user_a):
+        tasks = [_stalled_task(session, user_a["workspace"], user_a["user"], f"A{i}") for i in range(3)]
+        prompt = followup_scanner._batch_nudge_prompt(tasks)
+        for t in tasks:
+            assert f'"task_id": {t.id}' in prompt
+
+    @pytest.mark.asyncio
+    async def test_scan_sends_batches_and_bulk_saves(self, session, user_a):
+        tasks = [_stalled_task(session, user_a["workspace"], user_a["user"], f"A{i}") for i in range(5)]
+        batches = []
+
+        async def _fake_batch(batch):
+            batches.append([t.id for t in batch])
+            # Leave one task out of the reply
+            return {t.id: f"Nudge for {t.task_name}" for t in batch if t.task_name != "A4"}
+
+        bridge = MagicMock()
+        bridge.is_available = AsyncMock(return_value=True)
+        single = AsyncMock(return_value="single")
+        with patch.object(settings, "AGENTS_API_KEY", "k"), \
+             patch.object(settings, "SCANNER_RATE_LIMIT_PER_SECOND", 0), \
+             patch.object(settings, "SCANNER_NUDGE_BATCH_SIZE", 2), \
+             patch("app.services.followup_scanner.engine", session.get_bind()), \
+             patch("app.services.followup_scanner.get_agent_bridge", return_value=bridge), \
+             patch("app.services.followup_scanner.generate_nudges_batch", side_effect=_fake_batch), \
+             patch("app.services.followup_scanner.generate_nudge", single):
+            await followup_scanner.scan_once()
+
+        # 5 tasks in batches of 2 → two batched sessions plus one single-task call
+        assert sorted(len(b) for b in batches) == [2, 2]
+        assert single.await_count == 1
+        last = followup_scanner.get_scanner_metrics()["last_scan"]
+        assert last["tasks_considered"] == 5
+        for t in tasks:
+            session.refresh(t)
+            assert t.agent_nudge_at is not None or t.task_name == "A4"
+
+
+class TestStallsAt:
+    def test_set_on_insert(self, session, user_a):
+        task = _stalled_task(session, user_a["workspace"], user_a["user"], "A")
+        expected = task.updated_at + timedelta(days=followup_scanner.STALLED_DAYS)
+        assert task.stalls_at.replace(tzinfo=None) == expected.replace(tzinfo=None)
+
+    def test_update_pushes_deadline(self, client, session, user_a):
+        task = _stalled_task(session, user_a["workspace"], user_a["user"], "A")
+        resp = client.patch(f"/api/v1/tasks/{task.id}", json={"owner": "Bob"}, headers=user_a["headers"])
+        assert resp.status_code == 200
+        session.refresh(task)
+        assert task.stalls_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(days=2)
+        assert followup_scanner._stalled_tasks_page(session) == []
+
+    def test_done_and_subtasks_never_stall(self, session, user_a):
+        task = _stalled_task(session, user_a["workspace"], user_a["user"], "A")
+        task.status = "Done"
+        sub = _stalled_task(session, user_a["workspace"], user_a["user"], "Sub")
+        sub.parent_task_id = task.id
+        session.add_all([task, sub])
+        session.commit()
+        assert task.stalls_at is None and sub.stalls_at is None
+
+    def test_save_nudges_applies_cooldown(self, session, user_a):
+        task = _stalled_task(session, user_a["workspace"], user_a["user"], "A")
+        with patch("app.services.followup_scanner.engine", session.get_bind()):
+            followup_scanner._save_nudges({task.id: "Ping"})
+        session.refresh(task)
+        assert task.agent_nudge == "Ping"
+        assert task.stalls_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(hours=23)
+
+    def test_next_stall_ignores_deadlines_the_last_scan_saw(self, session, user_a):
+        # A stalled task whose nudge failed keeps its past deadline; it must not wake the loop again
+        _stalled_task(session, user_a["workspace"], user_a["user"], "Failed")
+        upcoming = _stalled_task(session, user_a["workspace"], user_a["user"], "Upcoming")
+        upcoming.updated_at = datetime.now(timezone.utc)
+        session.add(upcoming)
+        session.commit()
+        session.refresh(upcoming)
+        with patch("app.services.followup_scanner.engine", session.get_bind()):
+            next_at = followup_scanner._next_stall_at(datetime.now(timezone.utc))
+        assert next_at.replace(tzinfo=None) == upcoming.stalls_at.replace(tzinfo=None)
@@ -0,0 +1,130 @@
+"""Tests for the LLM provider router (circuit breaker, failover, hedging)."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.services.llm_router import LLMRouter, ProviderUnavailableError, _percentile
+
+
+@pytest.fixture(autouse=True)
+def both_providers_configured():
+    with patch.object(settings, "OPENAI_API_KEY", "sk-test"), \
+         patch.object(settings, "ANTHROPIC_API_KEY", "sk-ant-test"), \
+         patch.object(settings, "LLM_FAILOVER_ENABLED", True), \
+         patch.object(settings, "LLM_HEDGE_ENABLED", False), \
+         patch.object(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 2), \
+         patch.object(settings, "LLM_BREAKER_COOLDOWN_SECONDS", 60):
+        yield
+
+
+def _fail():
+    raise RuntimeError("provider down")
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        values = sorted(float(i) for i in range(1, 101))
+        assert _percentile(values, 50) == 50.0
+        assert _percentile(values, 99) == 99.0
+
+    def test_empty(self):
+        assert _percentile([], 50) is None
+
+
+class TestFailover:
+    def test_primary_success(self):
+        router = LLMRouter()
+        assert router.call("openai", {"openai": lambda: "o", "anthropic": lambda: "a"}) == "o"
+        assert router.stats["openai"].requests == 1
+        assert router.stats["anthropic"].requests == 0
+
+    def test_fails_over_to_secondary(self):
+        router = LLMRouter()
+        assert router.call("openai", {"openai": _fail, "anthropic": lambda: "a"}) == "a"
+        snap = router.snapshot()
+        assert snap["openai"]["errors"] == 1
+        assert snap["anthropic"]["requests"] == 1
+
+    def test_unconfigured_secondary_not_used(self):
+        router = LLMRouter()
+        with patch.object(settings, "ANTHROPIC_API_KEY", ""):
+            with pytest.raises(RuntimeError):
+                router.call("openai", {"openai": _fail, "anthropic": lambda: "a"})
+
+    def test_failover_disabled(self):
+        router = LLMRouter()
+        with patch.object(settings, "LLM_FAILOVER_ENABLED", False):
+            with pytest.raises(RuntimeError):
+                router.call("openai", {"openai": _fail, "anthropic": lambda: "a"})
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_skips_provider(self):
+        router = LLMRouter()
+        funcs = {"openai": _fail, "anthropic": lambda: "a"}
+        router.call("openai", funcs)
+        router.call("openai", funcs)
+        assert router.stats["openai"].state == "open"
+        calls = []
+        router.call("openai", {"openai": lambda: calls.append(1), "anthropic": lambda: "a"})
+        assert calls == []  # skipped while open
+
+    def test_all_open_raises(self):
+        router = LLMRouter()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                router.call("openai", {"openai": _fail, "anthropic": _fail})
+        with pytest.raises(ProviderUnavailableError):
+            router.call("openai", {"openai": _fail, "anthropic": _fail})
+
+    def test_half_open_trial_closes_on_success(self):
+        router = LLMRouter()
+        stats = router.stats["openai"]
+        stats.record(0.1, ok=False)
+        stats.record(0.1, ok=False)
+        assert stats.state == "open"
+        stats.opened_at -= 61
+        assert router.call("openai", {"openai": lambda: "o"}) == "o"
+        assert stats.state == "closed"
+
+    def test_unused_backup_keeps_its_half_open_trial(self):
+        router = LLMRouter()
+        backup = router.stats["anthropic"]
+        backup.record(0.1, ok=False)
+        backup.record(0.1, ok=False)
+        backup.opened_at -= 61
+        # The primary answers, so the backup's trial slot must still be free afterwards
+        assert router.call("openai", {"openai": lambda: "o", "anthropic": lambda: "a"}) == "o"
+        assert backup.state == "open"
+        assert backup.allow()
+        assert backup.state == "half_open"
+        assert not backup.allow()  # one trial per cooldown window
+
+
+class TestHedging:
+    def test_hedge_returns_faster_provider(self):
+        router = LLMRouter()
+
+        def _slow():
+            time.sleep(0.5)
+            return "slow"
+
+        with patch.object(settings, "LLM_HEDGE_ENABLED", True), \
+             patch.object(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05):
+            start = time.perf_counter()
+            result = router.call("openai", {"openai": _slow, "anthropic": lambda: "fast"})
+            elapsed = time.perf_counter() - start
+        assert result == "fast"
+        assert elapsed < 0.4
+
+    def test_no_hedge_when_primary_fast(self):
+        router = LLMRouter()
+        calls = []
+        with patch.object(settings, "LLM_HEDGE_ENABLED", True), \
+             patch.object(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 1.0):
+            result = router.call("openai", {"openai": lambda: "o", "anthropic": lambda: calls.append(1)})
+        assert result == "o"
+        assert calls == []
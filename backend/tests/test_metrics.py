@@ -0,0 +1,75 @@
+"""Prometheus /metrics exposition."""
+
+import re
+
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def metrics_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    """Value of the first ``name`` sample whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.match(rf"^{name}(?:{{(.*)}})? (\S+)$", line)
+        if match and all(f'{k}="{v}"' in (match.group(1) or "") for k, v in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"{name} {labels} not exposed")
+
+
+def test_route_latency_and_db_queries_by_template(client, user_a):
+    ws_id = user_a["workspace"].id
+    resp = client.post(f"/api/v1/tasks?workspace_id={ws_id}", json={"task_name": "A"}, headers=user_a["headers"])
+    task_id = resp.json()["id"]
+    client.get(f"/api/v1/tasks/{task_id}", headers=user_a["headers"])
+
+    text = client.get("/metrics").text
+    route = "/api/v1/tasks/{task_id}"
+    assert _sample(text, "taskme_http_request_duration_seconds_count", method="GET", route=route, status="200") >= 1
+    assert _sample(text, "taskme_db_queries_per_request_sum", route=route) >= 1
+    assert _sample(text, "taskme_db_queries_total") >= 1
+    # Raw paths never become labels
+    assert f"/api/v1/tasks/{task_id}\"" not in text
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/no/such/path")
+    text = client.get("/metrics").text
+    assert _sample(text, "taskme_http_request_duration_seconds_count", route="unmatched", status="404") >= 1
+
+
+def test_threadpool_and_service_metrics_exposed(client):
+    text = client.get("/metrics").text
+    assert _sample(text, "taskme_threadpool_threads_total") > 0
+    for name in ("taskme_agent_ws_relays_active", "taskme_followup_scan_duration_seconds",
+                 "taskme_llm_call_duration_seconds", "taskme_http_requests_in_progress"):
+        assert name in text
+
+
+def test_metrics_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_token_required_when_set(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_route_template_adds_include_prefix_and_mount():
+    from app.route_template import route_template
+    from app.routers.tasks import router
+
+    # The router's own route: "/tasks/{task_id}", without include_router's "/api/v1"
+    [route] = [r for r in router.routes if r.path == "/tasks/{task_id}" and "GET" in r.methods]
+    scope = {"route": route, "path": "/api/v1/tasks/7", "root_path": ""}
+    assert route_template(scope) == "/api/v1/tasks/{task_id}"
+    mounted = {**scope, "path": "/backend" + scope["path"], "root_path": "/backend"}
+    assert route_template(mounted) == "/backend/api/v1/tasks/{task_id}"
+    assert route_template({"path": "/nope", "root_path": ""}) is None
@@ -0,0 +1,75 @@
+"""Tests for the versioned startup migration runner."""
+
+from sqlmodel import select
+
+from app import database
+from app.models.schema_migration import SchemaMigration
+
+
+def _recorded(session):
+    return [m.version for m in session.exec(select(SchemaMigration).order_by(SchemaMigration.version)).all()]
+
+
+def test_steps_run_once_and_are_recorded(session):
+    calls = []
+    steps = [(1, "first", lambda: calls.append(1)), (2, "second", lambda: calls.append(2))]
+
+    assert database.run_migrations(steps) == [1, 2]
+    assert database.run_migrations(steps) == []
+    assert calls == [1, 2]
+    assert _recorded(session) == [1, 2]
+
+
+def test_only_new_steps_run(session):
+    calls = []
+    steps = [(1, "first", lambda: calls.append(1))]
+    database.run_migrations(steps)
+
+    steps.append((2, "second", lambda: calls.append(2)))
+    assert database.run_migrations(steps) == [2]
+    assert calls == [1, 2]
+
+
+def test_full_chain_is_idempotent_on_current_schema(session):
+    applied = database.run_migrations()
+    assert applied == [version for version, _name, _step in database.MIGRATIONS]
+    assert database.run_migrations() == []
+
+
+def test_upgrades_a_baseline_schema_database(tmp_path, monkeypatch):
+    """A database created before the runner (and before later columns) boots and is fully migrated."""
+    from pathlib import Path
+
+    from sqlalchemy import create_engine, inspect, text
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    ddl = (Path(__file__).parent / "baseline_schema.sql").read_text()
+    with engine.begin() as conn:
+        for statement in filter(str.strip, ddl.split(";")):
+            conn.exec_driver_sql(statement)
+        conn.execute(text(
+            "INSERT INTO user (id, username, email, hashed_password, created_at, email_verified) "
+            "VALUES (1, 'old', 'old@test.com', 'x', '2026-01-01 00:00:00', 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO task (id, task_name, status, priority, user_id, created_at, updated_at) "
+            "VALUES (1, 'Legacy', 'TODO', 'MEDIUM', 1, '2026-01-01 00:00:00', '2026-01-01 00:00:00')"
+        ))
+    monkeypatch.setattr(database, "engine", engine)
+
+    assert database.run_migrations() == [version for version, _name, _step in database.MIGRATIONS]
+
+    columns = {c["name"] for c in inspect(engine).get_columns("workspace")}
+    assert {"data_version", "meta_version"} <= columns
+    assert "last_write_at" in {c["name"] for c in inspect(engine).get_columns("user")}
+    with engine.connect() as conn:
+        workspace_id, change_seq, stalls_at, version = conn.execute(
+            text("SELECT workspace_id, change_seq, stalls_at, version FROM task WHERE id = 1")
+        ).one()
+        assert workspace_id is not None
+        assert change_seq == 1
+        assert stalls_at is not None
+        assert version == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM columnconfig WHERE workspace_id = :id"),
+                            {"id": workspace_id}).scalar() > 0
+    assert database.run_migrations() == []
@@ -1,4 +1,5 @@
 """Tests for the NLP parse endpoint (LLM mocked)."""
+from types import SimpleNamespace
 from unittest.mock import patch
 
 
@@ -39,3 +40,195 @@ def test_parse_with_workspace_id(mock_llm, client, user_a):
                        json={"text": "Test task", "workspace_id": ws_id},
                        headers=user_a["headers"])
     assert resp.status_code == 200
+
+
+def test_system_prompt_static_prefix_comes_first():
+    from app.services.llm_service import SYSTEM_PROMPT, _build_system_prompt_parts
+    spec = [{"field_key": "cf_team", "display_name": "Team", "field_type": "text", "options": None}]
+    static, dynamic = _build_system_prompt_parts(spec, tone="concise")
+    assert static == SYSTEM_PROMPT
+    assert "Today's date is" not in static
+    assert "custom_fields.cf_team" in dynamic
+    assert "REPHRASING" in dynamic
+    assert dynamic.rstrip().endswith(".")
+    assert "Today's date is" in dynamic.splitlines()[-1]
+
+
+def test_custom_fields_rules_memoized_and_invalidated():
+    from app.services import llm_service
+    spec = [{"field_key": "cf_team", "display_name": "Team", "field_type": "text", "options": None}]
+    key = ("workspace", 123)
+    llm_service.invalidate_custom_fields_cache(key)
+    with patch.object(llm_service, "_render_custom_fields_rules", wraps=llm_service._render_custom_fields_rules) as render:
+        llm_service._build_system_prompt(spec, cache_key=key)
+        llm_service._build_system_prompt(spec, cache_key=key)
+        assert render.call_count == 1
+        # A changed column set re-renders even without explicit invalidation
+        changed = spec + [{"field_key": "cf_env", "display_name": "Env", "field_type": "text", "options": None}]
+        llm_service._build_system_prompt(changed, cache_key=key)
+        assert render.call_count == 2
+        llm_service.invalidate_custom_fields_cache(key)
+        llm_service._build_system_prompt(changed, cache_key=key)
+        assert render.call_count == 3
+
+
+def test_custom_fields_caches_are_bounded(monkeypatch):
+    from app.services import llm_service
+    monkeypatch.setattr(llm_service._custom_fields_cache, "maxsize", 2)
+    spec = [{"field_key": "cf_team", "display_name": "Team", "field_type": "text", "options": None}]
+    for ws_id in (1001, 1002, 1003):
+        llm_service._build_system_prompt(spec, cache_key=("workspace", ws_id))
+    assert len(llm_service._custom_fields_cache) == 2
+    assert ("workspace", 1001) not in llm_service._custom_fields_cache
+
+
+def test_column_change_invalidates_prompt_cache(client, user_a):
+    from app.services import llm_service
+    ws_id = user_a["workspace"].id
+    llm_service._custom_fields_cache[("workspace", ws_id)] = ((), "stale")
+    resp = client.post(f"/api/v1/columns?workspace_id={ws_id}",
+                       json={"display_name": "Team", "field_type": "text"},
+                       headers=user_a["headers"])
+    assert resp.status_code == 201
+    assert ("workspace", ws_id) not in llm_service._custom_fields_cache
+
+
+@patch("app.routers.parse.parse_natural_language")
+def test_column_spec_cached_per_workspace_until_columns_change(mock_llm, client, session, user_a):
+    from sqlalchemy import event
+    from app.services import llm_service
+    mock_llm.return_value = []
+    ws_id = user_a["workspace"].id
+    key = ("workspace", ws_id)
+    client.post(f"/api/v1/columns?workspace_id={ws_id}", json={"display_name": "Team", "field_type": "text"},
+                headers=user_a["headers"])
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        for _ in range(3):
+            client.post("/api/v1/parse", json={"text": "x", "workspace_id": ws_id}, headers=user_a["headers"])
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert sum("FROM columnconfig" in s for s in statements) == 1
+    assert [cf["field_key"] for cf in mock_llm.call_args[0][2]] == ["cf_team"]
+
+    # Another worker's cache would still hold the old version; meta_version tells it to reload
+    stale = llm_service._custom_fields_spec_cache[key]
+    client.post(f"/api/v1/columns?workspace_id={ws_id}", json={"display_name": "Env", "field_type": "text"},
+                headers=user_a["headers"])
+    llm_service._custom_fields_spec_cache[key] = stale
+    client.post("/api/v1/parse", json={"text": "x", "workspace_id": ws_id}, headers=user_a["headers"])
+    assert [cf["field_key"] for cf in mock_llm.call_args[0][2]] == ["cf_team", "cf_env"]
+
+
+def test_cache_breakpoint_only_on_cacheable_prefix():
+    from app.services.llm_service import PROMPT_CACHE_MIN_TOKENS, SYSTEM_PROMPT, _anthropic_system_blocks
+    short = _anthropic_system_blocks(SYSTEM_PROMPT, "today")
+    assert all("cache_control" not in block for block in short)
+    long = _anthropic_system_blocks("x" * PROMPT_CACHE_MIN_TOKENS * 4, "today")
+    assert long[0]["cache_control"] == {"type": "ephemeral"} and "cache_control" not in long[1]
+
+
+@patch("app.services.batch_parse_service.parse_natural_language")
+def test_parse_batch_keeps_order_with_per_item_errors(mock_llm, client, user_a):
+    def _fake(text, provider, spec, tone=None, cache_key=None):
+        if text == "boom":
+            raise Exception("LLM down")
+        return [{"task_name": text}]
+    mock_llm.side_effect = _fake
+    resp = client.post("/api/v1/parse/batch",
+                       json={"texts": ["first", "boom", "  ", "last"], "workspace_id": user_a["workspace"].id},
+                       headers=user_a["headers"])
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["tasks"][0]["task_name"] == "first"
+    assert "LLM parsing failed" in results[1]["error"]
+    assert "empty" in results[2]["error"].lower()
+    assert results[3]["tasks"][0]["task_name"] == "last"
+    assert mock_llm.call_count == 3
+
+
+@patch("app.services.batch_parse_service.parse_natural_language")
+def test_parse_batch_too_many_texts_400(mock_llm, client, user_a):
+    from app.config import settings
+    texts = ["x"] * (settings.PARSE_BATCH_MAX_ITEMS + 1)
+    resp = client.post("/api/v1/parse/batch", json={"texts": texts}, headers=user_a["headers"])
+    assert resp.status_code == 400
+    mock_llm.assert_not_called()
+
+
+@patch("app.routers.parse.submit_offline_batch")
+def test_parse_batch_offline_mode(mock_submit, client, user_a):
+    mock_submit.return_value = {"provider": "openai", "batch_id": "batch_123", "status": "validating"}
+    resp = client.post("/api/v1/parse/batch",
+                       json={"texts": ["a", "b"], "mode": "offline"},
+                       headers=user_a["headers"])
+    assert resp.status_code == 200
+    assert resp.json()["batch_id"] == "batch_123"
+    assert mock_submit.call_args[0][0] == ["a", "b"]
+
+
+@patch("app.services.batch_parse_service.parse_natural_language")
+@patch("app.routers.parse.submit_offline_batch")
+def test_parse_batch_all_blank_400_in_both_modes(mock_submit, mock_llm, client, user_a):
+    for mode in ("sync", "offline"):
+        resp = client.post("/api/v1/parse/batch", json={"texts": [" ", ""], "mode": mode}, headers=user_a["headers"])
+        assert resp.status_code == 400
+    mock_llm.assert_not_called()
+    mock_submit.assert_not_called()
+
+
+@patch("app.routers.parse.get_offline_batch")
+@patch("app.routers.parse.submit_offline_batch")
+def test_offline_batch_reports_blank_items_and_is_owner_only(mock_submit, mock_get, client, user_a, user_b):
+    mock_submit.return_value = {"provider": "anthropic", "batch_id": "msgbatch_1", "status": "in_progress"}
+    resp = client.post("/api/v1/parse/batch", json={"texts": ["a", "  ", "b"], "mode": "offline"},
+                       headers=user_a["headers"])
+    assert resp.status_code == 200
+
+    mock_get.return_value = {"provider": "anthropic", "batch_id": "msgbatch_1", "status": "in_progress"}
+    assert client.get("/api/v1/parse/batch/msgbatch_1", headers=user_a["headers"]).status_code == 200
+    mock_get.assert_called_once_with("msgbatch_1", "anthropic", [1])
+
+    assert client.get("/api/v1/parse/batch/msgbatch_1", headers=user_b["headers"]).status_code == 404
+    assert client.get("/api/v1/parse/batch/unknown", headers=user_a["headers"]).status_code == 404
+    assert mock_get.call_count == 1
+
+
+class _FakeAnthropicBatches:
+    """Stands in for ``client.messages.batches``; echoes one parsed task per submitted item."""
+
+    def __init__(self):
+        self.sent = []
+
+    def create(self, requests):
+        self.sent = [r["custom_id"] for r in requests]
+        return SimpleNamespace(id="b1", processing_status="in_progress")
+
+    def retrieve(self, batch_id):
+        return SimpleNamespace(processing_status="ended")
+
+    def results(self, batch_id):
+        message = SimpleNamespace(content=[SimpleNamespace(text='{"tasks": [{"task_name": "x"}]}')])
+        return [SimpleNamespace(custom_id=c, result=SimpleNamespace(type="succeeded", message=message)) for c in self.sent]
+
+
+def test_offline_submit_skips_blank_texts_and_results_report_them():
+    from app.services import batch_parse_service
+
+    batches = _FakeAnthropicBatches()
+    client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+    with patch.object(batch_parse_service, "_anthropic_client", return_value=client):
+        batch_parse_service.submit_offline_batch(["a", " ", "b"], "anthropic")
+        assert batches.sent == ["item-0", "item-2"]
+        out = batch_parse_service.get_offline_batch("b1", "anthropic", [1])
+    assert [r["index"] for r in out["results"]] == [0, 1, 2]
+    assert out["results"][1]["error"] == batch_parse_service.EMPTY_ERROR
+    assert out["results"][2]["tasks"][0]["task_name"] == "x"
@@ -0,0 +1,73 @@
+"""Per-request SQL counting and N+1 detection."""
+
+import pytest
+
+from app.config import settings
+from app.metrics import RequestDBStats
+from app.query_guard import QueryBudgetExceeded, check_request, fingerprint, repeated_statements
+from tests.conftest import _add_member, _create_user
+
+
+def _stats(statements: dict[str, int]) -> RequestDBStats:
+    stats = RequestDBStats()
+    stats.statements = statements
+    stats.queries = sum(statements.values())
+    return stats
+
+
+def test_fingerprint_collapses_in_lists_and_whitespace():
+    assert fingerprint("SELECT *\n  FROM task WHERE id IN (?, ?, ?)") == "SELECT * FROM task WHERE id IN (...)"
+    assert fingerprint("SELECT 1 WHERE id IN (%(id_1_1)s)") == fingerprint("SELECT 1 WHERE id IN (%(id_1_1)s, %(id_1_2)s)")
+    assert fingerprint("SELECT 1 WHERE id IN ($1, $2)") == "SELECT 1 WHERE id IN (...)"
+    # Subqueries are real SQL, not an expanded parameter list
+    assert fingerprint("SELECT 1 WHERE id IN (SELECT task_id FROM t)") == "SELECT 1 WHERE id IN (SELECT task_id FROM t)"
+
+
+def test_repeated_statements_groups_by_fingerprint():
+    stats = _stats({"SELECT a WHERE id IN (?)": 3, "SELECT a WHERE id IN (?, ?)": 3, "SELECT b": 1})
+    assert repeated_statements(stats, 5) == [("SELECT a WHERE id IN (...)", 6)]
+
+
+def test_check_request_logs_or_raises(monkeypatch, caplog):
+    stats = _stats({"SELECT user WHERE id = ?": 12})
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 10)
+    monkeypatch.setattr(settings, "DB_QUERY_GUARD_RAISE", False)
+    check_request("GET", "/x", stats)
+    assert "possible N+1, 12x" in caplog.text
+
+    monkeypatch.setattr(settings, "DB_QUERY_GUARD_RAISE", True)
+    with pytest.raises(QueryBudgetExceeded):
+        check_request("GET", "/x", stats)
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 20)
+    check_request("GET", "/x", _stats({f"SELECT {i}": 1 for i in range(20)}))
+    with pytest.raises(QueryBudgetExceeded, match="21 queries"):
+        check_request("GET", "/x", _stats({f"SELECT {i}": 1 for i in range(21)}))
+
+
+def test_debug_header_counts_queries(client, user_a, query_guard):
+    resp = client.get(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}", headers=user_a["headers"])
+    assert resp.status_code == 200
+    assert int(resp.headers["X-DB-Queries"]) >= 1
+    assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+
+
+def test_list_members_query_count_is_constant(client, session, user_a, query_guard):
+    url = f"/api/v1/workspaces/{user_a['workspace'].id}/members"
+    _add_member(session, user_a["workspace"], _create_user(session, "m0", "m0@test.com"))
+    few = client.get(url, headers=user_a["headers"])
+    for i in range(1, 8):
+        _add_member(session, user_a["workspace"], _create_user(session, f"m{i}", f"m{i}@test.com"))
+    many = client.get(url, headers=user_a["headers"])
+    assert many.status_code == 200
+    assert len(many.json()["members"]) == 9
+    assert many.headers["X-DB-Queries"] == few.headers["X-DB-Queries"]
+
+
+def test_reorder_columns_does_not_query_per_item(client, user_a, query_guard):
+    ws_id = user_a["workspace"].id
+    cols = client.get(f"/api/v1/columns?workspace_id={ws_id}", headers=user_a["headers"]).json()
+    reorder = [{"id": c["id"], "position": len(cols) - i} for i, c in enumerate(cols)]
+    assert len(reorder) >= 5
+    resp = client.patch(f"/api/v1/columns/reorder?workspace_id={ws_id}", json=reorder, headers=user_a["headers"])
+    assert resp.status_code == 200
+    assert [c["id"] for c in resp.json()] == [c["id"] for c in reversed(cols)]
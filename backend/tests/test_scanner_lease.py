@@ -0,0 +1,48 @@
+"""Tests for the scanner lease (leader election + checkpoint)."""
+
+from datetime import datetime, timezone
+
+from app.services import scanner_lease
+
+
+class TestLease:
+    def test_first_holder_wins(self):
+        assert scanner_lease.acquire("job", 60, holder="a") is True
+        assert scanner_lease.acquire("job", 60, holder="b") is False
+
+    def test_holder_can_renew(self):
+        assert scanner_lease.acquire("job", 60, holder="a") is True
+        assert scanner_lease.acquire("job", 60, holder="a") is True
+
+    def test_expired_lease_can_be_taken(self):
+        assert scanner_lease.acquire("job", -1, holder="a") is True
+        assert scanner_lease.acquire("job", 60, holder="b") is True
+        assert scanner_lease.acquire("job", 60, holder="a") is False
+
+    def test_release_hands_over(self):
+        scanner_lease.acquire("job", 60, holder="a")
+        scanner_lease.release("job", holder="a")
+        assert scanner_lease.acquire("job", 60, holder="b") is True
+
+    def test_release_by_non_holder_is_noop(self):
+        scanner_lease.acquire("job", 60, holder="a")
+        scanner_lease.release("job", holder="b")
+        assert scanner_lease.acquire("job", 60, holder="b") is False
+
+
+class TestCheckpoint:
+    def test_round_trip_and_clear(self):
+        scanner_lease.acquire("job", 60, holder="a")
+        assert scanner_lease.load_checkpoint("job") is None
+
+        cursor = (datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), 42)
+        assert scanner_lease.save_checkpoint("job", cursor, holder="a") is True
+        assert scanner_lease.load_checkpoint("job") == cursor
+
+        assert scanner_lease.save_checkpoint("job", None, holder="a") is True
+        assert scanner_lease.load_checkpoint("job") is None
+
+    def test_non_holder_cannot_checkpoint(self):
+        scanner_lease.acquire("job", 60, holder="a")
+        assert scanner_lease.save_checkpoint("job", (datetime.now(timezone.utc), 1), holder="b") is False
+        assert scanner_lease.load_checkpoint("job") is None
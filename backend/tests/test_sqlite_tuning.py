@@ -0,0 +1,80 @@
+"""SQLite tuned mode: WAL pragmas, single writer connection, read-only reader pool."""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import SQLModel, func, select
+
+from app import database
+from app.database import RoutingSession
+from app.models.task import Task
+
+
+@pytest.fixture
+def tuned(tmp_path, monkeypatch):
+    monkeypatch.setattr(database.settings, "SQLITE_TUNED", True)
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    writer = database._build_engine(url)
+    reader = database._build_sqlite_read_engine(url)
+    SQLModel.metadata.create_all(writer)
+    monkeypatch.setattr(database, "engine", writer)
+    monkeypatch.setattr(database, "sqlite_read_engine", reader)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_pragmas_applied(tuned):
+    writer, reader = tuned
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    with reader.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+
+
+def test_reads_use_reader_until_the_transaction_writes(tuned):
+    writer, reader = tuned
+    with RoutingSession(writer) as session:
+        assert session.get_bind(clause=select(Task)) is reader
+        assert session.get_bind(clause=text("select 1")) is reader
+        session.add(Task(task_name="A"))
+        session.flush()
+        # Own uncommitted writes must stay visible, so reads now stick to the writer
+        assert session.get_bind(clause=select(Task)) is writer
+        session.commit()
+        assert session.get_bind(clause=select(Task)) is reader
+        assert session.exec(select(Task.task_name)).all() == ["A"]
+
+
+def test_connection_without_statement_is_a_write(tuned):
+    writer, _reader = tuned
+    with RoutingSession(writer) as session:
+        assert session.get_bind() is writer
+
+
+def test_concurrent_writers_do_not_hit_database_locked(tuned):
+    writer, _reader = tuned
+    errors = []
+
+    def _write(worker):
+        try:
+            for i in range(25):
+                with RoutingSession(writer) as session:
+                    session.exec(select(func.count()).select_from(Task)).one()
+                    session.add(Task(task_name=f"{worker}-{i}"))
+                    session.commit()
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_write, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with RoutingSession(writer) as session:
+        assert session.exec(select(func.count()).select_from(Task)).one() == 200
@@ -0,0 +1,28 @@
+"""Startup profiling and lazy heavy imports."""
+
+import subprocess
+import sys
+
+from app import startup_profile
+
+
+def test_heavy_dependencies_are_not_imported_at_boot():
+    heavy = ("httpx", "openpyxl", "cryptography.fernet", "openai", "anthropic", "websockets", "resend", "aiosmtplib",
+             "prometheus_client", "brotli", "zstandard")
+    code = f"import sys, app.main; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == ""
+
+
+def test_import_times_parses_importtime_output():
+    rows = startup_profile.import_times("json")
+    names = [name for name, _self, _cumulative in rows]
+    assert "json" in names
+    assert all(cumulative >= self_ms >= 0 for _name, self_ms, cumulative in rows)
+
+
+def test_startup_step_records_timing():
+    startup_profile.step_timings.clear()
+    with startup_profile.startup_step("noop"):
+        pass
+    assert [name for name, _ms in startup_profile.step_timings] == ["noop"]
@@ -0,0 +1,189 @@
+"""Tests for the per-workspace task change feed."""
+
+import asyncio
+
+import pytest
+
+from app.models.task import Task
+from app.models.workspace import Workspace
+from app.services import task_feed
+from tests.conftest import _create_workspace
+
+
+@pytest.fixture(autouse=True)
+def fresh_feed():
+    task_feed._feed = None
+    yield
+    task_feed._feed = None
+
+
+def _buffered(workspace_id):
+    return list(task_feed.get_task_feed()._buffers.get(workspace_id, ()))
+
+
+def _create(client, user, name="Write report"):
+    resp = client.post(f"/api/v1/tasks?workspace_id={user['workspace'].id}",
+                       json={"task_name": name}, headers=user["headers"])
+    assert resp.status_code == 201
+    return resp.json()
+
+
+class TestVersionStamping:
+    def test_writes_bump_workspace_version_and_stamp_task(self, client, session, user_a):
+        task = _create(client, user_a)
+        client.patch(f"/api/v1/tasks/{task['id']}", json={"owner": "Bob"}, headers=user_a["headers"])
+
+        ws = session.get(Workspace, user_a["workspace"].id)
+        session.refresh(ws)
+        row = session.get(Task, task["id"])
+        session.refresh(row)
+        assert ws.data_version == 2
+        assert row.change_seq == 2
+
+    def test_events_carry_full_task_on_create_and_diff_on_update(self, client, user_a):
+        task = _create(client, user_a)
+        client.patch(f"/api/v1/tasks/{task['id']}", json={"owner": "Bob"}, headers=user_a["headers"])
+        client.delete(f"/api/v1/tasks/{task['id']}", headers=user_a["headers"])
+
+        created, updated, deleted = _buffered(user_a["workspace"].id)
+        assert (created["op"], created["seq"], created["task"]["task_name"]) == ("create", 1, "Write report")
+        assert (updated["op"], updated["seq"]) == ("update", 2)
+        assert updated["changes"]["owner"] == "Bob"
+        assert "description" not in updated["changes"]
+        assert (deleted["op"], deleted["seq"], deleted["task_id"]) == ("delete", 3, task["id"])
+
+    def test_merged_custom_fields_event_carries_stored_value(self, client, user_a):
+        task = _create(client, user_a)
+        client.patch(f"/api/v1/tasks/{task['id']}", json={"custom_fields": '{"cf_sprint": "7"}'},
+                     headers=user_a["headers"])
+        updated = _buffered(user_a["workspace"].id)[-1]
+        assert updated["changes"]["custom_fields"] == '{"cf_sprint":"7"}'
+
+    def test_move_is_delete_in_source_and_create_in_destination(self, client, session, user_a):
+        task = _create(client, user_a)
+        ws_b = _create_workspace(session, user_a["user"], "Second")
+        resp = client.post("/api/v1/tasks/copy-move", json={
+            "task_ids": [task["id"]], "destination_workspace_id": ws_b.id, "action": "move",
+        }, headers=user_a["headers"])
+        assert resp.status_code == 200
+
+        assert _buffered(user_a["workspace"].id)[-1]["op"] == "delete"
+        assert [e["op"] for e in _buffered(ws_b.id)] == ["create"]
+
+    def test_rollback_publishes_nothing(self, session, user_a):
+        session.add(Task(task_name="Never", workspace_id=user_a["workspace"].id, user_id=user_a["user"].id))
+        session.flush()
+        session.rollback()
+        assert _buffered(user_a["workspace"].id) == []
+
+
+class TestSubscribe:
+    def test_backlog_from_buffer(self, client, user_a):
+        for i in range(3):
+            _create(client, user_a, f"T{i}")
+        feed = task_feed.get_task_feed()
+
+        async def _run():
+            sub, backlog = feed.subscribe(user_a["workspace"].id, since=1, current=3)
+            feed.unsubscribe(sub)
+            return backlog
+
+        backlog = asyncio.run(_run())
+        assert [e["seq"] for e in backlog] == [2, 3]
+
+    def test_gap_not_covered_by_buffer(self, user_a):
+        feed = task_feed.get_task_feed()
+
+        async def _run():
+            sub, backlog = feed.subscribe(user_a["workspace"].id, since=0, current=5)
+            feed.unsubscribe(sub)
+            return backlog
+
+        assert asyncio.run(_run()) is None
+
+
+class TestFeedWebSocket:
+    def test_rejects_non_member(self, client, user_a, user_b):
+        token = user_b["headers"]["Authorization"].split()[1]
+        with pytest.raises(Exception):
+            with client.websocket_connect(f"/api/v1/ws/task-feed?workspace_id={user_a['workspace'].id}&token={token}") as ws:
+                ws.receive_json()
+
+    def test_pushes_changes(self, client, user_a):
+        token = user_a["headers"]["Authorization"].split()[1]
+        url = f"/api/v1/ws/task-feed?workspace_id={user_a['workspace'].id}&token={token}"
+        with client.websocket_connect(url) as ws:
+            assert ws.receive_json() == {"type": "hello", "seq": 0}
+            task = _create(client, user_a)
+            msg = ws.receive_json()
+            assert msg["type"] == "task_change"
+            assert (msg["op"], msg["seq"], msg["task_id"]) == ("create", 1, task["id"])
+
+    def test_resume_replays_missed_events(self, client, user_a):
+        _create(client, user_a, "A")
+        _create(client, user_a, "B")
+        token = user_a["headers"]["Authorization"].split()[1]
+        url = f"/api/v1/ws/task-feed?workspace_id={user_a['workspace'].id}&token={token}&since=1"
+        with client.websocket_connect(url) as ws:
+            assert ws.receive_json() == {"type": "hello", "seq": 2}
+            msg = ws.receive_json()
+            assert (msg["seq"], msg["task"]["task_name"]) == (2, "B")
+
+    def test_gap_is_caught_up_from_database(self, client, user_a):
+        _create(client, user_a, "A")
+        task_feed._feed = None  # e.g. written by another worker / before a restart
+        token = user_a["headers"]["Authorization"].split()[1]
+        url = f"/api/v1/ws/task-feed?workspace_id={user_a['workspace'].id}&token={token}&since=0"
+        with client.websocket_connect(url) as ws:
+            assert ws.receive_json() == {"type": "hello", "seq": 1}
+            msg = ws.receive_json()
+            assert msg["type"] == "changes"
+            assert [t["task_name"] for t in msg["tasks"]] == ["A"]
+            assert msg["seq"] == 1 and msg["has_more"] is False
+
+
+class TestChangesEndpoint:
+    def _changes(self, client, user, since, **params):
+        resp = client.get("/api/v1/tasks/changes", params={"workspace_id": user["workspace"].id, "since": since, **params},
+                          headers=user["headers"])
+        assert resp.status_code == 200
+        return resp.json()
+
+    def test_full_then_incremental_sync(self, client, user_a):
+        a = _create(client, user_a, "A")
+        _create(client, user_a, "B")
+        full = self._changes(client, user_a, 0)
+        assert [t["task_name"] for t in full["tasks"]] == ["A", "B"]
+        assert full["seq"] == 2 and full["deleted"] == []
+
+        client.patch(f"/api/v1/tasks/{a['id']}", json={"status": "Done"}, headers=user_a["headers"])
+        delta = self._changes(client, user_a, full["seq"])
+        assert [(t["id"], t["status"]) for t in delta["tasks"]] == [(a["id"], "Done")]
+        assert self._changes(client, user_a, delta["seq"])["tasks"] == []
+
+    def test_deletes_leave_tombstones(self, client, user_a):
+        ids = [_create(client, user_a, f"T{i}")["id"] for i in range(5)]
+        since = self._changes(client, user_a, 0)["seq"]
+
+        client.delete(f"/api/v1/tasks/{ids[0]}", headers=user_a["headers"])
+        client.request("DELETE", "/api/v1/tasks/bulk/delete", json=[ids[1], ids[2]], headers=user_a["headers"])
+        delta = self._changes(client, user_a, since)
+        assert delta["deleted"] == ids[:3] and delta["tasks"] == []
+
+        client.delete(f"/api/v1/tasks/all?workspace_id={user_a['workspace'].id}", headers=user_a["headers"])
+        assert self._changes(client, user_a, delta["seq"])["deleted"] == ids[3:]
+
+    def test_paging_with_limit(self, client, user_a):
+        for i in range(5):
+            _create(client, user_a, f"T{i}")
+        page = self._changes(client, user_a, 0, limit=2)
+        names = [t["task_name"] for t in page["tasks"]]
+        while page["has_more"]:
+            page = self._changes(client, user_a, page["seq"], limit=2)
+            names += [t["task_name"] for t in page["tasks"]]
+        assert names == [f"T{i}" for i in range(5)]
+
+    def test_requires_membership(self, client, user_a, user_b):
+        resp = client.get("/api/v1/tasks/changes", params={"workspace_id": user_a["workspace"].id},
+                          headers=user_b["headers"])
+        assert resp.status_code == 404
@@ -193,6 +193,49 @@ def test_pagination_offset_limit(client, user_a):
     assert ids1.isdisjoint(ids2)
 
 
+def test_list_tasks_fast_path_matches_validated_path(client, user_a, monkeypatch):
+    from app.config import settings
+    ws_id = user_a["workspace"].id
+    client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                json={"task_name": "Full", "description": "d", "owner": "Alice", "due_date": "2026-03-01",
+                      "status": "In Progress", "priority": "High", "custom_fields": '{"a": 1}'},
+                headers=user_a["headers"])
+    client.post(f"/api/v1/tasks?workspace_id={ws_id}", json={"task_name": "Sparse"}, headers=user_a["headers"])
+    url = f"/api/v1/tasks?workspace_id={ws_id}"
+
+    monkeypatch.setattr(settings, "TASK_LIST_FAST_JSON", True)
+    fast = client.get(url, headers=user_a["headers"])
+    monkeypatch.setattr(settings, "TASK_LIST_FAST_JSON", False)
+    validated = client.get(url, headers=user_a["headers"])
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
+    assert fast.headers["ETag"] == validated.headers["ETag"]
+    assert fast.headers["content-type"] == "application/json"
+
+
+def test_list_tasks_sparse_fields(client, user_a, monkeypatch):
+    from app.config import settings
+    ws_id = user_a["workspace"].id
+    client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                json={"task_name": "Board", "description": "long text", "status": "Done", "due_date": "2026-03-01"},
+                headers=user_a["headers"])
+    url = f"/api/v1/tasks?workspace_id={ws_id}&fields=task_name,status,due_date"
+    for fast in (True, False):
+        monkeypatch.setattr(settings, "TASK_LIST_FAST_JSON", fast)
+        resp = client.get(url, headers=user_a["headers"])
+        assert resp.status_code == 200
+        [task] = resp.json()
+        assert set(task) == {"id", "task_name", "status", "due_date"}
+        assert task["status"] == "Done" and task["due_date"] == "2026-03-01"
+
+
+def test_list_tasks_unknown_field_rejected(client, user_a):
+    ws_id = user_a["workspace"].id
+    resp = client.get(f"/api/v1/tasks?workspace_id={ws_id}&fields=task_name,hashed_password", headers=user_a["headers"])
+    assert resp.status_code == 400
+    assert "hashed_password" in resp.json()["detail"]
+
+
 def test_update_custom_fields_merge(client, user_a):
     import json
     ws_id = user_a["workspace"].id
@@ -210,6 +253,128 @@ def test_update_custom_fields_merge(client, user_a):
     assert cf["field_b"] == "val_b"
 
 
+def test_update_custom_fields_merge_is_atomic(client, session, user_a):
+    import json
+    from app.models.task import Task
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "CF Task", "custom_fields": json.dumps({"field_a": "val_a", "field_c": "x"})},
+                       headers=user_a["headers"]).json()
+
+    # Another writer changes custom_fields after the PATCH handler could have read them
+    row = session.get(Task, task["id"])
+    row.custom_fields = json.dumps({"field_a": "concurrent", "field_c": "x"})
+    session.add(row)
+    session.commit()
+    session.expire_all()
+
+    resp = client.patch(f"/api/v1/tasks/{task['id']}",
+                        json={"custom_fields": json.dumps({"field_b": "val_b", "field_c": None})},
+                        headers=user_a["headers"])
+    assert resp.status_code == 200
+    assert json.loads(resp.json()["custom_fields"]) == {"field_a": "concurrent", "field_b": "val_b", "field_c": None}
+
+
+def test_update_custom_fields_is_a_shallow_update(client, user_a):
+    import json
+    ws_id = user_a["workspace"].id
+    stored = {"meta": {"a": 1, "b": 2}, "done": True, "tags": ["x"], "note": 'say "hi"'}
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "CF Task", "custom_fields": json.dumps(stored)},
+                       headers=user_a["headers"]).json()
+    incoming = {"meta": {"a": 9}, "tags": None, 'odd "key"': False}
+    resp = client.patch(f"/api/v1/tasks/{task['id']}", json={"custom_fields": json.dumps(incoming)},
+                        headers=user_a["headers"])
+    assert resp.status_code == 200
+    # Same as dict.update: nested objects are replaced whole, null is stored
+    assert json.loads(resp.json()["custom_fields"]) == {**stored, **incoming}
+
+
+def test_update_custom_fields_with_invalid_stored_json_400(client, session, user_a):
+    from app.models.task import Task
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "CF Task"}, headers=user_a["headers"]).json()
+    row = session.get(Task, task["id"])
+    row.custom_fields = "{not json"
+    session.add(row)
+    session.commit()
+
+    resp = client.patch(f"/api/v1/tasks/{task['id']}", json={"custom_fields": '{"a": 1}'},
+                        headers=user_a["headers"])
+    assert resp.status_code == 400
+    resp = client.patch("/api/v1/tasks/bulk", json={"ids": [task["id"]], "update": {"custom_fields": '{"a": 1}'}},
+                        headers=user_a["headers"])
+    assert resp.status_code == 400
+
+
+def test_update_custom_fields_must_be_object(client, user_a):
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "CF Task"}, headers=user_a["headers"]).json()
+    resp = client.patch(f"/api/v1/tasks/{task['id']}", json={"custom_fields": "[1, 2]"},
+                        headers=user_a["headers"])
+    assert resp.status_code == 400
+
+
+def test_update_task_bumps_version(client, user_a):
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "Versioned"}, headers=user_a["headers"]).json()
+    assert task["version"] == 1
+
+    resp = client.patch(f"/api/v1/tasks/{task['id']}", json={"owner": "Bob"}, headers=user_a["headers"])
+    assert resp.json()["version"] == 2
+    assert resp.headers["ETag"] == '"2"'
+    assert client.get(f"/api/v1/tasks/{task['id']}", headers=user_a["headers"]).headers["ETag"] == '"2"'
+
+
+def test_update_task_if_match(client, user_a):
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "Contested"}, headers=user_a["headers"]).json()
+    url = f"/api/v1/tasks/{task['id']}"
+
+    first = client.patch(url, json={"owner": "Alice"}, headers={**user_a["headers"], "If-Match": '"1"'})
+    assert first.status_code == 200
+
+    # A second editor still holding version 1 loses the race instead of overwriting
+    stale = client.patch(url, json={"owner": "Bob"}, headers={**user_a["headers"], "If-Match": '"1"'})
+    assert stale.status_code == 412
+    assert client.get(url, headers=user_a["headers"]).json()["owner"] == "Alice"
+
+    assert client.patch(url, json={"owner": "Bob"}, headers={**user_a["headers"], "If-Match": "*"}).status_code == 200
+    assert client.patch(url, json={"owner": "Bob"}, headers={**user_a["headers"], "If-Match": "abc"}).status_code == 400
+
+
+def test_if_match_claim_fails_after_concurrent_write(client, session, user_a):
+    from fastapi import HTTPException
+    import pytest
+    from app.routers.tasks import _claim_version
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "Raced"}, headers=user_a["headers"]).json()
+    client.patch(f"/api/v1/tasks/{task['id']}", json={"owner": "Agent"}, headers=user_a["headers"])
+
+    with pytest.raises(HTTPException) as exc:
+        _claim_version(session, task["id"], expected=1)
+    assert exc.value.status_code == 412
+    _claim_version(session, task["id"], expected=2)
+    session.rollback()
+
+
+def test_if_match_locks_workspace_before_task(client, session, user_a):
+    ws_id = user_a["workspace"].id
+    task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
+                       json={"task_name": "Ordered"}, headers=user_a["headers"]).json()
+    headers = {**user_a["headers"], "If-Match": '"1"'}
+    tables = _updated_tables(
+        session, lambda: client.patch(f"/api/v1/tasks/{task['id']}", json={"owner": "Alice"},
+                                      headers=headers).raise_for_status()
+    )
+    assert tables == ["workspace", "task"]
+
+
 def test_get_task_by_id(client, user_a):
     ws_id = user_a["workspace"].id
     task = client.post(f"/api/v1/tasks?workspace_id={ws_id}",
@@ -444,3 +609,98 @@ def test_smart_search_llm_failure_500(mock_llm, client, user_a):
                        headers=user_a["headers"])
     assert resp.status_code == 500
     assert "Failed to parse" in resp.json()["detail"]
+
+
+def _bulk_tasks(client, user, n):
+    ws_id = user["workspace"].id
+    resp = client.post(f"/api/v1/tasks/bulk?workspace_id={ws_id}",
+                       json=[{"task_name": f"T{i}"} for i in range(n)], headers=user["headers"])
+    return [t["id"] for t in resp.json()]
+
+
+def _updated_tables(session, request):
+    """Tables in the order ``request()`` first UPDATEs them (lock acquisition order)."""
+    from sqlalchemy import event
+    tables = []
+
+    def _record(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE "):
+            table = statement.split()[1]
+            if table not in tables:
+                tables.append(table)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        request()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return tables
+
+
+def test_bulk_update_locks_workspace_before_tasks(client, session, user_a):
+    ids = _bulk_tasks(client, user_a, 2)
+    body = {"ids": ids, "update": {"status": "Done", "custom_fields": '{"cf_sprint": "7"}'}}
+    tables = _updated_tables(
+        session, lambda: client.patch("/api/v1/tasks/bulk", json=body, headers=user_a["headers"]).raise_for_status()
+    )
+    # Same order as the ORM flush hook and the nudge writer, so concurrent writers cannot deadlock
+    assert tables == ["workspace", "task"]
+
+
+def test_bulk_update_same_change_for_ids(client, user_a):
+    ids = _bulk_tasks(client, user_a, 3)
+    resp = client.patch("/api/v1/tasks/bulk",
+                        json={"ids": ids, "update": {"status": "Done", "custom_fields": '{"cf_sprint": "7"}'}},
+                        headers=user_a["headers"])
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [t["id"] for t in data] == ids
+    assert all(t["status"] == "Done" and t["version"] == 2 for t in data)
+    assert all(t["custom_fields"] == '{"cf_sprint":"7"}' for t in data)
+
+
+def test_bulk_update_per_task_changes(client, session, user_a):
+    from app.models.task import Task
+    ids = _bulk_tasks(client, user_a, 2)
+    resp = client.patch("/api/v1/tasks/bulk", json={"updates": [
+        {"id": ids[0], "owner": "Alice"},
+        {"id": ids[1], "status": "Done", "priority": "High"},
+    ]}, headers=user_a["headers"])
+    assert resp.status_code == 200
+    first, second = resp.json()
+    assert (first["owner"], first["status"]) == ("Alice", "To Do")
+    assert (second["owner"], second["status"], second["priority"]) == (None, "Done", "High")
+
+    # Bulk writes keep the stall deadline and change feed sequence up to date
+    done = session.get(Task, ids[1])
+    session.refresh(done)
+    assert done.stalls_at is None
+    changes = client.get("/api/v1/tasks/changes", params={"workspace_id": user_a["workspace"].id, "since": 2},
+                         headers=user_a["headers"]).json()
+    assert sorted(t["id"] for t in changes["tasks"]) == ids
+
+
+def test_bulk_update_is_all_or_nothing(client, user_a, user_b):
+    mine = _bulk_tasks(client, user_a, 1)
+    theirs = _bulk_tasks(client, user_b, 1)
+    resp = client.patch("/api/v1/tasks/bulk", json={"ids": mine + theirs, "update": {"status": "Done"}},
+                        headers=user_a["headers"])
+    assert resp.status_code == 404
+    task = client.get(f"/api/v1/tasks/{mine[0]}", headers=user_a["headers"]).json()
+    assert task["status"] == "To Do"
+
+
+def test_bulk_update_requires_editor(client, session, user_a, user_b):
+    from tests.conftest import _add_member
+    ids = _bulk_tasks(client, user_a, 1)
+    _add_member(session, user_a["workspace"], user_b["user"], role="viewer")
+    resp = client.patch("/api/v1/tasks/bulk", json={"ids": ids, "update": {"status": "Done"}},
+                        headers=user_b["headers"])
+    assert resp.status_code == 403
+
+
+def test_bulk_update_rejects_mixed_shapes(client, user_a):
+    ids = _bulk_tasks(client, user_a, 1)
+    resp = client.patch("/api/v1/tasks/bulk", json={"ids": ids}, headers=user_a["headers"])
+    assert resp.status_code == 400
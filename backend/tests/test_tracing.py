@@ -0,0 +1,108 @@
+"""OpenTelemetry spans, written by the JSON-lines file exporter."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from app import tracing  # noqa: E402
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def spans(tmp_path):
+    """Enable tracing into a temp file; call the fixture value to read the finished spans."""
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(tracing.JsonLinesFileExporter(str(path)))
+
+    def read():
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    tracing.shutdown()
+
+
+def test_disabled_helpers_are_no_ops():
+    assert not tracing.enabled()
+    assert tracing.trace_headers() == {}
+    with tracing.span("nothing") as current:
+        assert current is None
+
+
+def test_request_span_continues_incoming_trace_with_db_children(client, user_a, spans):
+    resp = client.get(f"/api/v1/tasks?workspace_id={user_a['workspace'].id}",
+                      headers={**user_a["headers"], "traceparent": TRACEPARENT})
+    assert resp.status_code == 200
+
+    recorded = spans()
+    [server] = [s for s in recorded if s["kind"] == "SERVER"]
+    assert server["name"] == "GET /api/v1/tasks"
+    assert server["trace_id"] == TRACE_ID
+    assert server["parent_id"] == "00f067aa0ba902b7"
+    assert server["attributes"]["http.status_code"] == 200
+
+    # Only statements issued while serving the request (reading user_a["workspace"].id can refresh it first)
+    queries = [s for s in recorded if s["name"] == "db.query" and s["start_ns"] >= server["start_ns"]]
+    assert queries
+    assert all(q["trace_id"] == TRACE_ID for q in queries)
+    assert any("FROM task" in q["attributes"]["db.statement"] for q in queries)
+
+
+def test_httpx_transport_propagates_trace_context(spans):
+    import httpx
+
+    seen = {}
+
+    def handler(request):
+        seen.update(request.headers)
+        return httpx.Response(200, json={})
+
+    async def call():
+        transport = tracing.wrap_transport(httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport, base_url="http://agents") as client:
+            with tracing.span("caller"):
+                await client.get("/api/v1/agents")
+
+    asyncio.run(call())
+    [client_span] = [s for s in spans() if s["kind"] == "CLIENT"]
+    [caller] = [s for s in spans() if s["name"] == "caller"]
+    assert client_span["name"] == "GET /api/v1/agents"
+    assert client_span["parent_id"] == caller["span_id"]
+    assert seen["traceparent"].split("-")[2] == client_span["span_id"]
+
+
+def test_llm_calls_get_provider_spans(spans):
+    from app.services.llm_router import LLMRouter
+
+    assert LLMRouter()._timed("openai", lambda: "ok") == "ok"
+    [llm] = [s for s in spans() if s["name"] == "llm.call"]
+    assert llm["attributes"]["llm.provider"] == "openai"
+
+
+def test_upstream_messages_get_spans_around_their_handling(spans):
+    async def upstream():
+        for msg in ({"type": "session_established"}, {"type": "tool_execution_request"}):
+            yield json.dumps(msg)
+
+    async def relay():
+        messages = tracing.message_spans(upstream(), "agent_ws.upstream_message")
+        try:
+            async for msg in messages:
+                with tracing.span("handle", msg_type=msg["type"]):
+                    pass
+        finally:
+            await messages.aclose()
+
+    asyncio.run(relay())
+    recorded = spans()
+    parents = {s["span_id"]: s for s in recorded if s["name"] == "agent_ws.upstream_message"}
+    handled = [s for s in recorded if s["name"] == "handle"]
+    assert [parents[s["parent_id"]]["attributes"]["agent_ws.message_type"] for s in handled] == [
+        "session_established", "tool_execution_request",
+    ]